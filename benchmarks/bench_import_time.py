@@ -0,0 +1,55 @@
+"""
+Startup cost of the command-line tools.
+
+Each target is run in a fresh interpreter several times and the median wall
+time is reported, so the numbers include interpreter start-up and every
+import the command pulls in before doing any work.
+
+    python benchmarks/bench_import_time.py --repeat 10
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+TARGETS = [
+    ('python (baseline)',             'pass'),
+    ('elog_crawler.cli',              'import elog_crawler.cli'),
+    ('elog-crawler --help',           'from elog_crawler.cli import main; main(["--help"])'),
+    ('elog_crawler.save_to_db',       'import elog_crawler.save_to_db'),
+    ('elog_crawler.update_db',        'import elog_crawler.update_db'),
+    ('elog_crawler.query',            'import elog_crawler.query'),
+    ('elog_crawler.credential_store', 'import elog_crawler.credential_store'),
+    ('elog_crawler.app_crawl_elog',   'import elog_crawler.app_crawl_elog'),
+    ('elog_crawler.app_crawl_file_manager', 'import elog_crawler.app_crawl_file_manager'),
+]
+
+def time_target(statement, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', statement],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            return None, result.stderr.decode().strip().splitlines()[-1]
+        timings.append(elapsed)
+    return statistics.median(timings), None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import/start-up time of the elog-crawler commands.")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per target")
+    args = parser.parse_args()
+
+    print(f"{'target':40} {'median (ms)':>12}")
+    for name, statement in TARGETS:
+        median, error = time_target(statement, args.repeat)
+        if median is None:
+            print(f"{name:40} {'unavailable':>12}  ({error})")
+        else:
+            print(f"{name:40} {median * 1000:12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Throughput of re-ingesting files into an existing database.
+
+A synthetic database is built from generated logbook and file manager CSV
+files, then some of those files are ingested again three ways, each on a
+fresh copy of the database:
+
+    insert  ExperimentDBManager into an empty database (the baseline)
+    legacy  the old per-row SELECT, then UPDATE or INSERT
+    upsert  DatabaseUpdater: batched INSERT ... ON CONFLICT DO UPDATE
+
+    python benchmarks/bench_update_db.py --experiments 50 --runs 200 --entries 20
+"""
+
+import argparse
+import csv
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from elog_crawler.save_to_db import ExperimentDBManager
+from elog_crawler.update_db import DatabaseUpdater
+
+def write_files(directory, experiment_id, runs, entries):
+    logbook = os.path.join(directory, f'{experiment_id}.logbook.csv')
+    with open(logbook, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Posted', 'Run', 'Content', 'Tags', 'Author'])
+        for run in range(1, runs + 1):
+            for entry in range(entries):
+                writer.writerow([f'2024-01-01 {entry // 60:02d}:{entry % 60:02d}:{run % 60:02d}', run if entry == 0 else '',
+                                 f'Run {run} entry {entry}: ' + 'x' * 200, 'tag', f'user{entry % 7}'])
+    file_manager = os.path.join(directory, f'{experiment_id}.file_manager.csv')
+    with open(file_manager, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Run Number', 'Number of Files', 'Total Size (bytes)'])
+        for run in range(1, runs + 1):
+            writer.writerow([run, 10, run * 1024 ** 3])
+    return [logbook, file_manager]
+
+def legacy_update(conn, file_path):
+    """The row-by-row update path DatabaseUpdater used before upserts."""
+    cursor = conn.cursor()
+    experiment_id = os.path.basename(file_path).split('.')[0]
+    with open(file_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    conn.execute('BEGIN TRANSACTION')
+    if file_path.endswith('.logbook.csv'):
+        last_run_number = None
+        for row in rows:
+            if row['Run']:
+                last_run_number = int(row['Run'])
+            cursor.execute(
+                "SELECT log_id FROM Logbook WHERE run_number = ? AND timestamp = ? AND author = ? AND experiment_id = ?",
+                (last_run_number, row['Posted'], row['Author'], experiment_id))
+            exists = cursor.fetchone()
+            if exists:
+                cursor.execute("UPDATE Logbook SET content=?, tags=? WHERE log_id=?", (row['Content'], row['Tags'], exists[0]))
+            else:
+                cursor.execute("INSERT INTO Logbook (experiment_id, run_number, timestamp, content, tags, author) VALUES (?, ?, ?, ?, ?, ?)",
+                               (experiment_id, last_run_number, row['Posted'], row['Content'], row['Tags'], row['Author']))
+    else:
+        for row in rows:
+            run = row['Run Number']
+            cursor.execute("SELECT run_number FROM Run WHERE run_number = ? AND experiment_id = ?", (run, experiment_id))
+            if not cursor.fetchone():
+                cursor.execute("INSERT INTO Run (run_number, experiment_id) VALUES (?, ?)", (run, experiment_id))
+            cursor.execute("SELECT file_id FROM FileManager WHERE run_number = ? AND experiment_id = ?", (run, experiment_id))
+            exists = cursor.fetchone()
+            if exists:
+                cursor.execute("UPDATE FileManager SET number_of_files=?, total_size_bytes=? WHERE file_id=?",
+                               (row['Number of Files'], row['Total Size (bytes)'], exists[0]))
+            else:
+                cursor.execute("INSERT INTO FileManager (experiment_id, run_number, number_of_files, total_size_bytes) VALUES (?, ?, ?, ?)",
+                               (experiment_id, run, row['Number of Files'], row['Total Size (bytes)']))
+    conn.commit()
+
+def count_rows(files):
+    total = 0
+    for file_path in files:
+        with open(file_path) as f:
+            total += sum(1 for _ in f) - 1
+    return total
+
+def timed(label, files, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    rows = count_rows(files)
+    print(f"{label:<8} {rows:>9} rows  {elapsed:8.2f}s  {rows / elapsed:>10.0f} rows/s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare legacy and upsert update throughput.")
+    parser.add_argument('--experiments', type=int, default=50, help="Experiments in the synthetic database")
+    parser.add_argument('--runs', type=int, default=200, help="Runs per experiment")
+    parser.add_argument('--entries', type=int, default=20, help="Logbook entries per run")
+    parser.add_argument('--update', type=int, default=5, help="Experiments to ingest again")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix='bench_update_db.')
+    try:
+        files = {}
+        for index in range(args.experiments):
+            experiment_id = f'exp{index:04d}'
+            files[experiment_id] = write_files(workdir, experiment_id, args.runs, args.entries)
+
+        base = os.path.join(workdir, 'base.db')
+        manager = ExperimentDBManager(base)
+        for experiment_files in files.values():
+            for file_path in experiment_files:
+                manager.process_file(file_path)
+        manager.close()
+        total = sqlite3.connect(base).execute('SELECT COUNT(*) FROM Logbook').fetchone()[0]
+        print(f"Synthetic database: {args.experiments} experiments, {total} logbook entries")
+
+        update_files = [path for experiment_id in sorted(files)[:args.update] for path in files[experiment_id]]
+
+        def run_insert():
+            manager = ExperimentDBManager(os.path.join(workdir, 'insert.db'))
+            for file_path in update_files:
+                manager.process_file(file_path)
+            manager.close()
+
+        def run_legacy():
+            db = os.path.join(workdir, 'legacy.db')
+            shutil.copy(base, db)
+            conn = sqlite3.connect(db)
+            for file_path in update_files:
+                legacy_update(conn, file_path)
+            conn.close()
+
+        def run_upsert():
+            db = os.path.join(workdir, 'upsert.db')
+            shutil.copy(base, db)
+            updater = DatabaseUpdater(db)
+            for file_path in update_files:
+                updater.process_file(file_path)
+            updater.close()
+
+        timed('insert', update_files, run_insert)
+        timed('legacy', update_files, run_legacy)
+        timed('upsert', update_files, run_upsert)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+CPU time of the row and vectorized ingest engines on a synthetic logbook.
+
+A logbook CSV with ``--rows`` entries is generated, with a run number on
+every ``--entries``-th row as on the real pages.  Each engine is timed twice:
+normalizing the file into row batches only, and a full ingest into a fresh
+database with the ``--profile`` connection profile (which adds the SQLite
+writes both engines share).
+
+    python benchmarks/bench_vectorized_ingest.py --rows 1000000
+    python benchmarks/bench_vectorized_ingest.py --rows 1000000 --profile bulk-load
+"""
+
+import argparse
+import csv
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from elog_crawler.db_profiles import PROFILES
+from elog_crawler.save_to_db import ExperimentDBManager, group_records, logbook_records, parse_csv
+from elog_crawler.vectorized import group_file
+
+def write_logbook(file_path, rows, entries):
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Posted', 'Run', 'Content', 'Tags', 'Author'])
+        for index in range(rows):
+            seconds = index * 7
+            posted = f'2024-{1 + seconds // 2592000 % 12:02d}-{1 + seconds // 86400 % 28:02d} ' \
+                     f'{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'
+            writer.writerow([posted, index // entries + 1 if index % entries == 0 else '',
+                             f'Entry {index}: ' + 'x' * 120, 'tag', f'user{index % 7}'])
+
+def timed(label, run):
+    wall, cpu = time.perf_counter(), time.process_time()
+    rows = run()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"{label:<22} {rows:>9} rows  {wall:8.2f}s wall  {cpu:8.2f}s cpu  {rows / cpu:>10.0f} rows/cpu-s")
+    return cpu
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the row and vectorized ingest engines.")
+    parser.add_argument('--rows', type=int, default=1000000, help="Logbook entries to generate")
+    parser.add_argument('--entries', type=int, default=20, help="Logbook entries per run")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='default', help="Connection profile of the ingest runs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix='bench_vectorized_ingest.')
+    try:
+        logbook = os.path.join(workdir, 'exp0001.logbook.csv')
+        write_logbook(logbook, args.rows, args.entries)
+
+        def normalize_rows():
+            grouped = group_records(logbook_records('exp0001', parse_csv(logbook)))
+            return len(grouped[('Logbook', 'IGNORE')])
+
+        def normalize_vectorized():
+            grouped = group_file(logbook, 'logbook', 'exp0001')
+            return len(grouped[('Logbook', 'IGNORE')])
+
+        def ingest(engine):
+            def run():
+                manager = ExperimentDBManager(os.path.join(workdir, f'{engine}.db'), profile=args.profile, engine=engine)
+                manager.process_file(logbook)
+                manager.close()
+                return manager.metrics.rows()
+            return run
+
+        rows_cpu = timed('normalize  rows', normalize_rows)
+        vectorized_cpu = timed('normalize  vectorized', normalize_vectorized)
+        print(f"normalize speedup: {rows_cpu / vectorized_cpu:.1f}x cpu")
+        rows_cpu = timed('ingest     rows', ingest('rows'))
+        vectorized_cpu = timed('ingest     vectorized', ingest('vectorized'))
+        print(f"ingest speedup:    {rows_cpu / vectorized_cpu:.1f}x cpu")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,31 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
 
-import pandas as pd
 import argparse
+import csv
 import time
 from .credential_store import CredentialStore
+from .outputs import write_parquet, LOGBOOK_COLUMNS
+from .profiles import ProfilePool
+from .follow import follow, make_sink, logbook_snapshot, logbook_key
+from .network_capture import NetworkCapture, enable_performance_logging, logbook_rows_from_payloads, page_local_times
+
+def setup_driver(headless=True, backend='selenium', capture_network=False, profile_dir=None):
+    if backend == 'cdp':
+        from .cdp_driver import setup_cdp_driver
+        return setup_cdp_driver(headless=headless, capture_network=capture_network, user_data_dir=profile_dir)
 
-def setup_driver(headless=True):
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920x1080")
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    if capture_network:
+        enable_performance_logging(chrome_options)
+    from webdriver_manager.chrome import ChromeDriverManager
     service = Service(ChromeDriverManager().install())
     return webdriver.Chrome(service=service, options=chrome_options)
 
@@ -83,8 +95,10 @@ def get_element_text(parent_element, css_selector):
     except NoSuchElementException:
         return ''
 
-def process_experiment(driver, experiment_id, username, password):
+def process_experiment(driver, experiment_id, username, password, capture=False, compact=False):
     print(f"Processing experiment: {experiment_id}")
+    network = NetworkCapture(driver) if capture else None
+    started = time.time()
     driver.get(f'https://pswww.slac.stanford.edu/lgbk/lgbk/{experiment_id}/eLog')
 
     login_if_necessary(driver, username, password)
@@ -94,15 +108,46 @@ def process_experiment(driver, experiment_id, username, password):
         return
 
     try:
-        scroll_to_bottom(driver)
-        data = extract_data(driver)
+        data = None
+        if network:
+            local_times = page_local_times(driver)
+            data = network.wait(lambda payloads: logbook_rows_from_payloads(payloads, local_times))
+            if data is None:
+                print(f"No eLog payload captured for experiment {experiment_id}; scraping the page instead.")
+        if data is None:
+            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.edat')))
+        print(f"Time to first row for experiment {experiment_id}: {time.time() - started:.2f}s")
+        if data is None:
+            scroll_to_bottom(driver)
+            data = extract_data(driver)
         for entry in data:
             print(entry)
-        save_to_csv(data, experiment_id)
+        if compact:
+            save_to_parquet(data, experiment_id)
+        else:
+            save_to_csv(data, experiment_id)
+        return data
     except TimeoutException:
         print(f"Timed out waiting for the content to load for experiment {experiment_id}.")
         driver.save_screenshot(f'timeout_screenshot_{experiment_id}.png')
 
+def follow_experiment(driver, experiment_id, username, password, db_name=None, poll_interval=30, refresh_every=0):
+    driver.get(f'https://pswww.slac.stanford.edu/lgbk/lgbk/{experiment_id}/eLog')
+
+    login_if_necessary(driver, username, password)
+
+    if is_404_page(driver):
+        print(f"Experiment {experiment_id} not found (404 error). Skipping...")
+        return
+
+    try:
+        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.edat')))
+    except TimeoutException:
+        print(f"No logbook entries yet for experiment {experiment_id}.")
+
+    follow(driver, logbook_snapshot, logbook_key, make_sink(experiment_id, 'logbook', db_name),
+           poll_interval=poll_interval, refresh_every=refresh_every)
+
 def extract_data(driver):
     entries = WebDriverWait(driver, 30).until(
         EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.edat'))
@@ -121,17 +166,36 @@ def extract_data(driver):
     return data
 
 def save_to_csv(data, experiment_id):
-    df = pd.DataFrame(data, columns=['Posted', 'Run', 'Content', 'Tags', 'Author'])
     filename = f'{experiment_id}.logbook.csv'
-    df.to_csv(filename, index=False)
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Posted', 'Run', 'Content', 'Tags', 'Author'])
+        writer.writerows(data)
+    print(f"Data saved to {filename}")
+
+def save_to_parquet(data, experiment_id):
+    filename = f'{experiment_id}.logbook.parquet'
+    write_parquet(data, LOGBOOK_COLUMNS, filename)
     print(f"Data saved to {filename}")
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Crawl experiment logbook.')
     parser.add_argument('experiments', nargs='+', help='Experiment IDs (space-separated)')
     parser.add_argument('--reset-credentials', action='store_true', help='Reset saved credentials')
     parser.add_argument('--gui', action='store_true', help='Run with GUI (non-headless mode)')
-    args = parser.parse_args()
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default='selenium', help='Browser driver backend (cdp talks to Chrome over the DevTools websocket)')
+    parser.add_argument('--follow', action='store_true', help='Keep the page open and emit only new rows as they appear (one experiment)')
+    parser.add_argument('--poll-interval', type=float, default=30, help='Seconds between polls in --follow mode')
+    parser.add_argument('--refresh-every', type=int, default=0, help='In --follow mode, reload the page every N polls (0: never)')
+    parser.add_argument('--db', help='In --follow mode, write new rows to this existing database instead of printing NDJSON')
+    parser.add_argument('--compact', action='store_true', help='Write Parquet (tables) or gzip NDJSON (documents) instead of CSV/JSON')
+    parser.add_argument('--profile-dir', help='Keep reusable browser profiles (disk cache, cookies) under this directory')
+    parser.add_argument('--profile-max-mb', type=int, default=2048, help='Evict idle profiles once the profile directory exceeds this size')
+    parser.add_argument('--capture', action='store_true', help='Build output from the JSON responses the page fetches, falling back to scraping the page')
+    args = parser.parse_args(argv)
+
+    if args.follow and len(args.experiments) != 1:
+        parser.error('--follow takes exactly one experiment')
 
     store = CredentialStore()
 
@@ -141,11 +205,18 @@ def main():
 
     username, password = store.get_credentials()
 
-    driver = setup_driver(headless=not args.gui)
+    profile_pool = ProfilePool(args.profile_dir, max_bytes=args.profile_max_mb * 1024 ** 2) if args.profile_dir else None
+    profile = profile_pool.acquire() if profile_pool else None
+
+    driver = setup_driver(headless=not args.gui, backend=args.backend, profile_dir=profile.path if profile else None, capture_network=args.capture)
 
     try:
         for experiment_id in args.experiments:
-            process_experiment(driver, experiment_id, username, password)
+            if args.follow:
+                follow_experiment(driver, experiment_id, username, password, db_name=args.db,
+                                  poll_interval=args.poll_interval, refresh_every=args.refresh_every)
+            else:
+                process_experiment(driver, experiment_id, username, password, capture=args.capture, compact=args.compact)
     except TimeoutException:
         print("Timed out waiting for the content to load.")
         driver.save_screenshot('timeout_screenshot.png')
@@ -153,6 +224,9 @@ def main():
     finally:
         input("Press Enter to close the browser...")
         driver.quit()
+        if profile:
+            profile_pool.release(profile)
+            profile_pool.evict()
 
 if __name__ == "__main__":
     main()
@@ -5,19 +5,27 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
 
 import json
 import argparse
 import time
 from .credential_store import CredentialStore
+from .outputs import write_ndjson_gz, document_records
+from .profiles import ProfilePool
+
+def setup_driver(headless=True, backend='selenium', profile_dir=None):
+    if backend == 'cdp':
+        from .cdp_driver import setup_cdp_driver
+        return setup_cdp_driver(headless=headless, user_data_dir=profile_dir)
 
-def setup_driver(headless=True):
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920x1080")
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    from webdriver_manager.chrome import ChromeDriverManager
     service = Service(ChromeDriverManager().install())
     return webdriver.Chrome(service=service, options=chrome_options)
 
@@ -176,8 +184,9 @@ def extract_main_content(driver):
         print(f"Error extracting main content: {str(e)}")
         return "Unable to extract main content"
 
-def process_experiment(driver, experiment_id, username, password):
+def process_experiment(driver, experiment_id, username, password, compact=False):
     print(f"Processing experiment: {experiment_id}")
+    started = time.time()
     driver.get(f'https://pswww.slac.stanford.edu/lgbk/lgbk/{experiment_id}/info')
 
     login_if_necessary(driver, username, password)
@@ -190,6 +199,7 @@ def process_experiment(driver, experiment_id, username, password):
     try:
         # Always extract main content
         experiment_data["main_content"] = extract_main_content(driver)
+        print(f"Time to first row for experiment {experiment_id}: {time.time() - started:.2f}s")
 
         available_tabs = get_available_tabs(driver)
         print(f"Available tabs for experiment {experiment_id}: {available_tabs}")
@@ -215,7 +225,11 @@ def process_experiment(driver, experiment_id, username, password):
         print(f"Unexpected error occurred while processing experiment {experiment_id}: {str(e)}")
         experiment_data["error"] = f"Unexpected error: {str(e)}"
 
-    save_to_json(experiment_data, experiment_id)
+    if compact:
+        save_to_ndjson(experiment_data, experiment_id)
+    else:
+        save_to_json(experiment_data, experiment_id)
+    return experiment_data
 
 def save_to_json(data, experiment_id):
     filename = f'{experiment_id}.info.json'
@@ -223,12 +237,21 @@ def save_to_json(data, experiment_id):
         json.dump(data, f, indent=2)
     print(f"Data saved to {filename}")
 
-def main():
+def save_to_ndjson(data, experiment_id):
+    filename = f'{experiment_id}.info.ndjson.gz'
+    write_ndjson_gz(document_records(data), filename)
+    print(f"Data saved to {filename}")
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Crawl experiment info page.')
     parser.add_argument('experiments', nargs='+', help='Experiment IDs (space-separated)')
     parser.add_argument('--reset-credentials', action='store_true', help='Reset saved credentials')
     parser.add_argument('--gui', action='store_true', help='Run with GUI (non-headless mode)')
-    args = parser.parse_args()
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default='selenium', help='Browser driver backend (cdp talks to Chrome over the DevTools websocket)')
+    parser.add_argument('--compact', action='store_true', help='Write Parquet (tables) or gzip NDJSON (documents) instead of CSV/JSON')
+    parser.add_argument('--profile-dir', help='Keep reusable browser profiles (disk cache, cookies) under this directory')
+    parser.add_argument('--profile-max-mb', type=int, default=2048, help='Evict idle profiles once the profile directory exceeds this size')
+    args = parser.parse_args(argv)
 
     store = CredentialStore()
 
@@ -238,17 +261,23 @@ def main():
 
     username, password = store.get_credentials()
 
-    driver = setup_driver(headless=not args.gui)
+    profile_pool = ProfilePool(args.profile_dir, max_bytes=args.profile_max_mb * 1024 ** 2) if args.profile_dir else None
+    profile = profile_pool.acquire() if profile_pool else None
+
+    driver = setup_driver(headless=not args.gui, backend=args.backend, profile_dir=profile.path if profile else None)
 
     try:
         for experiment_id in args.experiments:
-            process_experiment(driver, experiment_id, username, password)
+            process_experiment(driver, experiment_id, username, password, compact=args.compact)
     except TimeoutException:
         print("Timed out waiting for the content to load.")
         driver.save_screenshot('timeout_screenshot.png')
     finally:
         input("Press Enter to close the browser...")
         driver.quit()
+        if profile:
+            profile_pool.release(profile)
+            profile_pool.evict()
 
 if __name__ == "__main__":
     main()
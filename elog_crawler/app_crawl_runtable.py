@@ -5,19 +5,31 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
 
 import json
 import argparse
 import time
 from .credential_store import CredentialStore
+from .outputs import write_parquet, write_ndjson_gz, document_records, data_production_columns
+from .profiles import ProfilePool
+from .follow import follow, make_sink, runtable_snapshot, runtable_key
+from .network_capture import NetworkCapture, enable_performance_logging, runtable_rows_from_payloads
+
+def setup_driver(headless=True, backend='selenium', capture_network=False, profile_dir=None):
+    if backend == 'cdp':
+        from .cdp_driver import setup_cdp_driver
+        return setup_cdp_driver(headless=headless, capture_network=capture_network, user_data_dir=profile_dir)
 
-def setup_driver(headless=True):
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920x1080")
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    if capture_network:
+        enable_performance_logging(chrome_options)
+    from webdriver_manager.chrome import ChromeDriverManager
     service = Service(ChromeDriverManager().install())
     return webdriver.Chrome(service=service, options=chrome_options)
 
@@ -176,8 +188,26 @@ def extract_detectors(driver):
         print(f"Error extracting data from Detectors tab: {str(e)}")
         return None
 
-def process_experiment(driver, experiment_id, username, password):
+def extract_captured_table(driver, network, tab_name, checkbox=False):
+    """Rows for a run table tab built from the payloads fetched after clicking it."""
+    start = network.mark()
+    try:
+        tab = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, f"//a[contains(text(), '{tab_name}')]"))
+        )
+        tab.click()
+    except TimeoutException:
+        return None
+    builder = lambda payloads: runtable_rows_from_payloads(network.payloads, payloads, tab_name, checkbox=checkbox)
+    rows = network.wait(builder, start=start, timeout=5)
+    if rows is None:
+        print(f"No {tab_name} payload captured; scraping the page instead.")
+    return rows
+
+def process_experiment(driver, experiment_id, username, password, capture=False, compact=False):
     print(f"Processing experiment: {experiment_id}")
+    network = NetworkCapture(driver) if capture else None
+    started = time.time()
     driver.get(f'https://pswww.slac.stanford.edu/lgbk/lgbk/{experiment_id}/runTables')
 
     login_if_necessary(driver, username, password)
@@ -192,14 +222,19 @@ def process_experiment(driver, experiment_id, username, password):
         print(f"Available tabs for experiment {experiment_id}: {available_tabs}")
 
         if "Data Production" in available_tabs:
-            data_production = extract_data_production(driver)
+            data_production = extract_captured_table(driver, network, "Data Production") if network else None
+            if data_production is None:
+                data_production = extract_data_production(driver)
             if data_production:
+                print(f"Time to first row for experiment {experiment_id}: {time.time() - started:.2f}s")
                 experiment_data["Data Production"] = data_production
             else:
                 print("Failed to extract data from Data Production tab.")
 
         if "Detectors" in available_tabs:
-            detectors = extract_detectors(driver)
+            detectors = extract_captured_table(driver, network, "Detectors", checkbox=True) if network else None
+            if detectors is None:
+                detectors = extract_detectors(driver)
             if detectors:
                 experiment_data["Detectors"] = detectors
             else:
@@ -219,7 +254,31 @@ def process_experiment(driver, experiment_id, username, password):
         print(f"Unexpected error occurred while processing experiment {experiment_id}: {str(e)}")
         experiment_data["error"] = f"Unexpected error: {str(e)}"
 
-    save_to_json(experiment_data, experiment_id)
+    if compact:
+        save_compact(experiment_data, experiment_id)
+    else:
+        save_to_json(experiment_data, experiment_id)
+    return experiment_data
+
+def show_data_production(driver):
+    tab = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Data Production')]"))
+    )
+    tab.click()
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "rtbl_content")))
+
+def follow_experiment(driver, experiment_id, username, password, db_name=None, poll_interval=30, refresh_every=0):
+    driver.get(f'https://pswww.slac.stanford.edu/lgbk/lgbk/{experiment_id}/runTables')
+
+    login_if_necessary(driver, username, password)
+
+    if is_404_page(driver):
+        print(f"Experiment {experiment_id} not found (404 error). Skipping...")
+        return
+
+    show_data_production(driver)
+    follow(driver, runtable_snapshot, runtable_key, make_sink(experiment_id, 'runtable', db_name),
+           poll_interval=poll_interval, refresh_every=refresh_every, prepare=show_data_production)
 
 def save_to_json(data, experiment_id):
     filename = f'{experiment_id}.runtable.json'
@@ -227,12 +286,36 @@ def save_to_json(data, experiment_id):
         json.dump(data, f, indent=2)
     print(f"Data saved to {filename}")
 
-def main():
+def save_compact(data, experiment_id):
+    """Data Production as typed Parquet; the rest of the run table as gzip NDJSON."""
+    data = dict(data)
+    data_production = data.pop("Data Production", None)
+    if data_production:
+        filename = f'{experiment_id}.data_production.parquet'
+        write_parquet(data_production, data_production_columns(data_production), filename)
+        print(f"Data saved to {filename}")
+    filename = f'{experiment_id}.runtable.ndjson.gz'
+    write_ndjson_gz(document_records(data), filename)
+    print(f"Data saved to {filename}")
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Crawl experiment runtable page.')
     parser.add_argument('experiments', nargs='+', help='Experiment IDs (space-separated)')
     parser.add_argument('--reset-credentials', action='store_true', help='Reset saved credentials')
     parser.add_argument('--gui', action='store_true', help='Run with GUI (non-headless mode)')
-    args = parser.parse_args()
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default='selenium', help='Browser driver backend (cdp talks to Chrome over the DevTools websocket)')
+    parser.add_argument('--follow', action='store_true', help='Keep the page open and emit only new rows as they appear (one experiment)')
+    parser.add_argument('--poll-interval', type=float, default=30, help='Seconds between polls in --follow mode')
+    parser.add_argument('--refresh-every', type=int, default=0, help='In --follow mode, reload the page every N polls (0: never)')
+    parser.add_argument('--db', help='In --follow mode, write new rows to this existing database instead of printing NDJSON')
+    parser.add_argument('--compact', action='store_true', help='Write Parquet (tables) or gzip NDJSON (documents) instead of CSV/JSON')
+    parser.add_argument('--profile-dir', help='Keep reusable browser profiles (disk cache, cookies) under this directory')
+    parser.add_argument('--profile-max-mb', type=int, default=2048, help='Evict idle profiles once the profile directory exceeds this size')
+    parser.add_argument('--capture', action='store_true', help='Build output from the JSON responses the page fetches, falling back to scraping the page')
+    args = parser.parse_args(argv)
+
+    if args.follow and len(args.experiments) != 1:
+        parser.error('--follow takes exactly one experiment')
 
     store = CredentialStore()
 
@@ -242,17 +325,27 @@ def main():
 
     username, password = store.get_credentials()
 
-    driver = setup_driver(headless=not args.gui)
+    profile_pool = ProfilePool(args.profile_dir, max_bytes=args.profile_max_mb * 1024 ** 2) if args.profile_dir else None
+    profile = profile_pool.acquire() if profile_pool else None
+
+    driver = setup_driver(headless=not args.gui, backend=args.backend, profile_dir=profile.path if profile else None, capture_network=args.capture)
 
     try:
         for experiment_id in args.experiments:
-            process_experiment(driver, experiment_id, username, password)
+            if args.follow:
+                follow_experiment(driver, experiment_id, username, password, db_name=args.db,
+                                  poll_interval=args.poll_interval, refresh_every=args.refresh_every)
+            else:
+                process_experiment(driver, experiment_id, username, password, capture=args.capture, compact=args.compact)
     except TimeoutException:
         print("Timed out waiting for the content to load.")
         driver.save_screenshot('timeout_screenshot.png')
     finally:
         input("Press Enter to close the browser...")
         driver.quit()
+        if profile:
+            profile_pool.release(profile)
+            profile_pool.evict()
 
 if __name__ == "__main__":
     main()
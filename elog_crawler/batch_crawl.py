@@ -0,0 +1,150 @@
+import sqlite3
+import argparse
+import importlib
+import json
+import threading
+import time
+
+from .credential_store import CredentialStore
+from .profiles import ProfilePool
+from .schema import migrate
+from .scheduler import PAGE_TYPES, make_jobs, jobs_for_pages, assign_lpt, record_crawl, format_report
+
+PAGE_MODULES = {
+    'logbook'     : 'elog_crawler.app_crawl_elog',
+    'file_manager': 'elog_crawler.app_crawl_file_manager',
+    'info'        : 'elog_crawler.app_crawl_info',
+    'runtable'    : 'elog_crawler.app_crawl_runtable',
+}
+
+def count_rows(data):
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        return sum(len(value) for value in data.values() if isinstance(value, (list, dict)))
+    return 0
+
+def open_drivers(n_workers, headless, backend, capture, profile_pool=None):
+    """
+    One driver per worker; with the cdp backend they are pages of a single
+    browser.  Returns the drivers and the profiles they hold.
+    """
+    if backend == 'cdp':
+        from .cdp_driver import CDPBrowser
+        profiles = [profile_pool.acquire()] if profile_pool else []
+        browser = CDPBrowser(headless=headless, user_data_dir=profiles[0].path if profiles else None).start()
+        drivers = [browser.new_driver() for _ in range(n_workers)]
+        drivers[0].owns_browser = True
+        if capture:
+            for driver in drivers:
+                driver.enable_performance_log()
+        return drivers, profiles
+    setup_driver = importlib.import_module(PAGE_MODULES['logbook']).setup_driver
+    profiles = [profile_pool.acquire() for _ in range(n_workers)] if profile_pool else [None] * n_workers
+    drivers = [setup_driver(headless=headless, capture_network=capture, profile_dir=profile.path if profile else None)
+               for profile in profiles]
+    return drivers, [profile for profile in profiles if profile]
+
+def crawl_worker(worker, driver, jobs, username, password, capture, compact, results):
+    for job in jobs:
+        module = importlib.import_module(PAGE_MODULES[job.page_type])
+        kwargs = {'compact': compact}
+        if capture and job.page_type != 'info':
+            kwargs['capture'] = True
+        started_at = time.time()
+        error = None
+        try:
+            data = module.process_experiment(driver, job.experiment_id, username, password, **kwargs)
+            if data is None:
+                error = 'no data'
+            elif isinstance(data, dict) and data.get('error'):
+                # The info and run table crawlers report a failed page in the document they return
+                error = data['error']
+        except Exception as e:
+            data, error = None, str(e)
+        status = 'failed' if error else 'ok'
+        if error:
+            print(f"Worker {worker}: {job.page_type} for {job.experiment_id} failed: {error}")
+        duration = time.time() - started_at
+        print(f"Worker {worker}: {job.page_type} for {job.experiment_id} took {duration:.1f}s (predicted {job.cost:.1f}s)")
+        results.append((worker, job, started_at, duration, count_rows(data), status, error))
+
+def run_batch(jobs, n_workers, username, password, headless=True, backend='selenium', capture=False, compact=False, profile_pool=None):
+    assignments, predicted = assign_lpt(jobs, n_workers)
+    busy = [(worker_jobs, load) for worker_jobs, load in zip(assignments, predicted) if worker_jobs]
+    assignments = [worker_jobs for worker_jobs, _ in busy]
+    predicted = [load for _, load in busy]
+
+    drivers, profiles = open_drivers(len(assignments), headless, backend, capture, profile_pool)
+    results = []
+    start = time.time()
+    threads = [threading.Thread(target=crawl_worker, args=(worker, driver, worker_jobs, username, password, capture, compact, results))
+               for worker, (driver, worker_jobs) in enumerate(zip(drivers, assignments))]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        # The driver owning a shared cdp browser goes last so the other pages close first.
+        for driver in sorted(drivers, key=lambda driver: getattr(driver, 'owns_browser', False)):
+            driver.quit()
+        if profile_pool:
+            for profile in profiles:
+                profile_pool.release(profile)
+            profile_pool.evict()
+    return assignments, predicted, results, time.time() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Crawl many experiments with a pool of workers, longest expected jobs first.')
+    parser.add_argument('experiments', nargs='*', help='Experiment IDs (space-separated)')
+    parser.add_argument('--manifest', help="Crawl the pages listed in a manifest written by 'elog-crawler plan'")
+    parser.add_argument('--due', action='store_true', help='Only crawl pages the freshness policy says are due (default: all known experiments)')
+    parser.add_argument('--force', action='store_true', help='With --due, also crawl pages that are not due')
+    parser.add_argument('--pages', nargs='+', choices=PAGE_TYPES, default=list(PAGE_TYPES), help='Page types to crawl')
+    parser.add_argument('--workers', type=int, default=4, help='Number of browser workers')
+    parser.add_argument('--db', default='experiment_database.db', help='Experiment database used for cost history')
+    parser.add_argument('--gui', action='store_true', help='Run with GUI (non-headless mode)')
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default='selenium', help='Browser driver backend')
+    parser.add_argument('--capture', action='store_true', help='Build output from captured JSON responses where possible')
+    parser.add_argument('--compact', action='store_true', help='Write Parquet (tables) or gzip NDJSON (documents) instead of CSV/JSON')
+    parser.add_argument('--profile-dir', help='Keep reusable browser profiles (disk cache, cookies) under this directory, one per worker')
+    parser.add_argument('--profile-max-mb', type=int, default=2048, help='Evict idle profiles once the profile directory exceeds this size')
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    migrate(conn)
+    if args.manifest:
+        with open(args.manifest) as f:
+            jobs = jobs_for_pages(conn, [(entry['experiment_id'], entry['page_type']) for entry in json.load(f)])
+    elif args.due:
+        from .freshness import build_manifest
+        manifest = build_manifest(conn, args.experiments or None, args.pages, force=args.force)
+        jobs = jobs_for_pages(conn, [(entry['experiment_id'], entry['page_type']) for entry in manifest])
+    elif args.experiments:
+        jobs = make_jobs(conn, args.experiments, args.pages)
+    else:
+        parser.error('give experiment IDs, --manifest or --due')
+
+    if not jobs:
+        print('Nothing to crawl.')
+        conn.close()
+        return
+
+    username, password = CredentialStore().get_credentials()
+
+    assignments, predicted, results, wall_time = run_batch(
+        jobs, max(1, args.workers), username, password,
+        headless=not args.gui, backend=args.backend, capture=args.capture, compact=args.compact,
+        profile_pool=ProfilePool(args.profile_dir, max_bytes=args.profile_max_mb * 1024 ** 2) if args.profile_dir else None,
+    )
+
+    for worker, job, started_at, duration, rows, status, error in results:
+        record_crawl(conn, job, started_at, duration, rows, status, error)
+    conn.commit()
+    conn.close()
+
+    print(format_report(assignments, predicted, results, wall_time))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,538 @@
+"""
+Chrome DevTools Protocol backend for the crawlers.
+
+Instead of sending every command to chromedriver over HTTP, this backend
+launches Chrome itself and talks to it over the DevTools websocket with
+asyncio.  A ``CDPBrowser`` owns one event loop (running in a background
+thread) and one websocket; every page opened from it is a separate target
+multiplexed over that connection, so a single process can drive many pages
+concurrently:
+
+    browser = CDPBrowser(headless=True).start()
+    pages = browser.run(asyncio.gather(*(browser.new_page() for _ in range(4))))
+    browser.run(asyncio.gather(*(page.navigate(url) for page, url in zip(pages, urls))))
+
+``CDPDriver`` wraps a page in the subset of the Selenium WebDriver API the
+crawlers rely on (``get``, ``find_element(s)``, ``execute_script``,
+``switch_to.frame``, ``save_screenshot``, ...).  It raises Selenium's
+exception types, so ``process_experiment`` together with ``WebDriverWait``
+and ``expected_conditions`` works unchanged on either backend.
+
+Requires the ``websockets`` package (``pip install elog-crawler[cdp]``).
+"""
+
+import asyncio
+import base64
+import collections
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import concurrent.futures
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+OBJECT_GROUP = 'elog-crawler'
+COMMAND_TIMEOUT = 60
+
+# Resolves a Selenium locator relative to ``this`` (a window, document or element).
+QUERY_FUNCTION = '''
+function(by, value) {
+    var root = (this.nodeType === 1 || this.nodeType === 9) ? this : this.document;
+    var doc = root.ownerDocument || root;
+    switch (by) {
+        case 'css selector': return Array.from(root.querySelectorAll(value));
+        case 'id':           return Array.from(root.querySelectorAll('#' + CSS.escape(value)));
+        case 'name':         return Array.from(root.querySelectorAll('[name="' + CSS.escape(value) + '"]'));
+        case 'class name':   return Array.from(root.getElementsByClassName(value));
+        case 'tag name':     return Array.from(root.getElementsByTagName(value));
+        case 'link text':
+        case 'partial link text':
+            return Array.from(root.querySelectorAll('a')).filter(function(a) {
+                var text = a.innerText.trim();
+                return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+            });
+        case 'xpath':
+            var snapshot = doc.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) {
+                var node = snapshot.snapshotItem(i);
+                if (node.nodeType === 1) nodes.push(node);
+            }
+            return nodes;
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+}
+'''
+
+GET_ATTRIBUTE_FUNCTION = '''
+function(name) {
+    var value = this[name];
+    if (value !== undefined && value !== null && typeof value !== 'object' && typeof value !== 'function') {
+        return value;
+    }
+    return this.getAttribute(name);
+}
+'''
+
+IS_DISPLAYED_FUNCTION = '''
+function() {
+    var style = window.getComputedStyle(this);
+    if (style.display === 'none' || style.visibility === 'hidden') return false;
+    var rect = this.getBoundingClientRect();
+    return rect.width > 0 || rect.height > 0;
+}
+'''
+
+class CDPError(WebDriverException):
+    pass
+
+def find_chrome():
+    """Locate a Chrome/Chromium executable, honouring $CHROME_PATH."""
+    if os.environ.get('CHROME_PATH'):
+        return os.environ['CHROME_PATH']
+    for name in ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome'):
+        path = shutil.which(name)
+        if path:
+            return path
+    candidates = [
+        '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+        os.path.expandvars(r'%ProgramFiles%\Google\Chrome\Application\chrome.exe'),
+        os.path.expandvars(r'%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe'),
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    raise WebDriverException("Chrome executable not found. Set CHROME_PATH to its location.")
+
+class CDPConnection:
+    """A DevTools websocket shared by every target of one browser."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.next_id = 0
+        self.pending = {}
+        self.listeners = {}
+        self.reader = None
+
+    @classmethod
+    async def connect(cls, url):
+        try:
+            import websockets
+        except ImportError:
+            raise WebDriverException("The cdp backend requires the 'websockets' package: pip install websockets")
+        websocket = await websockets.connect(url, max_size=None)
+        connection = cls(websocket)
+        connection.reader = asyncio.ensure_future(connection._read_loop())
+        return connection
+
+    async def send(self, method, params=None, session_id=None):
+        self.next_id += 1
+        message = {'id': self.next_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_event_loop().create_future()
+        self.pending[self.next_id] = future
+        await self.websocket.send(json.dumps(message))
+        return await future
+
+    def on(self, session_id, method, callback):
+        self.listeners.setdefault((session_id, method), []).append(callback)
+
+    def off(self, session_id, method, callback):
+        callbacks = self.listeners.get((session_id, method), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self.pending.pop(message['id'], None)
+                    if future is None or future.done():
+                        continue
+                    if 'error' in message:
+                        future.set_exception(CDPError(message['error'].get('message', str(message['error']))))
+                    else:
+                        future.set_result(message.get('result', {}))
+                else:
+                    key = (message.get('sessionId'), message.get('method'))
+                    for callback in list(self.listeners.get(key, [])):
+                        callback(message.get('params', {}))
+        except Exception as e:
+            error = CDPError(f"DevTools connection lost: {e}")
+        else:
+            error = CDPError("DevTools connection closed.")
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+
+    async def close(self):
+        await self.websocket.close()
+        if self.reader:
+            await asyncio.gather(self.reader, return_exceptions=True)
+
+class CDPPage:
+    """Async handle on one browser tab (a DevTools target session)."""
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    async def send(self, method, params=None):
+        return await self.connection.send(method, params, session_id=self.session_id)
+
+    def on(self, method, callback):
+        self.connection.on(self.session_id, method, callback)
+
+    def off(self, method, callback):
+        self.connection.off(self.session_id, method, callback)
+
+    async def enable(self):
+        await self.send('Page.enable')
+
+    async def navigate(self, url, timeout=COMMAND_TIMEOUT):
+        loaded = asyncio.get_event_loop().create_future()
+
+        def on_load(params):
+            if not loaded.done():
+                loaded.set_result(params)
+
+        self.on('Page.loadEventFired', on_load)
+        try:
+            await self.send('Runtime.releaseObjectGroup', {'objectGroup': OBJECT_GROUP})
+            result = await self.send('Page.navigate', {'url': url})
+            if result.get('errorText'):
+                raise WebDriverException(f"Navigation to {url} failed: {result['errorText']}")
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutException(f"Timed out loading {url}")
+        finally:
+            self.off('Page.loadEventFired', on_load)
+
+    def _check(self, result):
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            description = details.get('exception', {}).get('description') or details.get('text')
+            raise JavascriptException(description)
+        return result['result']
+
+    async def evaluate(self, expression, context_id=None, return_by_value=True):
+        params = {
+            'expression'   : expression,
+            'returnByValue': return_by_value,
+            'awaitPromise' : True,
+            'objectGroup'  : OBJECT_GROUP,
+        }
+        if context_id is not None:
+            params['contextId'] = context_id
+        return self._check(await self.send('Runtime.evaluate', params))
+
+    async def call_function(self, object_id, declaration, arguments=(), return_by_value=True):
+        try:
+            result = await self.send('Runtime.callFunctionOn', {
+                'objectId'           : object_id,
+                'functionDeclaration': declaration,
+                'arguments'          : list(arguments),
+                'returnByValue'      : return_by_value,
+                'awaitPromise'       : True,
+                'objectGroup'        : OBJECT_GROUP,
+            })
+        except CDPError as e:
+            if 'Could not find object' in str(e) or 'Cannot find context' in str(e):
+                raise StaleElementReferenceException(str(e))
+            raise
+        return self._check(result)
+
+    async def array_items(self, array):
+        """Object ids of the elements of a remote array."""
+        object_id = array.get('objectId')
+        if not object_id:
+            return []
+        result = await self.send('Runtime.getProperties', {'objectId': object_id, 'ownProperties': True})
+        items = [(int(prop['name']), prop['value']['objectId'])
+                 for prop in result.get('result', [])
+                 if prop['name'].isdigit() and 'objectId' in prop.get('value', {})]
+        await self.send('Runtime.releaseObject', {'objectId': object_id})
+        return [object_id for _, object_id in sorted(items)]
+
+    async def query(self, by, value, root_object_id=None, context_id=None):
+        if root_object_id:
+            array = await self.call_function(root_object_id, QUERY_FUNCTION,
+                                             [{'value': by}, {'value': value}], return_by_value=False)
+        else:
+            expression = f'({QUERY_FUNCTION}).call(window, {json.dumps(by)}, {json.dumps(value)})'
+            array = await self.evaluate(expression, context_id=context_id, return_by_value=False)
+        return await self.array_items(array)
+
+    async def frame_context(self, object_id):
+        """Execution context for the document inside an iframe element."""
+        node = (await self.send('DOM.describeNode', {'objectId': object_id}))['node']
+        frame_id = node.get('frameId')
+        if not frame_id:
+            raise WebDriverException("Element is not a frame.")
+        result = await self.send('Page.createIsolatedWorld', {'frameId': frame_id, 'worldName': OBJECT_GROUP})
+        return result['executionContextId']
+
+    async def insert_text(self, text):
+        await self.send('Input.insertText', {'text': text})
+
+    async def screenshot(self):
+        result = await self.send('Page.captureScreenshot', {'format': 'png'})
+        return base64.b64decode(result['data'])
+
+    async def close(self):
+        await self.connection.send('Target.closeTarget', {'targetId': self.target_id})
+
+class CDPBrowser:
+    """A Chrome process plus the event loop and websocket that drive it."""
+
+    def __init__(self, headless=True, chrome_path=None, user_data_dir=None, extra_args=()):
+        self.headless = headless
+        self.chrome_path = chrome_path
+        self.user_data_dir = user_data_dir
+        self.extra_args = list(extra_args)
+        self.owns_user_data_dir = user_data_dir is None
+        self.process = None
+        self.connection = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def start(self, timeout=30):
+        if self.owns_user_data_dir:
+            self.user_data_dir = tempfile.mkdtemp(prefix='elog-crawler-cdp-')
+        port_file = os.path.join(self.user_data_dir, 'DevToolsActivePort')
+        if os.path.exists(port_file):
+            os.remove(port_file)
+
+        args = [
+            self.chrome_path or find_chrome(),
+            '--remote-debugging-port=0',
+            f'--user-data-dir={self.user_data_dir}',
+            '--no-first-run',
+            '--no-default-browser-check',
+        ]
+        if self.headless:
+            args += ['--headless=new', '--disable-gpu', '--window-size=1920,1080']
+        args += self.extra_args + ['about:blank']
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.time() + timeout
+        while True:
+            if os.path.exists(port_file):
+                with open(port_file) as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    break
+            if self.process.poll() is not None or time.time() > deadline:
+                self.quit()
+                raise WebDriverException("Chrome did not expose a DevTools endpoint.")
+            time.sleep(0.1)
+
+        self.thread.start()
+        url = f'ws://127.0.0.1:{lines[0]}{lines[1]}'
+        self.connection = self.run(CDPConnection.connect(url))
+        return self
+
+    def run(self, coroutine, timeout=COMMAND_TIMEOUT):
+        """Run a coroutine on the browser's event loop and wait for its result."""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutException("Timed out waiting for the browser to respond.")
+
+    async def new_page(self):
+        target = await self.connection.send('Target.createTarget', {'url': 'about:blank'})
+        attached = await self.connection.send('Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True})
+        page = CDPPage(self.connection, target['targetId'], attached['sessionId'])
+        await page.enable()
+        return page
+
+    def new_driver(self, owns_browser=False):
+        return CDPDriver(self, self.run(self.new_page()), owns_browser=owns_browser)
+
+    def quit(self):
+        if self.connection is not None:
+            try:
+                self.run(self.connection.close(), timeout=5)
+            except Exception:
+                pass
+            self.connection = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(5)
+        if self.owns_user_data_dir and self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+class CDPElement:
+    def __init__(self, driver, object_id):
+        self.driver = driver
+        self.object_id = object_id
+
+    def _call(self, declaration, *args):
+        arguments = [{'value': arg} for arg in args]
+        result = self.driver._run(self.driver.page.call_function(self.object_id, declaration, arguments))
+        return result.get('value')
+
+    @property
+    def text(self):
+        return self._call('function() { return this.innerText; }') or ''
+
+    @property
+    def tag_name(self):
+        return self._call('function() { return this.tagName.toLowerCase(); }')
+
+    def get_attribute(self, name):
+        return self._call(GET_ATTRIBUTE_FUNCTION, name)
+
+    def is_displayed(self):
+        return bool(self._call(IS_DISPLAYED_FUNCTION))
+
+    def is_enabled(self):
+        return not self._call('function() { return !!this.disabled; }')
+
+    def click(self):
+        self._call("function() { this.scrollIntoView({block: 'center', inline: 'center'}); this.click(); }")
+
+    def send_keys(self, *values):
+        self._call('function() { this.focus(); }')
+        for value in values:
+            self.driver._run(self.driver.page.insert_text(str(value)))
+
+    def find_elements(self, by, value):
+        return self.driver._find(by, value, root_object_id=self.object_id)
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+        return elements[0]
+
+class CDPSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def frame(self, frame_reference):
+        if not isinstance(frame_reference, CDPElement):
+            frame_reference = self.driver.find_element('css selector', f'iframe[name="{frame_reference}"], iframe#{frame_reference}')
+        self.driver.context_id = self.driver._run(self.driver.page.frame_context(frame_reference.object_id))
+
+    def default_content(self):
+        self.driver.context_id = None
+
+class CDPDriver:
+    """Selenium-compatible facade over a ``CDPPage``."""
+
+    def __init__(self, browser, page, owns_browser=False):
+        self.browser = browser
+        self.page = page
+        self.owns_browser = owns_browser
+        self.context_id = None
+        self.switch_to = CDPSwitchTo(self)
+        self.performance_log = collections.deque()
+
+    def enable_performance_log(self):
+        """Record Network events in the same shape as chromedriver's performance log."""
+        def record(method):
+            def callback(params):
+                message = json.dumps({'message': {'method': method, 'params': params}})
+                self.performance_log.append({'level': 'INFO', 'message': message, 'timestamp': int(time.time() * 1000)})
+            return callback
+
+        for method in ('Network.requestWillBeSent', 'Network.responseReceived',
+                       'Network.loadingFinished', 'Network.loadingFailed'):
+            self.page.on(method, record(method))
+        self._run(self.page.send('Network.enable'))
+
+    def get_log(self, log_type):
+        if log_type != 'performance':
+            return []
+        entries = []
+        while self.performance_log:
+            entries.append(self.performance_log.popleft())
+        return entries
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self._run(self.page.send(cmd, cmd_args))
+
+    def _run(self, coroutine):
+        return self.browser.run(coroutine)
+
+    def _find(self, by, value, root_object_id=None):
+        object_ids = self._run(self.page.query(by, value, root_object_id, self.context_id))
+        return [CDPElement(self, object_id) for object_id in object_ids]
+
+    def get(self, url):
+        self.context_id = None
+        self._run(self.page.navigate(url))
+
+    def refresh(self):
+        self.get(self.current_url)
+
+    @property
+    def current_url(self):
+        return self._run(self.page.evaluate('window.location.href'))['value']
+
+    def find_elements(self, by, value):
+        return self._find(by, value)
+
+    def find_element(self, by, value):
+        elements = self._find(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        declaration = 'function() {\n' + script + '\n}'
+        element_args = [arg for arg in args if isinstance(arg, CDPElement)]
+        if element_args:
+            arguments = [{'objectId': arg.object_id} if isinstance(arg, CDPElement) else {'value': arg}
+                         for arg in args]
+            result = self._run(self.page.call_function(element_args[0].object_id, declaration, arguments))
+        else:
+            expression = f'({declaration}).apply(window, {json.dumps(list(args))})'
+            result = self._run(self.page.evaluate(expression, context_id=self.context_id))
+        return result.get('value')
+
+    def save_screenshot(self, filename):
+        with open(filename, 'wb') as f:
+            f.write(self._run(self.page.screenshot()))
+        return True
+
+    def close(self):
+        self._run(self.page.close())
+
+    def quit(self):
+        try:
+            self.close()
+        except WebDriverException:
+            pass
+        if self.owns_browser:
+            self.browser.quit()
+
+def setup_cdp_driver(headless=True, capture_network=False, user_data_dir=None):
+    browser = CDPBrowser(headless=headless, user_data_dir=user_data_dir).start()
+    driver = browser.new_driver(owns_browser=True)
+    if capture_network:
+        driver.enable_performance_log()
+    return driver
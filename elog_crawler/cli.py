@@ -0,0 +1,105 @@
+"""
+Single ``elog-crawler`` entry point.
+
+Each subcommand imports its implementation only when it runs, so DB-only
+work never loads selenium, and ``crawl <page> --reset-credentials`` loads
+neither a browser driver nor cryptography.
+"""
+
+import sys
+import importlib
+
+CRAWLERS = {
+    'logbook'     : 'elog_crawler.app_crawl_elog',
+    'file-manager': 'elog_crawler.app_crawl_file_manager',
+    'info'        : 'elog_crawler.app_crawl_info',
+    'runtable'    : 'elog_crawler.app_crawl_runtable',
+}
+
+USAGE = """usage: elog-crawler <command> [options]
+
+commands:
+  crawl {logbook,file-manager,info,runtable} ...   Crawl eLog pages for one or more experiments
+  batch ...                                        Crawl many experiments with a worker pool
+  plan ...                                         List the pages the freshness policy says are due
+  ingest ...                                       Load crawl outputs into a new or existing database
+  update ...                                       Update an existing database with crawl outputs
+  query ...                                        Run a read-only query against the database
+  search ...                                       Full-text search over logbook entries and experiment tabs
+  summary {show,check,rebuild} ...                 Per-experiment totals: show, check or rebuild them
+  storage ...                                      Storage used per run, experiment or instrument
+  export ...                                       Export the database to Parquet for analysis jobs
+
+Run 'elog-crawler <command> -h' for the options of a command."""
+
+def crawl(argv):
+    if not argv or argv[0] not in CRAWLERS:
+        sys.exit(f"usage: elog-crawler crawl {{{','.join(CRAWLERS)}}} [options] experiments...")
+    page, argv = argv[0], argv[1:]
+    if '--reset-credentials' in argv:
+        from .credential_store import CredentialStore
+        CredentialStore().delete_credentials()
+        return
+    importlib.import_module(CRAWLERS[page]).main(argv)
+
+def batch(argv):
+    from .batch_crawl import main
+    main(argv)
+
+def plan(argv):
+    from .freshness import main
+    main(argv)
+
+def ingest(argv):
+    from .save_to_db import main
+    main(argv)
+
+def update(argv):
+    from .update_db import main
+    main(argv)
+
+def query(argv):
+    from .query import main
+    main(argv)
+
+def search(argv):
+    from .search import main
+    main(argv)
+
+def summary(argv):
+    from .summary import main
+    main(argv)
+
+def storage(argv):
+    from .storage_report import main
+    main(argv)
+
+def export(argv):
+    from .export import main
+    main(argv)
+
+COMMANDS = {
+    'crawl'  : crawl,
+    'batch'  : batch,
+    'plan'   : plan,
+    'ingest' : ingest,
+    'update' : update,
+    'query'  : query,
+    'search' : search,
+    'summary': summary,
+    'storage': storage,
+    'export' : export,
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(USAGE)
+        return
+    command = COMMANDS.get(argv[0])
+    if command is None:
+        sys.exit(f"elog-crawler: unknown command '{argv[0]}'\n\n{USAGE}")
+    command(argv[1:])
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-from cryptography.fernet import Fernet
 import json
 import os
 from getpass import getpass
@@ -7,15 +6,23 @@ class CredentialStore:
     def __init__(self, config_file='config.json', key_file='secret.key'):
         self.config_file = config_file
         self.key_file = key_file
+        self._fernet = None
 
-        if not os.path.exists(key_file):
-            self._generate_key()
-        else:
-            self._set_file_permissions(key_file)
-
-        self.fernet = Fernet(self._load_key())
+    @property
+    def fernet(self):
+        # cryptography is only imported once credentials are actually read or
+        # written, so e.g. deleting them stays cheap.
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+            if not os.path.exists(self.key_file):
+                self._generate_key()
+            else:
+                self._set_file_permissions(self.key_file)
+            self._fernet = Fernet(self._load_key())
+        return self._fernet
 
     def _generate_key(self):
+        from cryptography.fernet import Fernet
         key = Fernet.generate_key()
         with open(self.key_file, 'wb') as key_file:
             key_file.write(key)
@@ -0,0 +1,111 @@
+"""
+SQLite connection profiles.
+
+    default    SQLite's own settings: rollback journal, synchronous=FULL and a
+               small page cache
+    bulk-load  large initial loads: WAL, synchronous=OFF, a 1 GB page cache
+               and memory-mapped I/O.  Secondary indexes are dropped while
+               loading and rebuilt, followed by ANALYZE, when the load ends.
+    serving    a database that is read while it is being updated: WAL, so
+               readers never wait for the writer, synchronous=NORMAL, a busy
+               timeout and a larger cache for the readers
+
+synchronous=OFF means a power loss during a bulk load can corrupt the file,
+so only use it for loads that can be redone from the crawl outputs.
+
+Indexes dropped for a bulk load are recorded in ``DeferredIndex`` in the same
+transaction that drops them, so if a load dies before it finishes, they are
+rebuilt the next time the database is opened.
+"""
+
+import logging
+import sqlite3
+
+PROFILES = {
+    'default'  : {'pragmas': []},
+    'bulk-load': {
+        'pragmas': [
+            ('journal_mode', 'WAL'),
+            ('synchronous', 'OFF'),
+            ('cache_size', -1024 * 1024),
+            ('mmap_size', 1024 ** 3),
+            ('temp_store', 'MEMORY'),
+        ],
+        'defer_indexes': True,
+    },
+    'serving'  : {
+        'pragmas': [
+            ('journal_mode', 'WAL'),
+            ('synchronous', 'NORMAL'),
+            ('busy_timeout', 5000),
+            ('cache_size', -128 * 1024),
+            ('mmap_size', 256 * 1024 ** 2),
+        ],
+    },
+}
+
+# Pragmas that need write access to the database file.
+WRITE_PRAGMAS = {'journal_mode', 'synchronous'}
+
+def apply_profile(conn, profile, readonly=False):
+    for name, value in PROFILES[profile]['pragmas']:
+        if readonly and name in WRITE_PRAGMAS:
+            continue
+        conn.execute(f'PRAGMA {name} = {value}')
+
+def defers_indexes(profile):
+    return PROFILES[profile].get('defer_indexes', False)
+
+def defer_indexes(conn, keep_unique=False):
+    """
+    Drop the secondary indexes and record them in DeferredIndex.  With
+    ``keep_unique`` unique indexes stay, for writers that rely on them as
+    ON CONFLICT targets.
+    """
+    indexes = conn.execute('''
+        SELECT name, tbl_name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL AND tbl_name != 'DeferredIndex'
+    ''').fetchall()
+
+    conn.execute('BEGIN')
+    deferred = 0
+    for name, table, sql in indexes:
+        is_unique = any(row[1] == name and row[2] for row in conn.execute(f'PRAGMA index_list({table})'))
+        if keep_unique and is_unique:
+            continue
+        columns = ', '.join(row[2] for row in conn.execute(f'PRAGMA index_info({name})'))
+        conn.execute('INSERT OR REPLACE INTO DeferredIndex (name, table_name, columns, is_unique, sql) VALUES (?, ?, ?, ?, ?)',
+                     (name, table, columns, int(is_unique), sql))
+        conn.execute(f'DROP INDEX {name}')
+        deferred += 1
+    conn.commit()
+    if deferred:
+        logging.info(f"Dropped {deferred} indexes for the bulk load")
+    return deferred
+
+def restore_indexes(conn, analyze=True):
+    """Rebuild the indexes recorded in DeferredIndex, then ANALYZE."""
+    try:
+        indexes = conn.execute('SELECT name, table_name, columns, is_unique, sql FROM DeferredIndex').fetchall()
+    except sqlite3.OperationalError:
+        # Database from before DeferredIndex existed
+        return 0
+    if not indexes:
+        return 0
+
+    conn.execute('BEGIN')
+    for name, table, columns, is_unique, sql in indexes:
+        if is_unique:
+            # Without the index INSERT OR REPLACE appended instead of replacing; keep the newest row per key
+            not_null = ' AND '.join(f'{column} IS NOT NULL' for column in columns.split(', '))
+            conn.execute(f'''
+                DELETE FROM {table} WHERE {not_null} AND rowid NOT IN (
+                    SELECT MAX(rowid) FROM {table} WHERE {not_null} GROUP BY {columns})
+            ''')
+        conn.execute(sql)
+        conn.execute('DELETE FROM DeferredIndex WHERE name = ?', (name,))
+    conn.commit()
+    if analyze:
+        conn.execute('ANALYZE')
+    logging.info(f"Rebuilt {len(indexes)} indexes")
+    return len(indexes)
@@ -0,0 +1,241 @@
+"""
+Partitioned Parquet export of the experiment database.
+
+``Run``, ``DataProduction``, ``FileManager``, ``Detector`` and ``Logbook``
+are written one file per table and experiment, in hive-style partitions:
+
+    <out>/Logbook/instrument=MFX/experiment=mfxp1001/part-0.parquet
+
+so analysis jobs can scan them in parallel, and prune by instrument and
+experiment, without touching the live database.  Exports are incremental:
+a ledger in the output directory (``_export_ledger.db``) records the
+``ExperimentSummary`` update time each experiment was exported at, and only
+experiments refreshed since then are written again.
+
+The database is opened read-only and each experiment is read in one read
+transaction, so an export never changes the database, never waits for a
+writer and writes a consistent snapshot of every experiment.  Files are
+replaced atomically, and an experiment is recorded in the ledger only once
+all its files are in place, so an export that fails is redone by the next.
+
+Needs the optional ``pyarrow`` package (``pip install elog-crawler[parquet]``).
+
+    elog-crawler export --db experiment_database.db --out export/
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+from .outputs import write_parquet
+from .query import connect_readonly
+
+PART_FILE = 'part-0.parquet'
+
+LEDGER_FILE = '_export_ledger.db'
+
+LEDGER_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS ExportLedger (
+    experiment_id TEXT PRIMARY KEY,
+    instrument TEXT,
+    summary_updated_at REAL,
+    exported_at REAL
+) WITHOUT ROWID;
+'''
+
+# Partition value for experiments without an instrument, read back as null by pyarrow and Spark
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+EXPORT_TABLES = {
+    'Run': [
+        ('experiment_id', 'string'),
+        ('run_number'   , 'int'),
+        ('start_time'   , 'string'),
+        ('end_time'     , 'string'),
+        ('n_events'     , 'int'),
+        ('n_damaged'    , 'int'),
+    ],
+    'DataProduction': [
+        ('experiment_id'   , 'string'),
+        ('run_number'      , 'int'),
+        ('n_events'        , 'int'),
+        ('n_damaged'       , 'int'),
+        ('n_dropped'       , 'int'),
+        ('prod_start'      , 'string'),
+        ('prod_end'        , 'string'),
+        ('prod_start_epoch', 'int'),
+        ('prod_end_epoch'  , 'int'),
+    ],
+    'FileManager': [
+        ('experiment_id'   , 'string'),
+        ('run_number'      , 'int'),
+        ('number_of_files' , 'int'),
+        ('total_size_bytes', 'int'),
+    ],
+    'Detector': [
+        ('experiment_id', 'string'),
+        ('run_number'   , 'int'),
+        ('detector_name', 'string'),
+        ('status'       , 'string'),
+    ],
+    'Logbook': [
+        ('experiment_id'  , 'string'),
+        ('run_number'     , 'int'),
+        ('timestamp'      , 'string'),
+        ('timestamp_epoch', 'int'),
+        ('content'        , 'string'),
+        ('tags'           , 'string'),
+        ('author'         , 'string'),
+        ('entry_hash'     , 'string'),
+    ],
+}
+
+# The Detector view expands every range of the database; expand only the experiment's
+DETECTOR_ROWS = '''
+    WITH RECURSIVE runs (detector_key, run_number, run_end) AS (
+        SELECT detector_key, run_start, run_end FROM DetectorRunRange WHERE experiment_id = :experiment_id
+        UNION ALL
+        SELECT detector_key, run_number + 1, run_end FROM runs WHERE run_number < run_end
+    )
+    SELECT :experiment_id, runs.run_number, DetectorName.detector_name, 'Checked'
+    FROM runs JOIN DetectorName USING (detector_key)
+    ORDER BY runs.run_number, DetectorName.detector_name
+'''
+
+def table_rows_sql(table):
+    if table == 'Detector':
+        return DETECTOR_ROWS
+    columns = ', '.join(name for name, _ in EXPORT_TABLES[table])
+    order = 'run_number, timestamp_epoch' if table == 'Logbook' else 'run_number'
+    return f'SELECT {columns} FROM {table} WHERE experiment_id = :experiment_id ORDER BY {order}'
+
+def partition_dir(export_dir, table, instrument, experiment_id):
+    return os.path.join(export_dir, table, f'instrument={instrument or NULL_PARTITION}', f'experiment={experiment_id}')
+
+def remove_partitions(export_dir, instrument, experiment_id):
+    for table in EXPORT_TABLES:
+        shutil.rmtree(partition_dir(export_dir, table, instrument, experiment_id), ignore_errors=True)
+
+def open_ledger(export_dir):
+    os.makedirs(export_dir, exist_ok=True)
+    ledger = sqlite3.connect(os.path.join(export_dir, LEDGER_FILE))
+    ledger.executescript(LEDGER_SCHEMA)
+    return ledger
+
+def pending_experiments(conn, ledger, experiments=None, full=False):
+    """
+    ``(experiment_id, exported_instrument)`` for the experiments refreshed
+    since their last export (all of them with ``full``), and for the
+    experiments in the ledger that are no longer in the database.  The
+    exported instrument is None for an experiment never exported, '' for one
+    exported without an instrument.
+    """
+    exported = {experiment_id: (instrument or '', updated_at) for experiment_id, instrument, updated_at
+                in ledger.execute('SELECT experiment_id, instrument, summary_updated_at FROM ExportLedger')}
+    current = conn.execute('SELECT experiment_id, updated_at FROM ExperimentSummary ORDER BY experiment_id').fetchall()
+    pending = []
+    for experiment_id, updated_at in current:
+        instrument, exported_at = exported.get(experiment_id, (None, None))
+        if full or exported_at is None or updated_at > exported_at:
+            pending.append((experiment_id, instrument))
+    present = {experiment_id for experiment_id, _ in current}
+    removed = [(experiment_id, instrument) for experiment_id, (instrument, _) in sorted(exported.items())
+               if experiment_id not in present]
+    if experiments is not None:
+        experiments = set(experiments)
+        pending = [row for row in pending if row[0] in experiments]
+        removed = [row for row in removed if row[0] in experiments]
+    return pending, removed
+
+def export_experiment(conn, ledger, export_dir, experiment_id, exported_instrument=None):
+    """
+    Write the experiment's partition of every table from one read
+    transaction, then record it in the ledger.  Returns the rows written, or
+    None if the experiment is gone from the database.
+    """
+    conn.execute('BEGIN')
+    try:
+        summary = conn.execute('SELECT instrument, updated_at FROM ExperimentSummary WHERE experiment_id = ?',
+                               (experiment_id,)).fetchone()
+        if summary is None:
+            return None
+        instrument, updated_at = summary
+        if exported_instrument is not None and (exported_instrument or NULL_PARTITION) != (instrument or NULL_PARTITION):
+            remove_partitions(export_dir, exported_instrument, experiment_id)
+        rows_written = 0
+        for table, columns in EXPORT_TABLES.items():
+            directory = partition_dir(export_dir, table, instrument, experiment_id)
+            file_path = os.path.join(directory, PART_FILE)
+            cursor = conn.execute(table_rows_sql(table), {'experiment_id': experiment_id})
+            first = cursor.fetchmany(1)
+            if not first:
+                # No rows left in this table: drop the file of an earlier export
+                shutil.rmtree(directory, ignore_errors=True)
+                continue
+            os.makedirs(directory, exist_ok=True)
+            rows_written += write_parquet(itertools.chain(first, cursor), columns, file_path)
+    finally:
+        conn.rollback()
+    with ledger:
+        ledger.execute('''
+            INSERT OR REPLACE INTO ExportLedger (experiment_id, instrument, summary_updated_at, exported_at)
+            VALUES (?, ?, ?, ?)
+        ''', (experiment_id, instrument, updated_at, time.time()))
+    return rows_written
+
+def export_database(conn, export_dir, experiments=None, full=False):
+    """Export the experiments changed since the last export to ``export_dir``; returns (exported, removed, rows)."""
+    ledger = open_ledger(export_dir)
+    try:
+        pending, removed = pending_experiments(conn, ledger, experiments, full)
+        exported = rows = 0
+        for index, (experiment_id, exported_instrument) in enumerate(pending, 1):
+            written = export_experiment(conn, ledger, export_dir, experiment_id, exported_instrument)
+            if written is None:
+                # Removed since the pending list was read; the next export cleans it up
+                continue
+            exported += 1
+            rows += written
+            logging.info(f"[{index}/{len(pending)}] Exported {experiment_id}: {written} rows")
+        for experiment_id, instrument in removed:
+            remove_partitions(export_dir, instrument, experiment_id)
+            with ledger:
+                ledger.execute('DELETE FROM ExportLedger WHERE experiment_id = ?', (experiment_id,))
+            logging.info(f"Removed {experiment_id}, which is no longer in the database")
+    finally:
+        ledger.close()
+    return exported, len(removed), rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='elog-crawler export',
+                                     description="Export the database to Parquet, partitioned by instrument and experiment.")
+    parser.add_argument('--db', default='experiment_database.db', help="Path to the SQLite database file")
+    parser.add_argument('--out', default='export', help="Output directory")
+    parser.add_argument('--experiment', action='append', help="Only this experiment (repeatable)")
+    parser.add_argument('--full', action='store_true', help="Rewrite every partition, not only those of changed experiments")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        conn = connect_readonly(args.db)
+    except sqlite3.OperationalError as e:
+        sys.exit(f"Cannot open {args.db}: {e}")
+    try:
+        start = time.perf_counter()
+        exported, removed, rows = export_database(conn, args.out, args.experiment, args.full)
+        logging.info(f"Exported {exported} experiments ({rows} rows) and removed {removed} to {args.out} "
+                     f"in {time.perf_counter() - start:.1f}s")
+    except sqlite3.OperationalError as e:
+        if 'no such table' in str(e):
+            sys.exit(f"{args.db} has no ExperimentSummary yet; run 'elog-crawler ingest' or 'update' on it once to create it.")
+        raise
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Live follow mode: keep an lgbk page open and emit only what is new.
+
+Instead of reloading and re-scraping the whole page on every run, the page
+stays open and each poll reads all rows with a single ``execute_script``.
+Rows are compared with what was seen before by key, and only new or changed
+rows go to the sink: NDJSON on stdout, or ``DatabaseUpdater`` for an
+existing database.  The rows present at the first poll are the baseline and
+are not emitted.
+"""
+
+import json
+import sys
+import time
+
+LOGBOOK_ROWS_SCRIPT = '''
+return Array.from(document.querySelectorAll('div.edat')).map(function(entry) {
+    function text(selector) {
+        var element = entry.querySelector(selector);
+        return element ? element.innerText.trim() : '';
+    }
+    return [text('div.col-2'), text('div.col-1'), text('div.col-5.elog_main_cnt'),
+            text('div.col-3.elog_main_cnt'), text('div.col-1.text-start')];
+});
+'''
+
+RUNTABLE_ROWS_SCRIPT = '''
+var container = document.getElementById('rtbl_content');
+var table = container ? container.querySelector('table.table-striped') : null;
+if (!table) return [];
+var rows = Array.from(table.querySelectorAll('tr'));
+var headers = [];
+rows.slice(0, 2).forEach(function(row) {
+    row.querySelectorAll('th').forEach(function(th) {
+        var label = th.innerText.trim();
+        var idx = th.getAttribute('data-col-idx');
+        if (label && idx !== null) headers.push([label, parseInt(idx, 10)]);
+    });
+});
+headers.sort(function(a, b) { return a[1] - b[1]; });
+return rows.slice(2).filter(function(row) { return row.getAttribute('data-runnum'); }).map(function(row) {
+    var cells = row.querySelectorAll('td');
+    var data = {'Run': row.getAttribute('data-runnum')};
+    headers.forEach(function(header, i) {
+        if (i < cells.length && cells[header[1]]) data[header[0]] = cells[header[1]].innerText.trim();
+    });
+    return data;
+});
+'''
+
+def logbook_snapshot(driver):
+    return [{'Posted': row[0], 'Run': row[1], 'Content': row[2], 'Tags': row[3], 'Author': row[4]}
+            for row in driver.execute_script(LOGBOOK_ROWS_SCRIPT) or []]
+
+def logbook_key(row):
+    return (row['Posted'], row['Run'], row['Author'], row['Content'])
+
+def runtable_snapshot(driver):
+    return driver.execute_script(RUNTABLE_ROWS_SCRIPT) or []
+
+def runtable_key(row):
+    return row['Run']
+
+def ndjson_sink(experiment_id, record_type, out=sys.stdout):
+    def emit(rows):
+        for row in rows:
+            out.write(json.dumps({'experiment_id': experiment_id, 'type': record_type, **row}) + '\n')
+        out.flush()
+    return emit
+
+def db_sink(experiment_id, record_type, db_name):
+    from .save_to_db import data_production_records, logbook_records
+    from .update_db import DatabaseUpdater
+    db_updater = DatabaseUpdater(db_name, profile='serving')
+    # Rows go through the ingest normalizers so they get the same keys as an ingest of the page.  A
+    # logbook entry with a blank Run cell takes the run of the entry before it, across polls too,
+    # starting from the run of the latest entry already stored.
+    latest = db_updater.conn.execute('''
+        SELECT run_number FROM Logbook WHERE experiment_id = ? ORDER BY timestamp_epoch DESC, log_id DESC LIMIT 1
+    ''', (experiment_id,)).fetchone()
+    last_run_number = latest[0] if latest else None
+
+    def emit(rows):
+        nonlocal last_run_number
+        if record_type == 'logbook':
+            records = list(logbook_records(experiment_id, rows, last_run_number))
+            for _, _, data in records:
+                if data:
+                    last_run_number = data['run_number']
+        else:
+            records = data_production_records(experiment_id, rows)
+        db_updater.queue_records(records)
+        db_updater.flush()
+        db_updater.update_summary([experiment_id])
+        db_updater.conn.commit()
+        print(f"Wrote {len(rows)} new {record_type} rows for {experiment_id} to {db_name}", file=sys.stderr)
+    return emit
+
+def make_sink(experiment_id, record_type, db_name=None):
+    if db_name:
+        return db_sink(experiment_id, record_type, db_name)
+    return ndjson_sink(experiment_id, record_type)
+
+def follow(driver, snapshot, key, emit, poll_interval=30, refresh_every=0, prepare=None, max_polls=None):
+    """
+    Poll ``snapshot`` every ``poll_interval`` seconds and pass new or changed
+    rows to ``emit``.  With ``refresh_every`` the page is reloaded (and
+    ``prepare`` rerun) every that many polls, for pages that do not update
+    themselves.
+    """
+    seen = {}
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            if refresh_every and polls and polls % refresh_every == 0:
+                driver.refresh()
+                if prepare:
+                    prepare(driver)
+            new_rows = []
+            for row in snapshot(driver):
+                row_key = key(row)
+                if seen.get(row_key) != row:
+                    seen[row_key] = row
+                    new_rows.append(row)
+            if polls == 0:
+                print(f"Following {len(seen)} existing rows; polling every {poll_interval}s (Ctrl-C to stop).", file=sys.stderr)
+            elif new_rows:
+                emit(new_rows)
+            polls += 1
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("Stopped following.", file=sys.stderr)
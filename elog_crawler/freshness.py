@@ -0,0 +1,155 @@
+"""
+Freshness policy: decide which experiments and page types are due for a recrawl.
+
+Every experiment is put in a state from its ``Experiment.start_time`` /
+``end_time`` (as parsed from the info page) and the last time a crawl saw
+its data change:
+
+    live      running now, or with no end time and a change (or, never
+              changed, a start) within ``recent_days``        -> hourly
+    recent    ended, or last changed, within ``recent_days``,
+              or nothing known about it yet                  -> daily
+    archived  everything older                               -> never (unless forced)
+
+Each state has a recrawl interval per page type; a page is due once its last
+successful crawl in ``CrawlHistory`` is older than that interval.  The result
+is a crawl manifest that ``elog-crawler batch --manifest`` can run directly.
+The database is opened read-only.
+"""
+
+import sqlite3
+import argparse
+import json
+import sys
+import time
+
+from .query import connect_readonly
+from .scheduler import PAGE_TYPES
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+DEFAULT_INTERVALS = {
+    'live'    : {'logbook': HOUR, 'runtable': HOUR, 'file_manager': HOUR, 'info': DAY},
+    'recent'  : {'logbook': DAY, 'runtable': DAY, 'file_manager': DAY, 'info': 7 * DAY},
+    'archived': {'logbook': None, 'runtable': None, 'file_manager': None, 'info': None},
+}
+
+class FreshnessPolicy:
+    def __init__(self, intervals=None, recent_days=30):
+        self.intervals = intervals or DEFAULT_INTERVALS
+        self.recent_window = recent_days * DAY
+
+    def state(self, start_time, end_time, last_activity, now):
+        if end_time is None:
+            # Many info pages have no End Time: judge by the last change, or the start if it never changed
+            reference = last_activity if last_activity is not None else start_time
+            if reference is None:
+                # Pages never crawled are due in any state
+                return 'recent'
+            if abs(now - reference) <= self.recent_window:
+                return 'live'
+        elif end_time >= now and (start_time is None or start_time - now <= self.recent_window):
+            return 'live'
+        latest = max(t for t in (end_time, last_activity, start_time) if t is not None)
+        if now - latest <= self.recent_window:
+            return 'recent'
+        return 'archived'
+
+    def interval(self, state, page_type):
+        return self.intervals[state].get(page_type)
+
+def experiment_times(conn):
+    times = {}
+    try:
+        for experiment_id, start_time, end_time in conn.execute('SELECT experiment_id, start_time_epoch, end_time_epoch FROM Experiment'):
+            times[experiment_id] = (start_time, end_time)
+    except sqlite3.OperationalError as e:
+        if 'no such table' not in str(e):
+            raise
+    return times
+
+def crawl_state(conn):
+    """
+    Last successful crawl per (experiment, page type), and the last time a
+    crawl of any page saw the experiment's row count change.
+    """
+    last_crawled = {}
+    last_activity = {}
+    previous_rows = {}
+    for experiment_id, page_type, started_at, rows in conn.execute('''
+        SELECT experiment_id, page_type, started_at, rows FROM CrawlHistory
+        WHERE status = 'ok' ORDER BY started_at
+    '''):
+        key = (experiment_id, page_type)
+        last_crawled[key] = started_at
+        if key in previous_rows and rows != previous_rows[key]:
+            last_activity[experiment_id] = started_at
+        previous_rows[key] = rows
+    return last_crawled, last_activity
+
+def build_manifest(conn, experiments=None, page_types=PAGE_TYPES, policy=None, now=None, force=False):
+    policy = policy or FreshnessPolicy()
+    now = time.time() if now is None else now
+    times = experiment_times(conn)
+    last_crawled, last_activity = crawl_state(conn)
+    if experiments is None:
+        experiments = sorted(set(times) | {experiment_id for experiment_id, _ in last_crawled})
+
+    manifest = []
+    for experiment_id in experiments:
+        start_time, end_time = times.get(experiment_id, (None, None))
+        state = policy.state(start_time, end_time, last_activity.get(experiment_id), now)
+        for page_type in page_types:
+            crawled_at = last_crawled.get((experiment_id, page_type))
+            interval = policy.interval(state, page_type)
+            if force:
+                due = True
+            elif crawled_at is None:
+                due = state != 'archived' or experiment_id not in times
+            else:
+                due = interval is not None and now - crawled_at >= interval
+            if due:
+                manifest.append({
+                    'experiment_id': experiment_id,
+                    'page_type'    : page_type,
+                    'state'        : state,
+                    'last_crawled' : crawled_at,
+                    'interval'     : interval,
+                })
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the experiment pages that are due for a recrawl.")
+    parser.add_argument('experiments', nargs='*', help="Experiment IDs to consider (default: every experiment in the database)")
+    parser.add_argument('--db', default='experiment_database.db', help="Path to the SQLite database file")
+    parser.add_argument('--pages', nargs='+', choices=PAGE_TYPES, default=list(PAGE_TYPES), help="Page types to consider")
+    parser.add_argument('--recent-days', type=int, default=30, help="Days after an experiment ends (or last changes) during which it is recrawled daily")
+    parser.add_argument('--force', action='store_true', help="Include pages that are not due, archived experiments included")
+    parser.add_argument('--output', help="Write the manifest to this JSON file instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        conn = connect_readonly(args.db)
+    except sqlite3.OperationalError as e:
+        sys.exit(f"Cannot open {args.db}: {e}")
+    try:
+        manifest = build_manifest(conn, args.experiments or None, args.pages,
+                                  policy=FreshnessPolicy(recent_days=args.recent_days), force=args.force)
+    except sqlite3.OperationalError as e:
+        if 'no such table' in str(e) or 'no such column' in str(e):
+            sys.exit(f"{args.db} lacks tables the freshness policy reads; run 'elog-crawler ingest' or 'update' on it once to create them.")
+        raise
+    finally:
+        conn.close()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        print(f"{len(manifest)} pages due; manifest saved to {args.output}")
+    else:
+        json.dump(manifest, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Aggregated counters for database ingest.
+
+Rows are counted per table and outcome (inserted, updated, skipped, failed)
+instead of being logged one by one.  While an ingest runs, a progress line
+with the running totals and rate is logged at most every
+``progress_interval`` seconds; at the end ``summary`` gives the totals as a
+dict that the command line tools print as JSON.
+"""
+
+import json
+import logging
+import sys
+import time
+
+OUTCOMES = ('inserted', 'updated', 'skipped', 'failed')
+
+class IngestMetrics:
+    def __init__(self, progress_interval=5.0):
+        self.progress_interval = progress_interval
+        self.tables = {}
+        self.files = []
+        self.started = time.monotonic()
+        self.last_progress = self.started
+
+    def _table(self, table):
+        counts = self.tables.get(table)
+        if counts is None:
+            counts = self.tables[table] = dict.fromkeys(OUTCOMES, 0)
+            counts['seconds'] = 0.0
+        return counts
+
+    def count(self, table, outcome, n=1, seconds=0.0):
+        counts = self._table(table)
+        counts[outcome] += n
+        counts['seconds'] += seconds
+        now = time.monotonic()
+        if now - self.last_progress >= self.progress_interval:
+            self.last_progress = now
+            self.log_progress(now)
+
+    def rows(self):
+        return sum(counts[outcome] for counts in self.tables.values() for outcome in OUTCOMES if outcome != 'failed')
+
+    def log_progress(self, now=None):
+        elapsed = (now or time.monotonic()) - self.started
+        rows = self.rows()
+        tables = ', '.join(f"{table} {sum(counts[o] for o in OUTCOMES)}" for table, counts in sorted(self.tables.items()))
+        logging.info(f"Progress: {rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s) - {tables}")
+
+    def file_done(self, file_path, status, seconds):
+        self.files.append({'file': file_path, 'status': status, 'seconds': round(seconds, 3)})
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        rows = self.rows()
+        tables = {}
+        for table, counts in sorted(self.tables.items()):
+            tables[table] = {outcome: counts[outcome] for outcome in OUTCOMES}
+            tables[table]['seconds'] = round(counts['seconds'], 3)
+        return {
+            'files'       : len(self.files),
+            'failed_files': [f['file'] for f in self.files if f['status'] != 'ok'],
+            'rows'        : rows,
+            'seconds'     : round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed) if elapsed else 0,
+            'tables'      : tables,
+        }
+
+    def print_summary(self, out=sys.stdout):
+        json.dump(self.summary(), out, indent=2)
+        out.write('\n')
@@ -0,0 +1,64 @@
+"""
+Ledger of ingested crawl outputs, for incremental directory ingest.
+
+``IngestLedger`` records path, size, mtime and content hash of every file
+ingested through a directory scan.  A later scan skips a file whose size and
+mtime are unchanged without reading it; a file whose size or mtime changed
+is hashed, and only ingested again if its content changed too.  A file's
+ledger row is written in the same transaction as its rows, so a file that
+fails to ingest is retried by the next scan.
+"""
+
+import hashlib
+import logging
+import os
+import time
+
+def file_hash(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def scan_directory(directory, file_types):
+    """Paths under ``directory`` ending in one of the ``file_types`` suffixes, sorted."""
+    suffixes = tuple(file_types)
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(suffixes))
+    return paths
+
+def changed_files(conn, paths, get_file_type):
+    """
+    Ledger entries ``(path, size, mtime, content_hash, file_type)`` for the
+    files in ``paths`` that are new or changed since they were last ingested.
+    """
+    known = {path: (size, mtime, content_hash) for path, size, mtime, content_hash
+             in conn.execute('SELECT path, size, mtime, content_hash FROM IngestLedger')}
+    changed = []
+    touched = 0
+    for path in paths:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        previous = known.get(path)
+        if previous and previous[:2] == (stat.st_size, stat.st_mtime):
+            continue
+        content_hash = file_hash(path)
+        if previous and previous[2] == content_hash:
+            # Touched but not changed: remember the new mtime so the next scan skips it without hashing
+            conn.execute('UPDATE IngestLedger SET size = ?, mtime = ? WHERE path = ?', (stat.st_size, stat.st_mtime, path))
+            touched += 1
+            continue
+        changed.append((path, stat.st_size, stat.st_mtime, content_hash, get_file_type(path)))
+    conn.commit()
+    logging.info(f"Scanned {len(paths)} files: {len(changed)} new or changed, {len(paths) - len(changed) - touched} unchanged, "
+                 f"{touched} touched without changes")
+    return changed
+
+def record_file(conn, path, size, mtime, content_hash, file_type):
+    conn.execute('''
+        INSERT OR REPLACE INTO IngestLedger (path, size, mtime, content_hash, file_type, ingested_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (path, size, mtime, content_hash, file_type, time.time()))
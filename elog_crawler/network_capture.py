@@ -0,0 +1,264 @@
+"""
+Capture the JSON responses an lgbk page fetches and build crawler outputs from them.
+
+The eLog, fileManager and runTables pages load their rows through background
+requests to the experiment's ``ws/`` endpoints before rendering them.  With
+Chrome's performance log enabled, ``NetworkCapture`` records those responses
+and pulls their bodies through ``Network.getResponseBody``, so the crawlers can
+build their rows from the payloads directly instead of scrolling the page and
+scraping rendered text.
+
+The ``*_from_payloads`` builders return ``None`` when none of the captured
+payloads look like the data they need; callers then fall back to the DOM
+extractors.  Record layouts are matched by field names rather than by exact
+endpoint, so small changes to the lgbk API degrade to the DOM path instead of
+producing wrong output.
+"""
+
+import base64
+import json
+import time
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+
+from selenium.common.exceptions import WebDriverException
+
+from .timestamps import parse_timestamp
+
+RUN_KEYS = ('run_num', 'run_number', 'runnum', 'num', 'run')
+
+# Elements the page renders as separate lines or cells
+BLOCK_TAGS = {'address', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr',
+              'li', 'ol', 'p', 'pre', 'table', 'td', 'th', 'tr', 'ul'}
+
+POSTED_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# The eLog page shows times in the browser's time zone; format them there, in POSTED_FORMAT
+LOCAL_TIME_SCRIPT = '''
+var pad = function (n) { return (n < 10 ? '0' : '') + n; };
+return arguments[0].map(function (ms) {
+    var d = new Date(ms);
+    return d.getFullYear() + '-' + pad(d.getMonth() + 1) + '-' + pad(d.getDate()) + ' ' +
+           pad(d.getHours()) + ':' + pad(d.getMinutes()) + ':' + pad(d.getSeconds());
+});
+'''
+
+def enable_performance_logging(chrome_options):
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+class NetworkCapture:
+    def __init__(self, driver, url_filter='/ws/'):
+        self.driver = driver
+        self.url_filter = url_filter
+        self.pending = {}
+        self.payloads = []
+        # Drop whatever was logged before the capture started.
+        self.driver.get_log('performance')
+
+    def poll(self):
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message']).get('message', {})
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if 'json' in response.get('mimeType', '') and self.url_filter in response.get('url', ''):
+                    self.pending[params['requestId']] = response['url']
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.pending:
+                url = self.pending.pop(params['requestId'])
+                payload = self.response_body(params['requestId'])
+                if payload is not None:
+                    self.payloads.append((url, payload))
+        return self.payloads
+
+    def response_body(self, request_id):
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException:
+            return None
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', 'replace')
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def mark(self):
+        self.poll()
+        return len(self.payloads)
+
+    def wait(self, builder, start=0, timeout=15, poll_interval=0.25):
+        """Poll until ``builder`` can make rows from the payloads seen since ``start``."""
+        deadline = time.time() + timeout
+        while True:
+            result = builder(self.poll()[start:])
+            if result is not None or time.time() > deadline:
+                return result
+            time.sleep(poll_interval)
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+def html_to_text(content):
+    """The text of an entry's HTML as the page renders it, with its whitespace collapsed."""
+    if '<' not in content:
+        return content
+    parser = _TextExtractor()
+    parser.feed(content)
+    parser.close()
+    return ' '.join(''.join(parser.parts).split())
+
+def unwrap(payload):
+    """Strip the ``{"success": ..., "value": ...}`` envelope lgbk puts around responses."""
+    if isinstance(payload, dict) and 'value' in payload and ('success' in payload or len(payload) == 1):
+        return payload['value']
+    return payload
+
+def records(payload):
+    value = unwrap(payload)
+    if isinstance(value, list):
+        return [record for record in value if isinstance(record, dict)]
+    return []
+
+def run_number(record):
+    for key in RUN_KEYS:
+        value = record.get(key)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.isdigit():
+            return int(value)
+    return None
+
+def epoch_milliseconds(value):
+    if isinstance(value, dict) and '$date' in value:
+        value = value['$date']
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value if value > 1e11 else value * 1000
+    if isinstance(value, str):
+        seconds = parse_timestamp(value)
+        return None if seconds is None else seconds * 1000
+    return None
+
+def utc_times(milliseconds):
+    return [datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime(POSTED_FORMAT) for ms in milliseconds]
+
+def page_local_times(driver):
+    """Formats epoch milliseconds as the eLog page in ``driver`` shows them."""
+    return lambda milliseconds: driver.execute_script(LOCAL_TIME_SCRIPT, list(milliseconds))
+
+def logbook_rows_from_payloads(payloads, local_times=utc_times):
+    """
+    Rows of [Posted, Run, Content, Tags, Author], newest first as on the page.
+    ``local_times`` formats the posting times, given in epoch milliseconds;
+    pass ``page_local_times(driver)`` to get the times the page shows.
+    """
+    entries = []
+    for _, payload in payloads:
+        for record in records(payload):
+            if 'content' in record and ('author' in record or 'relevance_time' in record or 'insert_time' in record):
+                entries.append(record)
+    if not entries:
+        return None
+
+    times = [record.get('relevance_time', record.get('insert_time')) for record in entries]
+    milliseconds = [epoch_milliseconds(value) for value in times]
+    formatted = iter(local_times([ms for ms in milliseconds if ms is not None]))
+    rows = []
+    for record, value, ms in zip(entries, times, milliseconds):
+        if ms is not None:
+            posted = next(formatted)
+        else:
+            posted = value if isinstance(value, str) else ''
+        run = run_number(record)
+        tags = record.get('tags') or []
+        if isinstance(tags, list):
+            tags = ' '.join(str(tag) for tag in tags)
+        rows.append((ms, [posted, '' if run is None else str(run), html_to_text(record.get('content') or ''), tags, record.get('author', '')]))
+    rows.sort(key=lambda row: (row[0] is not None, row[0] or 0), reverse=True)
+    return [row for _, row in rows]
+
+def file_manager_rows_from_payloads(payloads):
+    """Rows of [Run Number, Number of Files, Total Size (bytes)] with exact byte counts."""
+    per_run = {}
+    for _, payload in payloads:
+        for record in records(payload):
+            run = run_number(record)
+            if run is None:
+                continue
+            if 'path' in record and 'size' in record:
+                num_files, num_bytes = per_run.get(run, (0, 0))
+                per_run[run] = (num_files + 1, num_bytes + int(record['size'] or 0))
+                continue
+            num_files = next((record[k] for k in ('number_of_files', 'num_files') if k in record), None)
+            num_bytes = next((record[k] for k in ('total_size_bytes', 'total_size') if k in record), None)
+            if num_files is not None and num_bytes is not None:
+                per_run[run] = (int(num_files), int(num_bytes))
+    if not per_run:
+        return None
+    return [[run, num_files, num_bytes] for run, (num_files, num_bytes) in sorted(per_run.items())]
+
+def _lookup(record, source):
+    if source in record:
+        return record[source]
+    value = record
+    for part in source.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+def _run_table_definition(payloads, table_name):
+    for _, payload in payloads:
+        for record in records(payload):
+            if record.get('name') == table_name and isinstance(record.get('coldefs'), list):
+                return [(coldef['label'], coldef['source']) for coldef in record['coldefs']
+                        if coldef.get('label') and coldef.get('source')]
+    return None
+
+def _run_table_data(payload):
+    value = unwrap(payload)
+    if isinstance(value, dict) and value and all(str(key).isdigit() for key in value):
+        return {int(key): row for key, row in value.items() if isinstance(row, dict)}
+    return {run_number(record): record for record in records(payload) if run_number(record) is not None}
+
+def runtable_rows_from_payloads(definitions, payloads, table_name, checkbox=False):
+    """
+    Rows for one run table, keyed by column label like the DOM extractor.
+
+    ``definitions`` are searched for the table's column definitions (label and
+    data source); ``payloads`` for the per-run data fetched for the table.
+    With ``checkbox`` the values are reported as "Checked"/"Unchecked", as
+    the Detectors tab renders them.
+    """
+    columns = _run_table_definition(definitions, table_name)
+    if not columns:
+        return None
+    for _, payload in reversed(payloads):
+        data = _run_table_data(payload)
+        if not data:
+            continue
+        rows = []
+        for run in sorted(data, reverse=True):
+            row = {'Run': str(run)}
+            for label, source in columns:
+                value = _lookup(data[run], source)
+                if checkbox:
+                    value = 'Checked' if value else 'Unchecked'
+                row[label] = value
+            rows.append(row)
+        return rows
+    return None
@@ -0,0 +1,246 @@
+"""
+Compact crawl output formats.
+
+Tabular pages (logbook, file manager, run table data production) can be
+written as typed Parquet, and document pages (info, run table) as gzip
+NDJSON.  Both writers stream their input in batches into a temporary file next
+to the target and rename it into place, so readers never see a partial file.
+The readers are generators, so the ingest side can consume either format
+without loading a whole file.
+
+Parquet needs the optional ``pyarrow`` package (``pip install elog-crawler[parquet]``).
+"""
+
+import contextlib
+import gzip
+import json
+import os
+import tempfile
+
+from .schema import to_int
+
+LOGBOOK_COLUMNS = [
+    ('Posted' , 'string'),
+    ('Run'    , 'int'),
+    ('Content', 'string'),
+    ('Tags'   , 'string'),
+    ('Author' , 'string'),
+]
+
+FILE_MANAGER_COLUMNS = [
+    ('Run Number'        , 'int'),
+    ('Number of Files'   , 'int'),
+    ('Total Size (bytes)', 'int'),
+]
+
+# Data Production columns follow the run table definition; these are the known numeric ones.
+DATA_PRODUCTION_INT_COLUMNS = {'Run', 'N events', 'N damaged', 'N dropped'}
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet output requires the 'pyarrow' package: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+def _file_mode():
+    """The mode ``open`` gives a new file under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+@contextlib.contextmanager
+def atomic_output(filename, mode='wb'):
+    """Open a temporary file next to ``filename`` and move it into place on success."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(filename)}.', dir=directory)
+    try:
+        # mkstemp creates the file readable by its owner only
+        os.fchmod(fd, _file_mode())
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def int_or_none(value):
+    """``to_int``, with anything that is not a whole number as None."""
+    value = to_int(value)
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+def to_str(value):
+    return None if value is None else str(value)
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_parquet(rows, columns, filename, batch_size=10000):
+    """
+    Write ``rows`` (sequences in ``columns`` order, or dicts keyed by column
+    name) to a Parquet file with one row group per batch; returns the number
+    of rows written.
+    """
+    pa, pq = _import_pyarrow()
+    types = {'int': pa.int64(), 'string': pa.string()}
+    converters = {'int': int_or_none, 'string': to_str}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+
+    count = 0
+    with atomic_output(filename) as f:
+        writer = pq.ParquetWriter(f, schema, compression='zstd')
+        try:
+            for batch in _batches(rows, batch_size):
+                count += len(batch)
+                arrays = []
+                for index, (name, kind) in enumerate(columns):
+                    convert = converters[kind]
+                    values = [convert(row.get(name) if isinstance(row, dict) else row[index]) for row in batch]
+                    arrays.append(pa.array(values, type=types[kind]))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        finally:
+            writer.close()
+    return count
+
+def data_production_columns(rows):
+    names = []
+    for row in rows:
+        for name in row:
+            if name not in names:
+                names.append(name)
+    return [(name, 'int' if name in DATA_PRODUCTION_INT_COLUMNS else 'string') for name in names]
+
+def read_parquet(filename, batch_size=10000):
+    _, pq = _import_pyarrow()
+    parquet_file = pq.ParquetFile(filename)
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        columns = batch.schema.names
+        for values in zip(*(column.to_pylist() for column in batch.columns)):
+            yield dict(zip(columns, values))
+
+def document_records(document):
+    """
+    Split a crawl document into NDJSON records, one per list item or dict
+    entry, so large sections are never serialized as a single value.
+    """
+    for section, value in document.items():
+        if isinstance(value, list):
+            for item in value:
+                yield {'section': section, 'item': item}
+        elif isinstance(value, dict):
+            for name, item in value.items():
+                yield {'section': section, 'name': name, 'item': item}
+        else:
+            yield {'section': section, 'value': value}
+
+def write_ndjson_gz(records, filename):
+    with atomic_output(filename) as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for record in records:
+                f.write(json.dumps(record).encode('utf-8') + b'\n')
+
+def read_ndjson_gz(filename):
+    with gzip.open(filename, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+NUMBER_CHARS = '0123456789.eE+-'
+
+def iter_json_items(filename, chunk_size=64 * 1024):
+    """
+    Stream a JSON object file as ``(key, item)`` pairs, one per element of
+    each top-level array, and ``(key, value)`` for other top-level values.
+    Only the element being decoded is held in memory, so multi-GB run table
+    JSONs can be read without loading them.
+    """
+    decoder = json.JSONDecoder()
+    with open(filename, 'r') as f:
+        buf = ''
+        pos = 0
+        eof = False
+
+        def fill(size):
+            nonlocal buf, pos, eof
+            chunk = f.read(size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def next_char():
+            # Skip whitespace and return the next character without consuming it
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\n\r':
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return buf[pos] if pos < len(buf) else ''
+                fill(chunk_size)
+
+        def expect(chars):
+            nonlocal pos
+            char = next_char()
+            if not char or char not in chars:
+                raise ValueError(f"Malformed JSON in {filename}: expected one of {chars!r}, found {char or 'end of file'!r}")
+            pos += 1
+            return char
+
+        def decode():
+            nonlocal pos
+            next_char()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # A number followed only by number characters may have been cut at the buffer end
+                    cut = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                           and not buf[end:].strip(NUMBER_CHARS))
+                    if not cut or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                # Grow the read size with the buffer so a huge value is not rescanned per chunk
+                fill(max(chunk_size, len(buf) - pos))
+
+        expect('{')
+        if next_char() == '}':
+            return
+        while True:
+            key = decode()
+            expect(':')
+            if next_char() == '[':
+                pos += 1
+                if next_char() == ']':
+                    pos += 1
+                else:
+                    while True:
+                        yield key, decode()
+                        if expect(',]') == ']':
+                            break
+            else:
+                yield key, decode()
+            if expect(',}') == '}':
+                return
+
+def read_document(filename):
+    """Reassemble a document written with ``document_records``."""
+    document = {}
+    for record in read_ndjson_gz(filename):
+        section = record['section']
+        if 'item' not in record:
+            document[section] = record.get('value')
+        elif 'name' in record:
+            document.setdefault(section, {})[record['name']] = record['item']
+        else:
+            document.setdefault(section, []).append(record['item'])
+    return document
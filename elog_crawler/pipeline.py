@@ -0,0 +1,104 @@
+"""
+Parallel ingest: parse in a process pool, write from one connection.
+
+Reading CSV/JSON/Parquet and normalizing rows is CPU work that parallelizes,
+while SQLite allows a single writer.  ``ingest_files`` sends each file to a
+worker process, which reads it and spools its rows, grouped per table in
+batches of ``SPOOL_ROWS`` records, to a temporary file (``parse_file``).  The
+calling process streams the batches back and applies them through the
+manager's own connection, one transaction per file and in input order.  At
+most ``max_pending`` files are parsed ahead of the writer; their rows wait on
+disk, so memory stays flat whatever the size of the files.
+"""
+
+import collections
+import itertools
+import logging
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .save_to_db import NORMALIZERS, experiment_id_from_path, group_records, load_document
+
+# Records normalized into one spooled batch
+SPOOL_ROWS = 10000
+
+def record_batches(records, max_field_size=None, batch_rows=SPOOL_ROWS):
+    """``group_records`` over consecutive slices of ``batch_rows`` records."""
+    for chunk in iter(lambda: list(itertools.islice(records, batch_rows)), []):
+        yield group_records(chunk, max_field_size)
+
+def spool(batches):
+    """Pickle ``batches`` one after another into a temporary file and return its path."""
+    fd, path = tempfile.mkstemp(prefix='elog-ingest.', suffix='.spool')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for batch in batches:
+                pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+def read_spool(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def parse_file(file_path, file_type, max_field_size=None, engine='rows'):
+    """
+    Read and normalize one crawl output in a worker process: the document of
+    an info file, otherwise the path of the spool file holding its batches.
+    """
+    experiment_id = experiment_id_from_path(file_path)
+    if engine == 'vectorized':
+        from .vectorized import BATCHERS, file_batches
+        if file_type in BATCHERS:
+            return spool(file_batches(file_path, file_type, experiment_id, max_field_size))
+    if file_type == 'info':
+        document = load_document(file_path)
+        if document:
+            document['experiment_id'] = experiment_id
+        return document
+    reader, normalizer = NORMALIZERS[file_type]
+    data = reader(file_path, max_field_size)
+    if not data:
+        return None
+    return spool(record_batches(normalizer(experiment_id, data), max_field_size))
+
+def _apply(db_manager, file_path, file_type, future):
+    try:
+        parsed = future.result()
+    except Exception as e:
+        logging.error(f"Error parsing {file_path}: {e}")
+        db_manager.metrics.file_done(file_path, 'failed', 0.0)
+        return
+    if file_type == 'info' or parsed is None:
+        db_manager.process_parsed(file_path, file_type, parsed)
+        return
+    try:
+        db_manager.process_parsed(file_path, file_type, read_spool(parsed))
+    finally:
+        os.remove(parsed)
+
+def ingest_files(db_manager, files, workers=None, max_pending=None):
+    """Ingest ``files`` into ``db_manager`` (an ExperimentDBManager or DatabaseUpdater)."""
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    in_flight = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for file_path in files:
+            file_type = db_manager.get_file_type(file_path)
+            if file_type != 'info' and file_type not in NORMALIZERS:
+                logging.warning(f"Unknown file type: {file_path}")
+                continue
+            future = pool.submit(parse_file, file_path, file_type, db_manager.max_field_size, db_manager.engine)
+            in_flight.append((file_path, file_type, future))
+            if len(in_flight) >= max_pending:
+                _apply(db_manager, *in_flight.popleft())
+        while in_flight:
+            _apply(db_manager, *in_flight.popleft())
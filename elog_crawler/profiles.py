@@ -0,0 +1,97 @@
+"""
+Persistent Chrome profiles shared across crawler runs.
+
+Chrome normally starts from a fresh temporary profile, so every run downloads
+the lgbk app's JavaScript, CSS and fonts again (and logs in again).  A
+``ProfilePool`` keeps numbered ``--user-data-dir`` directories under one root
+and hands each worker one of them.  A profile is locked with an OS file lock
+for as long as a worker holds it, so parallel workers never share one, and a
+crashed worker's lock disappears with its process.  After use, idle profiles
+are evicted least-recently-used first until the pool fits in ``max_bytes``.
+"""
+
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+class Profile:
+    def __init__(self, path, lock_file):
+        self.path = path
+        self.lock_file = lock_file
+
+def _try_lock(lock_file):
+    try:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+class ProfilePool:
+    def __init__(self, root, max_bytes=2 * 1024 ** 3):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def _paths(self, index):
+        name = f'profile-{index}'
+        return os.path.join(self.root, name), os.path.join(self.root, name + '.lock')
+
+    def acquire(self):
+        """Lock and return the first idle profile, creating a new one if all are busy."""
+        index = 0
+        while True:
+            path, lock_path = self._paths(index)
+            lock_file = open(lock_path, 'a+')
+            if _try_lock(lock_file):
+                os.makedirs(path, exist_ok=True)
+                os.utime(lock_path)
+                return Profile(path, lock_file)
+            lock_file.close()
+            index += 1
+
+    def release(self, profile):
+        profile.lock_file.close()
+
+    def evict(self):
+        """Delete idle profiles, least recently used first, until the pool fits in max_bytes."""
+        profiles = []
+        index = 0
+        while True:
+            path, lock_path = self._paths(index)
+            if not os.path.exists(lock_path):
+                break
+            size = directory_size(path) if os.path.isdir(path) else 0
+            profiles.append((os.path.getmtime(lock_path), path, lock_path, size))
+            index += 1
+
+        total = sum(size for _, _, _, size in profiles)
+        for _, path, lock_path, size in sorted(profiles):
+            if total <= self.max_bytes:
+                break
+            lock_file = open(lock_path, 'a+')
+            try:
+                if _try_lock(lock_file) and os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                    total -= size
+                    print(f"Evicted browser profile {path} ({size / 1024 ** 2:.0f} MB)")
+            finally:
+                lock_file.close()
+        return total
@@ -0,0 +1,181 @@
+"""
+Common queries over the experiment database.
+
+``ExperimentQueries`` keeps one read-only connection open and runs a fixed
+set of parameterized statements, so SQLite compiles each of them once and
+reuses it from the connection's statement cache.  Results of the Python
+methods are cached per query and parameters until another connection
+commits a change, which SQLite reports through ``PRAGMA data_version``.
+
+    queries = ExperimentQueries('experiment_database.db')
+    queries.runs_by_experiment('mfxp1001')
+    queries.sizes_by_run_range('mfxp1001', 10, 20)
+
+The same queries are available from the command line as
+``elog-crawler query <name> ...``.
+"""
+
+import collections
+
+from .query import connect_readonly
+from .timestamps import parse_timestamp
+
+# Run numbers and epoch seconds used when a range is open on one side
+FIRST_RUN = 0
+LAST_RUN = 2 ** 62
+EARLIEST = -2 ** 62
+LATEST = 2 ** 62
+
+def time_range(since=None, until=None):
+    """Epoch seconds for a [since, until) range given as timestamps in any format parse_timestamp reads."""
+    bounds = []
+    for value, default in ((since, EARLIEST), (until, LATEST)):
+        if value is None or value == '':
+            bounds.append(default)
+            continue
+        epoch = parse_timestamp(value)
+        if epoch is None:
+            raise ValueError(f"Unrecognized timestamp: {value!r}")
+        bounds.append(epoch)
+    return tuple(bounds)
+
+QUERIES = {
+    'runs': '''
+        SELECT r.run_number, r.start_time, r.end_time, r.n_events, r.n_damaged,
+               f.number_of_files, f.total_size_bytes
+        FROM Run r
+        LEFT JOIN FileManager f ON f.experiment_id = r.experiment_id AND f.run_number = r.run_number
+        WHERE r.experiment_id = :experiment_id
+        ORDER BY r.run_number
+    ''',
+    'sizes': '''
+        SELECT run_number, number_of_files, total_size_bytes
+        FROM FileManager
+        WHERE experiment_id = :experiment_id AND run_number BETWEEN :first_run AND :last_run
+        ORDER BY run_number
+    ''',
+    'detectors': '''
+        SELECT n.detector_name,
+               SUM(MIN(d.run_end, :last_run) - MAX(d.run_start, :first_run) + 1) AS runs,
+               MAX(MIN(d.run_start), :first_run) AS first_run, MIN(MAX(d.run_end), :last_run) AS last_run
+        FROM DetectorRunRange d JOIN DetectorName n ON n.detector_key = d.detector_key
+        WHERE d.experiment_id = :experiment_id AND d.run_end >= :first_run AND d.run_start <= :last_run
+        GROUP BY n.detector_name
+        ORDER BY n.detector_name
+    ''',
+    'detector-runs': '''
+        SELECT MAX(d.run_start, :first_run) AS run_start, MIN(d.run_end, :last_run) AS run_end
+        FROM DetectorRunRange d JOIN DetectorName n ON n.detector_key = d.detector_key
+        WHERE d.experiment_id = :experiment_id AND n.detector_name = :detector_name
+          AND d.run_end >= :first_run AND d.run_start <= :last_run
+        ORDER BY d.run_start
+    ''',
+    'run-detectors': '''
+        SELECT n.detector_name
+        FROM DetectorRunRange d JOIN DetectorName n ON n.detector_key = d.detector_key
+        WHERE d.experiment_id = :experiment_id AND :run_number BETWEEN d.run_start AND d.run_end
+        ORDER BY n.detector_name
+    ''',
+    'logbook-run': '''
+        SELECT run_number, timestamp, author, tags, content
+        FROM Logbook
+        WHERE experiment_id = :experiment_id AND run_number BETWEEN :first_run AND :last_run
+        ORDER BY run_number, timestamp
+    ''',
+    'logbook-time': '''
+        SELECT run_number, timestamp, author, tags, content
+        FROM Logbook
+        WHERE experiment_id = :experiment_id AND timestamp_epoch >= :since AND timestamp_epoch < :until
+        ORDER BY timestamp_epoch
+    ''',
+    'runs-time': '''
+        SELECT run_number, prod_start, prod_end, n_events, n_damaged
+        FROM DataProduction
+        WHERE experiment_id = :experiment_id AND prod_start_epoch >= :since AND prod_start_epoch < :until
+        ORDER BY prod_start_epoch
+    ''',
+    'runs-events': '''
+        SELECT run_number, n_events, n_damaged, prod_start
+        FROM DataProduction
+        WHERE experiment_id = :experiment_id AND n_events >= :min_events
+        ORDER BY n_events DESC
+    ''',
+}
+
+class ExperimentQueries:
+    def __init__(self, db_name='experiment_database.db', cache_size=128):
+        self.conn = connect_readonly(db_name)
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
+        self.data_version = None
+
+    def execute(self, name, **params):
+        """Run a named query and return the cursor, for streaming large results."""
+        return self.conn.execute(QUERIES[name], params)
+
+    def fetch(self, name, **params):
+        """Rows of a named query as dicts, cached until the database changes."""
+        version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if version != self.data_version:
+            self.cache.clear()
+            self.data_version = version
+
+        key = (name, tuple(sorted(params.items())))
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        cursor = self.execute(name, **params)
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor]
+        if self.cache_size:
+            self.cache[key] = rows
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return rows
+
+    def runs_by_experiment(self, experiment_id):
+        return self.fetch('runs', experiment_id=experiment_id)
+
+    def sizes_by_run_range(self, experiment_id, first_run=None, last_run=None):
+        return self.fetch('sizes', experiment_id=experiment_id,
+                          first_run=FIRST_RUN if first_run is None else first_run,
+                          last_run=LAST_RUN if last_run is None else last_run)
+
+    def detectors_used(self, experiment_id, first_run=None, last_run=None):
+        return self.fetch('detectors', experiment_id=experiment_id,
+                          first_run=FIRST_RUN if first_run is None else first_run,
+                          last_run=LAST_RUN if last_run is None else last_run)
+
+    def detector_run_ranges(self, experiment_id, detector_name, first_run=None, last_run=None):
+        """Ranges of consecutive runs, as (run_start, run_end), in which the detector was checked."""
+        return self.fetch('detector-runs', experiment_id=experiment_id, detector_name=detector_name,
+                          first_run=FIRST_RUN if first_run is None else first_run,
+                          last_run=LAST_RUN if last_run is None else last_run)
+
+    def runs_with_detector(self, experiment_id, detector_name, first_run=None, last_run=None):
+        return [run for ranges in self.detector_run_ranges(experiment_id, detector_name, first_run, last_run)
+                for run in range(ranges['run_start'], ranges['run_end'] + 1)]
+
+    def detectors_in_run(self, experiment_id, run_number):
+        return [row['detector_name'] for row in self.fetch('run-detectors', experiment_id=experiment_id, run_number=run_number)]
+
+    def logbook_by_run(self, experiment_id, first_run, last_run=None):
+        return self.fetch('logbook-run', experiment_id=experiment_id, first_run=first_run,
+                          last_run=first_run if last_run is None else last_run)
+
+    def logbook_by_time(self, experiment_id, since=None, until=None):
+        """Entries posted in [since, until); naive times are taken as UTC."""
+        since, until = time_range(since, until)
+        return self.fetch('logbook-time', experiment_id=experiment_id, since=since, until=until)
+
+    def runs_by_time(self, experiment_id, since=None, until=None):
+        """Runs whose production started in [since, until)."""
+        since, until = time_range(since, until)
+        return self.fetch('runs-time', experiment_id=experiment_id, since=since, until=until)
+
+    def runs_with_events(self, experiment_id, min_events):
+        return self.fetch('runs-events', experiment_id=experiment_id, min_events=min_events)
+
+    def close(self):
+        self.conn.close()
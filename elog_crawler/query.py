@@ -0,0 +1,106 @@
+import sqlite3
+import argparse
+import csv
+import json
+import sys
+
+from .db_profiles import PROFILES, apply_profile
+
+def connect_readonly(db_name, profile='serving'):
+    conn = sqlite3.connect(f'file:{db_name}?mode=ro', uri=True)
+    apply_profile(conn, profile, readonly=True)
+    return conn
+
+def parse_run_range(text):
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+def write_rows(cursor, output_format='csv', out=sys.stdout, chunk_size=1000):
+    """Stream a cursor's rows as CSV, NDJSON or a JSON array, ``chunk_size`` rows at a time."""
+    columns = [column[0] for column in cursor.description]
+    if output_format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(columns)
+    elif output_format == 'json':
+        out.write('[')
+    separator = ''
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        if output_format == 'csv':
+            writer.writerows(rows)
+        elif output_format == 'json':
+            for row in rows:
+                out.write(separator + '\n' + json.dumps(dict(zip(columns, row))))
+                separator = ','
+        else:
+            for row in rows:
+                out.write(json.dumps(dict(zip(columns, row))) + '\n')
+    if output_format == 'json':
+        out.write('\n]\n')
+
+def named_query(argv):
+    from .queries import ExperimentQueries, FIRST_RUN, LAST_RUN, time_range
+
+    parser = argparse.ArgumentParser(prog='elog-crawler query', description="Run one of the common queries against the experiment database.")
+    parser.add_argument('name', choices=NAMED_QUERIES, help="runs: runs of the experiment; sizes: file counts and sizes per run; "
+                                                            "detectors: detectors used; logbook: logbook entries by run or time")
+    parser.add_argument('experiment', help="Experiment ID")
+    parser.add_argument('--runs', type=parse_run_range, help="Run or run range, e.g. 12 or 10-20")
+    parser.add_argument('--detector', help="detectors: the run ranges in which this detector was checked")
+    parser.add_argument('--since', help="logbook: entries posted at or after this time (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument('--until', help="logbook: entries posted before this time")
+    parser.add_argument('--db', default='experiment_database.db', help="Path to the SQLite database file")
+    parser.add_argument('--format', choices=['csv', 'ndjson', 'json'], default='csv', help="Output format")
+    args = parser.parse_args(argv)
+
+    first_run, last_run = args.runs or (FIRST_RUN, LAST_RUN)
+    params = {'experiment_id': args.experiment, 'first_run': first_run, 'last_run': last_run}
+    name = args.name
+    if name == 'logbook':
+        if args.since or args.until:
+            name = 'logbook-time'
+            try:
+                since, until = time_range(args.since, args.until)
+            except ValueError as e:
+                parser.error(str(e))
+            params = {'experiment_id': args.experiment, 'since': since, 'until': until}
+        else:
+            name = 'logbook-run'
+    elif name == 'detectors' and args.detector:
+        name = 'detector-runs'
+        params['detector_name'] = args.detector
+    elif name == 'runs':
+        params = {'experiment_id': args.experiment}
+
+    queries = ExperimentQueries(args.db)
+    try:
+        write_rows(queries.execute(name, **params), args.format)
+    finally:
+        queries.close()
+
+NAMED_QUERIES = ['runs', 'sizes', 'detectors', 'logbook']
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in NAMED_QUERIES:
+        return named_query(argv)
+
+    parser = argparse.ArgumentParser(description="Run a read-only SQL query against the experiment database, "
+                                                 f"or one of the common queries: {', '.join(NAMED_QUERIES)} (see 'query <name> -h').")
+    parser.add_argument('sql', help="SQL statement to run")
+    parser.add_argument('params', nargs='*', help="Values for the statement's ? placeholders")
+    parser.add_argument('--db', default='experiment_database.db', help="Path to the SQLite database file")
+    parser.add_argument('--format', choices=['csv', 'ndjson', 'json'], default='csv', help="Output format")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='serving', help="SQLite connection profile")
+    args = parser.parse_args(argv)
+
+    conn = connect_readonly(args.db, args.profile)
+    try:
+        write_rows(conn.execute(args.sql, args.params), args.format)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,9 @@ CREATE TABLE Experiment (
     description TEXT,
     slack_channels TEXT,
     analysis_queues TEXT,
-    urawi_proposal TEXT
+    urawi_proposal TEXT,
+    start_time_epoch INTEGER,  -- start_time and end_time parsed to epoch seconds
+    end_time_epoch INTEGER
 );
 
 CREATE TABLE ExperimentTabs (
@@ -27,26 +29,34 @@ CREATE TABLE ExperimentTabs (
 
 -- Run Table (combines info from file_manager, runtable, and logbook)
 CREATE TABLE Run (
-    run_number INTEGER PRIMARY KEY,
+    run_number INTEGER,
     experiment_id TEXT,
     start_time DATETIME,
     end_time DATETIME,
     n_events INTEGER,
     n_damaged INTEGER,
+    PRIMARY KEY (experiment_id, run_number),
     FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
 );
 
--- Detector Table (from runtable)
-CREATE TABLE Detector (
-    detector_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    experiment_id TEXT,
-    run_number INTEGER,
-    detector_name TEXT,
-    status TEXT,
-    FOREIGN KEY (run_number) REFERENCES Run(run_number),
-    FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
+-- Detectors checked per run (from runtable), as ranges of consecutive runs
+CREATE TABLE DetectorName (
+    detector_key INTEGER PRIMARY KEY,
+    detector_name TEXT NOT NULL UNIQUE
 );
 
+CREATE TABLE DetectorRunRange (
+    experiment_id TEXT NOT NULL,
+    detector_key INTEGER NOT NULL REFERENCES DetectorName (detector_key),
+    run_start INTEGER NOT NULL,
+    run_end INTEGER NOT NULL,
+    PRIMARY KEY (experiment_id, detector_key, run_start)
+) WITHOUT ROWID;
+
+-- View with one row per checked detector and run; inserting into it
+-- extends or merges the ranges
+CREATE VIEW Detector (experiment_id, run_number, detector_name, status) AS ...;
+
 -- Logbook Table
 CREATE TABLE Logbook (
     log_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -56,6 +66,8 @@ CREATE TABLE Logbook (
     content TEXT,
     tags TEXT,
     author TEXT,
+    entry_hash TEXT UNIQUE,  -- sha1 of experiment, run, timestamp, author and content
+    timestamp_epoch INTEGER,
     FOREIGN KEY (run_number) REFERENCES Run(run_number),
     FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
 );
@@ -70,6 +82,8 @@ CREATE TABLE DataProduction (
     n_dropped INTEGER,
     prod_start DATETIME,
     prod_end DATETIME,
+    prod_start_epoch INTEGER,
+    prod_end_epoch INTEGER,
     FOREIGN KEY (run_number) REFERENCES Run(run_number),
     FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
 );
@@ -94,132 +108,330 @@ import os
 import argparse
 import logging
 import sys
-
+import time
+import functools
+from .outputs import read_parquet, read_document, read_ndjson_gz, iter_json_items
+from .ingest_metrics import IngestMetrics
+from .schema import migrate, logbook_entry_hash, to_int
+from .timestamps import parse_timestamp
+from .ledger import changed_files, record_file, scan_directory
+from .summary import refresh_summary
+from .db_profiles import PROFILES, apply_profile, defers_indexes, defer_indexes, restore_indexes
+
+# Logbook content can exceed csv's default field limit; --max-field-size truncates after parsing
 csv.field_size_limit(sys.maxsize)
 
+# Columns written by the batched ingest path (queue_row/flush), per table.
+TABLE_COLUMNS = {
+    'Run'           : ('run_number', 'experiment_id', 'start_time', 'end_time', 'n_events', 'n_damaged'),
+    'Detector'      : ('experiment_id', 'run_number', 'detector_name', 'status'),
+    'Logbook'       : ('experiment_id', 'run_number', 'timestamp', 'content', 'tags', 'author', 'entry_hash', 'timestamp_epoch'),
+    'DataProduction': ('experiment_id', 'run_number', 'n_events', 'n_damaged', 'n_dropped', 'prod_start', 'prod_end',
+                       'prod_start_epoch', 'prod_end_epoch'),
+    'FileManager'   : ('experiment_id', 'run_number', 'number_of_files', 'total_size_bytes'),
+}
+
+# Columns converted to integers when a row is queued
+INT_COLUMNS = {
+    'Run'           : {'run_number', 'n_events', 'n_damaged'},
+    'Detector'      : {'run_number'},
+    'Logbook'       : {'run_number'},
+    'DataProduction': {'run_number', 'n_events', 'n_damaged', 'n_dropped'},
+    'FileManager'   : {'run_number', 'number_of_files', 'total_size_bytes'},
+}
+
+# Epoch seconds columns and the timestamp text column each is parsed from
+EPOCH_COLUMNS = {
+    'Logbook'       : {'timestamp_epoch': 'timestamp'},
+    'DataProduction': {'prod_start_epoch': 'prod_start', 'prod_end_epoch': 'prod_end'},
+}
+
+# Tables that are views written through an INSTEAD OF trigger.  Detector
+# merges each row into its run ranges and skips runs a range already covers.
+VIEW_TABLES = {'Detector'}
+
+# Search indexes that write_batch fills with one INSERT ... SELECT per batch
+# instead of their per-row insert trigger, which it drops for the batch:
+# (trigger, newest key query, index query for the rows after a key).  Their
+# tables are only written with INSERT OR IGNORE, so a batch adds rows with
+# keys above all earlier ones and never changes a row it added.
+BATCH_INDEXED = {
+    'Logbook': ('logbook_search_insert', 'SELECT MAX(log_id) FROM Logbook', '''
+        INSERT INTO LogbookSearch (rowid, content, tags, author)
+        SELECT log_id, content, tags, author FROM Logbook WHERE log_id > ?
+    '''),
+}
+
+# Natural key of each table, matching its primary key or unique index in schema.py.
+CONFLICT_KEYS = {
+    'Run'           : ('experiment_id', 'run_number'),
+    'Logbook'       : ('entry_hash',),
+    'DataProduction': ('experiment_id', 'run_number'),
+    'FileManager'   : ('experiment_id', 'run_number'),
+}
+
+# Suffixes of the crawl output files and the file type each one holds.
+FILE_TYPES = {
+    '.info.json'              : 'info',
+    '.info.ndjson.gz'         : 'info',
+    '.file_manager.csv'       : 'file_manager',
+    '.file_manager.parquet'   : 'file_manager',
+    '.logbook.csv'            : 'logbook',
+    '.logbook.parquet'        : 'logbook',
+    '.runtable.json'          : 'runtable',
+    '.runtable.ndjson.gz'     : 'runtable',
+    '.data_production.parquet': 'data_production'
+}
+
+def experiment_id_from_path(file_path):
+    return os.path.basename(file_path).split('.')[0]
+
+def parse_json(file_path):
+    try:
+        with open(file_path, 'r') as file:
+            return json.load(file)
+    except json.JSONDecodeError:
+        logging.error(f"Error parsing JSON file: {file_path}")
+        return None
+    except FileNotFoundError:
+        logging.error(f"File not found: {file_path}")
+        return None
+
+# Fields that identify a row are never truncated, or distinct rows would collide.  Logbook
+# content is part of the entry hash, so it is read whole and capped when its row is built.
+KEY_FIELDS = {'Run', 'Run Number', 'Posted', 'Author', 'Content'}
+
+# Columns typed_row caps to ``max_field_size``, after the entry hash has been taken
+CAPPED_COLUMNS = {'Logbook': {'content'}}
+
+def cap_fields(row, max_field_size):
+    """Truncate string values longer than ``max_field_size`` characters."""
+    if not max_field_size:
+        return row
+    for key, value in row.items():
+        if isinstance(value, str) and len(value) > max_field_size and key not in KEY_FIELDS:
+            row[key] = value[:max_field_size]
+    return row
+
+def _csv_rows(file, max_field_size):
+    with file:
+        for row in csv.DictReader(file):
+            yield cap_fields(row, max_field_size)
+
+def parse_csv(file_path, max_field_size=None):
+    """Stream the rows of a CSV file; the file is opened now so a missing file is reported here."""
+    try:
+        file = open(file_path, 'r', newline='')
+    except FileNotFoundError:
+        logging.error(f"File not found: {file_path}")
+        return None
+    return _csv_rows(file, max_field_size)
+
+def load_rows(file_path, max_field_size=None):
+    """Stream the rows of a tabular crawl output, CSV or Parquet."""
+    if file_path.endswith('.parquet'):
+        if not os.path.exists(file_path):
+            logging.error(f"File not found: {file_path}")
+            return None
+        return (cap_fields(row, max_field_size) for row in read_parquet(file_path))
+    return parse_csv(file_path, max_field_size)
+
+def load_document(file_path):
+    """A JSON crawl document, plain or as gzip NDJSON."""
+    if file_path.endswith('.ndjson.gz'):
+        try:
+            return read_document(file_path)
+        except FileNotFoundError:
+            logging.error(f"File not found: {file_path}")
+            return None
+        except (OSError, ValueError, KeyError):
+            logging.error(f"Error parsing NDJSON file: {file_path}")
+            return None
+    return parse_json(file_path)
+
+def load_runtable_items(file_path, max_field_size=None):
+    """
+    Stream a run table document as (section, item) pairs, one per Data
+    Production row or Detectors row, without loading the whole document.
+    """
+    if not os.path.exists(file_path):
+        logging.error(f"File not found: {file_path}")
+        return None
+    if file_path.endswith('.ndjson.gz'):
+        items = ((record['section'], record['item']) for record in read_ndjson_gz(file_path) if 'item' in record)
+    else:
+        items = iter_json_items(file_path)
+    return ((section, cap_fields(item, max_field_size) if isinstance(item, dict) else item) for section, item in items)
+
+# Normalizers turn the rows of one crawl output into (table, conflict, data)
+# records for queue_row.  A record with conflict None is counted as skipped.
+
+def file_manager_records(experiment_id, rows):
+    for row in rows:
+        # Only make sure the run exists; its details come from the run table
+        yield 'Run', 'IGNORE', {
+            'experiment_id': experiment_id,
+            'run_number'   : row['Run Number'],
+        }
+        yield 'FileManager', 'REPLACE', {
+            'experiment_id' : experiment_id,
+            'run_number': row['Run Number'],
+            'number_of_files': row['Number of Files'],
+            'total_size_bytes': row['Total Size (bytes)']
+        }
+
+def logbook_records(experiment_id, rows, last_run_number=None):
+    """Entries without a run number belong to the run of the entry before them, or ``last_run_number`` for the first."""
+    for row in rows:
+        if row['Run']:
+            last_run_number = int(row['Run'])
+        if last_run_number is None:
+            yield 'Logbook', None, None
+        else:
+            # The hash covers all of an entry's content, so an entry already stored is left as it is
+            yield 'Logbook', 'IGNORE', {
+                'experiment_id': experiment_id,
+                'run_number': last_run_number,
+                'timestamp': row['Posted'],
+                'content': row['Content'],
+                'tags': row['Tags'],
+                'author': row['Author'],
+                'entry_hash': logbook_entry_hash(experiment_id, last_run_number, row['Posted'], row['Author'], row['Content'])
+            }
+
+def data_production_records(experiment_id, runs):
+    for run in runs:
+        yield 'Run', 'REPLACE', {
+            'experiment_id': experiment_id,
+            'run_number': run.get('Run'),
+            'start_time': None,
+            'end_time': None,
+            'n_events': run.get('N events'),
+            'n_damaged': run.get('N damaged')
+        }
+        yield 'DataProduction', 'REPLACE', {
+            'experiment_id': experiment_id,
+            'run_number'   : run.get('Run', None),
+            'n_events'     : run.get('N events', None),
+            'n_damaged'    : run.get('N damaged', None),
+            'n_dropped'    : run.get('N dropped', None),
+            'prod_start'   : run.get('Prod Start', None),
+            'prod_end'     : run.get('Prod End', None),
+        }
+
+def runtable_records(experiment_id, items):
+    for section, item in items:
+        if section == 'Data Production':
+            yield from data_production_records(experiment_id, [item])
+        elif section == 'Detectors':
+            for key, value in item.items():
+                if key != 'Run' and value == 'Checked':
+                    yield 'Detector', 'IGNORE', {
+                        'experiment_id': experiment_id,
+                        'run_number': item['Run'],
+                        'detector_name': key,
+                        'status': value
+                    }
+
+# Reader and normalizer for each row-oriented file type; info files go to store_experiment.
+NORMALIZERS = {
+    'file_manager'   : (load_rows, file_manager_records),
+    'logbook'        : (load_rows, logbook_records),
+    'data_production': (load_rows, data_production_records),
+    'runtable'       : (load_runtable_items, runtable_records),
+}
+
+def typed_row(table, data, max_field_size=None):
+    """
+    Row tuple for ``data`` in TABLE_COLUMNS order, with counts converted to
+    integers, the epoch columns parsed from their timestamp text and the
+    CAPPED_COLUMNS truncated to ``max_field_size``.
+    """
+    ints = INT_COLUMNS.get(table, ())
+    epochs = EPOCH_COLUMNS.get(table, {})
+    capped = CAPPED_COLUMNS.get(table, ()) if max_field_size else ()
+    row = []
+    for column in TABLE_COLUMNS[table]:
+        if column in epochs:
+            row.append(parse_timestamp(data.get(epochs[column])))
+        elif column in ints:
+            row.append(to_int(data.get(column)))
+        elif column in capped and isinstance(data.get(column), str):
+            row.append(data[column][:max_field_size])
+        else:
+            row.append(data.get(column))
+    return tuple(row)
+
+def group_records(records, max_field_size=None):
+    """Row tuples in TABLE_COLUMNS order per (table, conflict), ready for queue_rows."""
+    batches = {}
+    for table, conflict, data in records:
+        row = None if data is None else typed_row(table, data, max_field_size)
+        batches.setdefault((table, conflict), []).append(row)
+    return batches
+
 class ExperimentDBManager:
-    def __init__(self, db_name='experiment_database.db'):
+    # How rows written by flush are counted in the ingest metrics
+    row_outcome = 'inserted'
+    # Whether writes need the unique indexes kept during a bulk load (as ON CONFLICT targets)
+    keep_unique_indexes = False
+
+    def __init__(self, db_name='experiment_database.db', batch_size=1000, profile='default', max_field_size=None,
+                 engine='rows'):
         self.conn = sqlite3.connect(db_name)
         self.cursor = self.conn.cursor()
+        self.profile = profile
+        apply_profile(self.conn, profile)
+        # Rows replaced by INSERT OR REPLACE must fire the delete triggers that keep the search index in step
+        self.conn.execute('PRAGMA recursive_triggers = ON')
+        self.batch_size = batch_size
+        self.max_field_size = max_field_size
+        self.pending = {}
+        self.table_stats = {}
+        self.ledger_pending = {}
+        self.summary_pending = set()
+        self.metrics = IngestMetrics()
         self.create_tables()
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
         # Dictionary mapping file types to processing methods
         self.file_processors = {
-            'info'        : self.process_info_file,
-            'file_manager': self.process_file_manager,
-            'logbook'     : self.process_logbook,
-            'runtable'    : self.process_runtable
+            'info'           : self.process_info_file,
+            'file_manager'   : self.process_file_manager,
+            'logbook'        : self.process_logbook,
+            'runtable'       : self.process_runtable,
+            'data_production': self.process_data_production
         }
 
+        # The vectorized engine takes over the file types it supports
+        self.engine = engine
+        if engine == 'vectorized':
+            from .vectorized import BATCHERS, _import_pandas
+            _import_pandas()
+            for file_type in BATCHERS:
+                self.file_processors[file_type] = functools.partial(self.process_vectorized, file_type=file_type)
+
         # Dictionary mapping file extensions to file types
-        self.file_types = {
-            '.info.json'       : 'info',
-            '.file_manager.csv': 'file_manager',
-            '.logbook.csv'     : 'logbook',
-            '.runtable.json'   : 'runtable'
-        }
+        self.file_types = dict(FILE_TYPES)
 
     def create_tables(self):
-        self.cursor.executescript('''
-            CREATE TABLE IF NOT EXISTS Experiment (
-                experiment_id TEXT PRIMARY KEY,
-                name TEXT,
-                instrument TEXT,
-                start_time DATETIME,
-                end_time DATETIME,
-                pi TEXT,
-                pi_email TEXT,
-                leader_account TEXT,
-                description TEXT,
-                slack_channels TEXT,
-                analysis_queues TEXT,
-                urawi_proposal TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS ExperimentTabs (
-                tab_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                experiment_id TEXT,
-                tab_name TEXT,
-                tab_content TEXT,
-                FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS Run (
-                run_number INTEGER PRIMARY KEY,
-                experiment_id TEXT,
-                start_time DATETIME,
-                end_time DATETIME,
-                n_events INTEGER,
-                n_damaged INTEGER,
-                FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS Detector (
-                detector_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                experiment_id TEXT,
-                run_number INTEGER,
-                detector_name TEXT,
-                status TEXT,
-                FOREIGN KEY (run_number) REFERENCES Run(run_number),
-                FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS Logbook (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                experiment_id TEXT,
-                run_number INTEGER,
-                timestamp DATETIME,
-                content TEXT,
-                tags TEXT,
-                author TEXT,
-                FOREIGN KEY (run_number) REFERENCES Run(run_number),
-                FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS DataProduction (
-                production_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                experiment_id TEXT,
-                run_number INTEGER,
-                n_events INTEGER,
-                n_damaged INTEGER,
-                n_dropped INTEGER,
-                prod_start DATETIME,
-                prod_end DATETIME,
-                FOREIGN KEY (run_number) REFERENCES Run(run_number),
-                FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS FileManager (
-                file_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                experiment_id TEXT,
-                run_number INTEGER,
-                number_of_files INTEGER,
-                total_size_bytes INTEGER,
-                FOREIGN KEY (run_number) REFERENCES Run(run_number),
-                FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
-            );
-        ''')
-        self.conn.commit()
+        # Indexes left dropped by an unfinished bulk load come back before any migration touches them
+        restore_indexes(self.conn)
+        migrate(self.conn)
+        if defers_indexes(self.profile):
+            defer_indexes(self.conn, keep_unique=self.keep_unique_indexes)
 
     def parse_json(self, file_path):
-        try:
-            with open(file_path, 'r') as file:
-                return json.load(file)
-        except json.JSONDecodeError:
-            logging.error(f"Error parsing JSON file: {file_path}")
-            return None
-        except FileNotFoundError:
-            logging.error(f"File not found: {file_path}")
-            return None
+        return parse_json(file_path)
 
     def parse_csv(self, file_path):
-        try:
-            with open(file_path, 'r') as file:
-                return list(csv.DictReader(file))
-        except FileNotFoundError:
-            logging.error(f"File not found: {file_path}")
-            return None
+        return parse_csv(file_path, self.max_field_size)
+
+    def read_rows(self, file_path):
+        return load_rows(file_path, self.max_field_size)
+
+    def read_document(self, file_path):
+        return load_document(file_path)
 
     def parse_main_content(self, main_content):
         lines = main_content.split('\n')
@@ -269,8 +481,9 @@ class ExperimentDBManager:
             main_content = self.parse_main_content(data.get('main_content', ''))
             self.cursor.execute('''
                 INSERT OR REPLACE INTO Experiment 
-                (experiment_id, name, instrument, start_time, end_time, pi, pi_email, leader_account, description, slack_channels, analysis_queues, urawi_proposal)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                (experiment_id, name, instrument, start_time, end_time, pi, pi_email, leader_account, description, slack_channels, analysis_queues, urawi_proposal,
+                 start_time_epoch, end_time_epoch)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 data.get('experiment_id'),
                 main_content.get('Name'),
@@ -283,7 +496,9 @@ class ExperimentDBManager:
                 main_content.get('Description'),
                 main_content.get('Slack channels'),
                 main_content.get('Analysis Queues'),
-                main_content.get('URAWI Proposal')
+                main_content.get('URAWI Proposal'),
+                parse_timestamp(main_content.get('Start Time')),
+                parse_timestamp(main_content.get('End Time'))
             ))
 
             # Insert tab information
@@ -295,220 +510,250 @@ class ExperimentDBManager:
                     VALUES (?, ?, ?)
                 ''', (data.get('experiment_id'), tab_name, json.dumps(tab_content)))
 
-            ## self.conn.commit()
-            logging.info(f"Inserted experiment: {data.get('experiment_id')}")
+            self.metrics.count('Experiment', 'inserted')
+            self.metrics.count('ExperimentTabs', 'inserted', len(tabs))
+            logging.debug(f"Inserted experiment: {data.get('experiment_id')}")
         except sqlite3.Error as e:
+            self.metrics.count('Experiment', 'failed')
             logging.error(f"Error inserting experiment data: {e}")
         except Exception as e:
+            self.metrics.count('Experiment', 'failed')
             logging.error(f"Unexpected error inserting experiment data: {e}")
 
-    def insert_run(self, data):
-        try:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO Run 
-                (run_number, experiment_id, start_time, end_time, n_events, n_damaged)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                data.get('Run'),  # Changed from 'run_number' to 'Run'
-                data.get('experiment_id'),
-                data.get('start_time'),
-                data.get('end_time'),
-                data.get('n_events'),
-                data.get('n_damaged')
-            ))
-            ## self.conn.commit()
-            logging.info(f"Inserted run: {data.get('Run')}")
-        except sqlite3.Error as e:
-            logging.error(f"Error inserting run data: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error inserting run data: {e}")
-
-    def insert_detector(self, data):
-        try:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO Detector 
-                (experiment_id, run_number, detector_name, status)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                data.get('experiment_id'),
-                data.get('run_number'),
-                data.get('detector_name'),
-                data.get('status')
-            ))
-            ## self.conn.commit()
-            logging.info(f"Inserted detector: {data.get('detector_name')} for run {data.get('run_number')}")
-        except sqlite3.Error as e:
-            logging.error(f"Error inserting detector data: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error inserting detector data: {e}")
-
-    def insert_logbook(self, data):
-        try:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO Logbook 
-                (experiment_id, run_number, timestamp, content, tags, author)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                data.get('experiment_id'),
-                data.get('run_number'),
-                data.get('timestamp'),
-                data.get('content'),
-                data.get('tags'),
-                data.get('author')
-            ))
-            ## self.conn.commit()
-            logging.info(f"Inserted logbook entry for run {data.get('run_number')}")
-        except sqlite3.Error as e:
-            logging.error(f"Error inserting logbook data: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error inserting logbook data: {e}")
-
-    def insert_data_production(self, data):
-        try:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO DataProduction 
-                (experiment_id, run_number, n_events, n_damaged, n_dropped, prod_start, prod_end)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                data.get('experiment_id'),
-                data.get('run_number'),
-                data.get('n_events'),
-                data.get('n_damaged'),
-                data.get('n_dropped'),
-                data.get('prod_start'),
-                data.get('prod_end')
-            ))
-            ## self.conn.commit()
-            logging.info(f"Inserted data production for run {data.get('run_number')}")
-        except sqlite3.Error as e:
-            logging.error(f"Error inserting data production: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error inserting data production: {e}")
-
-    def insert_file_manager(self, data):
+    def queue_row(self, table, data, conflict='REPLACE'):
+        """
+        Queue a row for ``table``.  Queued rows are written with executemany
+        once ``batch_size`` of them have accumulated, and by ``flush``.
+        """
+        key = (table, conflict)
+        pending = self.pending.setdefault(key, [])
+        pending.append(typed_row(table, data, self.max_field_size))
+        if len(pending) >= self.batch_size:
+            self.flush_table(key)
+
+    def queue_rows(self, table, rows, conflict='REPLACE'):
+        """Queue row tuples already in TABLE_COLUMNS order; conflict None counts them as skipped."""
+        if conflict is None:
+            self.metrics.count(table, 'skipped', len(rows))
+            return
+        key = (table, conflict)
+        pending = self.pending.setdefault(key, [])
+        pending.extend(rows)
+        if len(pending) >= self.batch_size:
+            self.flush_table(key)
+
+    def queue_batches(self, batches):
+        """Queue ``{(table, conflict): [row tuples]}`` batches, as built by group_records."""
+        for (table, conflict), rows in batches.items():
+            self.queue_rows(table, rows, conflict)
+
+    def queue_records(self, records):
+        for table, conflict, data in records:
+            if conflict is None:
+                self.metrics.count(table, 'skipped')
+            else:
+                self.queue_row(table, data, conflict)
+
+    def insert_sql(self, table, conflict):
+        columns = TABLE_COLUMNS[table]
+        return f"INSERT OR {conflict} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    def flush_table(self, key):
+        rows = self.pending.pop(key, None)
+        if not rows:
+            return
+        table, conflict = key
+        sql = self.insert_sql(table, conflict)
+        for start in range(0, len(rows), self.batch_size):
+            self.write_batch(table, sql, rows[start:start + self.batch_size])
+
+    def write_batch(self, table, sql, rows):
+        stats = self.table_stats.setdefault(table, {'rows': 0, 'failed': 0, 'seconds': 0.0})
+        start = time.perf_counter()
+        inserted = failed = 0
+        self.cursor.execute('SAVEPOINT batch')
+        deferred = self.drop_search_trigger(table)
         try:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO FileManager 
-                (experiment_id, run_number, number_of_files, total_size_bytes)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                data.get('experiment_id'),
-                data.get('run_number'),
-                data.get('number_of_files'),
-                data.get('total_size_bytes')
-            ))
-            ## self.conn.commit()
-            logging.info(f"Inserted file manager data for run {data.get('run_number')}")
+            self.cursor.executemany(sql, rows)
+            # SQLite reports no row count for inserts into a view through its trigger
+            inserted = len(rows) if table in VIEW_TABLES else self.cursor.rowcount
+            if deferred:
+                self.index_batch(table, *deferred)
         except sqlite3.Error as e:
-            logging.error(f"Error inserting file manager data: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error inserting file manager data: {e}")
+            # Redo the chunk row by row so a bad row only loses itself; the
+            # rollback brings back a dropped search trigger for the retry
+            self.cursor.execute('ROLLBACK TO batch')
+            logging.warning(f"Batch of {len(rows)} {table} rows failed ({e}), retrying row by row")
+            for row in rows:
+                try:
+                    self.cursor.execute(sql, row)
+                    inserted += 1 if table in VIEW_TABLES else self.cursor.rowcount
+                except sqlite3.Error as e:
+                    failed += 1
+                    logging.debug(f"Error inserting {table} row {row}: {e}")
+            if failed:
+                logging.error(f"{failed} of {len(rows)} {table} rows failed")
+        self.cursor.execute('RELEASE batch')
+        seconds = time.perf_counter() - start
+
+        stats['rows'] += inserted
+        stats['failed'] += failed
+        stats['seconds'] += seconds
+        self.metrics.count(table, self.row_outcome, inserted, seconds)
+        if len(rows) - inserted - failed:
+            self.metrics.count(table, 'skipped', len(rows) - inserted - failed)
+        if failed:
+            self.metrics.count(table, 'failed', failed)
+
+    def drop_search_trigger(self, table):
+        """Drop the table's per-row search trigger for a batch; returns (trigger sql, newest key) or None."""
+        if table not in BATCH_INDEXED:
+            return None
+        trigger, newest_key_sql, _ = BATCH_INDEXED[table]
+        row = self.cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (trigger,)).fetchone()
+        if row is None:
+            return None
+        newest_key = self.cursor.execute(newest_key_sql).fetchone()[0]
+        self.cursor.execute(f'DROP TRIGGER {trigger}')
+        return row[0], newest_key or 0
+
+    def index_batch(self, table, trigger_sql, newest_key):
+        """Index the rows the batch added in one statement, then restore the trigger."""
+        self.cursor.execute(BATCH_INDEXED[table][2], (newest_key,))
+        self.cursor.execute(trigger_sql)
+
+    def flush(self):
+        for key in list(self.pending):
+            self.flush_table(key)
+
+    def report_file(self, file_path, seconds):
+        total = sum(stats['rows'] for stats in self.table_stats.values())
+        logging.info(f"{file_path}: {total} rows in {seconds:.2f}s")
+        for table, stats in sorted(self.table_stats.items()):
+            rate = stats['rows'] / stats['seconds'] if stats['seconds'] else 0
+            logging.info(f"  {table:<14} {stats['rows']:>8} rows  {stats['failed']:>5} failed  "
+                         f"{stats['seconds']:.3f}s  ({rate:.0f} rows/s)")
+
+    def store_experiment(self, data):
+        self.insert_experiment(data)
 
     def process_info_file(self, file_path):
-        try:
-            with open(file_path, 'r') as file:
-                data = json.load(file)
-            if data:
-                experiment_id = os.path.basename(file_path).split('.')[0]
-                data['experiment_id'] = experiment_id
-                self.insert_experiment(data)
-                logging.info(f"Processed info file: {file_path}")
-            else:
-                logging.warning(f"No data found in info file: {file_path}")
-        except json.JSONDecodeError:
-            logging.error(f"Error parsing JSON file: {file_path}")
-        except FileNotFoundError:
-            logging.error(f"File not found: {file_path}")
-        except Exception as e:
-            logging.error(f"Unexpected error processing info file: {e}")
+        data = self.read_document(file_path)
+        if data:
+            data['experiment_id'] = experiment_id_from_path(file_path)
+            self.store_experiment(data)
+            logging.info(f"Processed info file: {file_path}")
+        else:
+            logging.warning(f"No data found in info file: {file_path}")
 
     def process_file_manager(self, file_path):
-        data = self.parse_csv(file_path)
+        data = self.read_rows(file_path)
         if data:
-            experiment_id = os.path.basename(file_path).split('.')[0]
-            for row in data:
-                self.insert_run(row)
-                self.insert_file_manager({
-                    'experiment_id' : experiment_id,
-                    'run_number': row['Run Number'],
-                    'number_of_files': row['Number of Files'],
-                    'total_size_bytes': row['Total Size (bytes)']
-                })
+            self.queue_records(file_manager_records(experiment_id_from_path(file_path), data))
             logging.info(f"Processed file manager: {file_path}")
         else:
             logging.warning(f"Failed to process file manager: {file_path}")
 
     def process_logbook(self, file_path):
-        data = self.parse_csv(file_path)
+        data = self.read_rows(file_path)
         if data:
-            experiment_id = os.path.basename(file_path).split('.')[0]
-            last_run_number = None
-            for row in data:
-                if row['Run']:
-                    last_run_number = int(row['Run'])
-                if last_run_number is not None:
-                    self.insert_logbook({
-                        'experiment_id': experiment_id,
-                        'run_number': last_run_number,
-                        'timestamp': row['Posted'],
-                        'content': row['Content'],
-                        'tags': row['Tags'],
-                        'author': row['Author']
-                    })
+            self.queue_records(logbook_records(experiment_id_from_path(file_path), data))
             logging.info(f"Processed logbook: {file_path}")
         else:
             logging.warning(f"Failed to process logbook: {file_path}")
 
+    def store_data_production_rows(self, experiment_id, runs):
+        self.queue_records(data_production_records(experiment_id, runs))
+
+    def process_data_production(self, file_path):
+        data = self.read_rows(file_path)
+        if data:
+            self.store_data_production_rows(experiment_id_from_path(file_path), data)
+            logging.info(f"Processed data production: {file_path}")
+        else:
+            logging.warning(f"Failed to process data production: {file_path}")
+
     def process_runtable(self, file_path):
-        data = self.parse_json(file_path)
+        data = load_runtable_items(file_path, self.max_field_size)
         if data:
-            experiment_id = os.path.basename(file_path).split('.')[0]
-            for run in data.get('Data Production', []):
-                self.insert_run({
-                    'experiment_id': experiment_id,
-                    'Run': run.get('Run'),
-                    'start_time': None,
-                    'end_time': None,
-                    'n_events': run.get('N events'),
-                    'n_damaged': run.get('N damaged')
-                })
-                self.insert_data_production({
-                    'experiment_id': experiment_id,
-                    'run_number'   : run.get('Run', None),
-                    'n_events'     : run.get('N events', None),
-                    'n_damaged'    : run.get('N damaged', None),
-                    'n_dropped'    : run.get('N dropped', None),
-                    'prod_start'   : run.get('Prod Start', None),
-                    'prod_end'     : run.get('Prod End', None),
-                })
-            for detector in data.get('Detectors', []):
-                for key, value in detector.items():
-                    if key != 'Run' and value == 'Checked':
-                        self.insert_detector({
-                            'experiment_id': experiment_id,
-                            'run_number': detector['Run'],
-                            'detector_name': key,
-                            'status': value
-                        })
+            self.queue_records(runtable_records(experiment_id_from_path(file_path), data))
             logging.info(f"Processed runtable: {file_path}")
         else:
             logging.warning(f"Failed to process runtable: {file_path}")
 
+    def process_vectorized(self, file_path, file_type):
+        from .vectorized import file_batches
+        for batches in file_batches(file_path, file_type, experiment_id_from_path(file_path), self.max_field_size):
+            self.queue_batches(batches)
+        logging.info(f"Processed {file_type}: {file_path}")
+
+    def process_parsed(self, file_path, file_type, parsed):
+        """
+        Apply a file already read and normalized by ``pipeline.parse_file``:
+        the info document for info files, otherwise an iterable of
+        ``group_records`` batches.
+        """
+        if not parsed:
+            logging.warning(f"Failed to process {file_type}: {file_path}")
+            return
+        if file_type == 'info':
+            self.run_transaction(file_path, lambda: self.store_experiment(parsed))
+        else:
+            def work():
+                for batches in parsed:
+                    self.queue_batches(batches)
+            self.run_transaction(file_path, work)
+
     def process_file(self, file_path):
         file_type = self.get_file_type(file_path)
         processor = self.file_processors.get(file_type)
         if processor:
-            self.conn.execute('BEGIN TRANSACTION')
-            try:
-                processor(file_path)
-                self.conn.commit()
-                logging.info(f"Successfully processed and committed: {file_path}")
-            except Exception as e:
-                self.conn.rollback()
-                logging.error(f"Error processing {file_path}, transaction rolled back: {e}")
+            self.run_transaction(file_path, lambda: processor(file_path))
         else:
             logging.warning(f"Unknown file type: {file_path}")
 
+    def run_transaction(self, file_path, work):
+        self.table_stats = {}
+        start = time.perf_counter()
+        self.conn.execute('BEGIN TRANSACTION')
+        try:
+            work()
+            self.flush()
+            entry = self.ledger_pending.pop(file_path, None)
+            if entry:
+                record_file(self.conn, *entry)
+            self.update_summary([experiment_id_from_path(file_path)])
+            self.conn.commit()
+            logging.info(f"Successfully processed and committed: {file_path}")
+            if self.table_stats:
+                self.report_file(file_path, time.perf_counter() - start)
+            self.metrics.file_done(file_path, 'ok', time.perf_counter() - start)
+        except Exception as e:
+            self.pending = {}
+            self.ledger_pending.pop(file_path, None)
+            self.conn.rollback()
+            self.metrics.file_done(file_path, 'failed', time.perf_counter() - start)
+            logging.error(f"Error processing {file_path}, transaction rolled back: {e}")
+
+    def update_summary(self, experiment_ids):
+        """
+        Refresh the ExperimentSummary rows of ``experiment_ids`` in the current
+        transaction.  During a bulk load the indexes the refresh relies on are
+        dropped, so it waits until ``close`` has rebuilt them.
+        """
+        if defers_indexes(self.profile):
+            self.summary_pending.update(experiment_ids)
+        else:
+            refresh_summary(self.conn, experiment_ids)
+
+    def scan(self, directory):
+        """Files under ``directory`` that are new or changed since they were last ingested."""
+        files = []
+        for entry in changed_files(self.conn, scan_directory(directory, self.file_types), self.get_file_type):
+            self.ledger_pending[entry[0]] = entry
+            files.append(entry[0])
+        return files
+
     def get_file_type(self, file_path):
         for extension, file_type in self.file_types.items():
             if file_path.endswith(extension):
@@ -516,20 +761,49 @@ class ExperimentDBManager:
         return 'unknown'
 
     def close(self):
+        if defers_indexes(self.profile):
+            restore_indexes(self.conn)
+            if self.summary_pending:
+                refresh_summary(self.conn, sorted(self.summary_pending))
+                self.conn.commit()
+                self.summary_pending = set()
         self.conn.close()
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Process experiment files and update the database.")
-    parser.add_argument('files', nargs='+', help="Paths to the input files")
+    parser.add_argument('files', nargs='*', help="Paths to the input files")
     parser.add_argument('--db', default='experiment_database.db', help="Path to the SQLite database file")
-    args = parser.parse_args()
-
-    db_manager = ExperimentDBManager(args.db)
-
-    for file_path in args.files:
-        db_manager.process_file(file_path)
+    parser.add_argument('--scan', metavar='DIR', action='append', default=[],
+                        help="Ingest the crawl outputs under DIR that are new or changed since the last scan (repeatable)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Rows per executemany batch")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='default', help="SQLite connection profile (bulk-load for large initial loads)")
+    parser.add_argument('--max-field-size', type=int, help="Truncate text fields longer than this many characters")
+    parser.add_argument('--workers', type=int, default=1, help="Processes parsing files in parallel (the database is still written by one); "
+                             "parsed rows wait in temporary files")
+    parser.add_argument('--engine', choices=['rows', 'vectorized'], default='rows',
+                        help="vectorized: read logbook and file manager files in chunks with pandas")
+    parser.add_argument('--verbose', '-v', action='store_true', help="Log every row (debug level)")
+    args = parser.parse_args(argv)
+    if not args.files and not args.scan:
+        parser.error("give input files or --scan DIR")
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db_manager = ExperimentDBManager(args.db, batch_size=args.batch_size, profile=args.profile,
+                                     max_field_size=args.max_field_size, engine=args.engine)
+
+    files = list(args.files)
+    for directory in args.scan:
+        files.extend(db_manager.scan(directory))
+
+    if args.workers > 1:
+        from .pipeline import ingest_files
+        ingest_files(db_manager, files, args.workers)
+    else:
+        for file_path in files:
+            db_manager.process_file(file_path)
 
     db_manager.close()
+    db_manager.metrics.print_summary()
 
 if __name__ == "__main__":
     main()
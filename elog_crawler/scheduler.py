@@ -0,0 +1,108 @@
+"""
+Cost-aware scheduling of crawl jobs across workers.
+
+A job is one page type of one experiment.  Its expected cost comes from
+history kept in the experiment database: the durations of previous crawls of
+the same page (``CrawlHistory``) when there are any, otherwise a per-page base
+cost plus a per-row cost for the rows the experiment already has in
+``Logbook``/``FileManager``/``DataProduction``.  Jobs are then assigned
+longest-processing-time-first: largest job first, always to the worker with
+the least predicted work, so a few giant logbooks no longer start last and
+stretch the makespan.
+"""
+
+import heapq
+import sqlite3
+import time
+from collections import namedtuple
+
+PAGE_TYPES = ('logbook', 'file_manager', 'info', 'runtable')
+
+# Seconds a page takes regardless of size, and seconds per row already in the DB.
+BASE_COST = {'logbook': 10.0, 'file_manager': 8.0, 'info': 15.0, 'runtable': 12.0}
+ROW_COST = {'logbook': 0.02, 'file_manager': 0.01, 'info': 0.0, 'runtable': 0.03}
+
+ROW_COUNT_SQL = {
+    'logbook'     : 'SELECT COUNT(*) FROM Logbook WHERE experiment_id = ?',
+    'file_manager': 'SELECT COUNT(*) FROM FileManager WHERE experiment_id = ?',
+    'runtable'    : 'SELECT COUNT(*) FROM DataProduction WHERE experiment_id = ?',
+}
+
+# Weight of the most recent duration in the running estimate.
+HISTORY_WEIGHT = 0.5
+HISTORY_DEPTH = 5
+
+CrawlJob = namedtuple('CrawlJob', ['experiment_id', 'page_type', 'cost'])
+
+def _count_rows(conn, experiment_id, page_type):
+    sql = ROW_COUNT_SQL.get(page_type)
+    if sql is None:
+        return 0
+    try:
+        return conn.execute(sql, (experiment_id,)).fetchone()[0]
+    except sqlite3.OperationalError:
+        # Tables are missing until the first ingest.
+        return 0
+
+def estimate_cost(conn, experiment_id, page_type):
+    durations = [row[0] for row in conn.execute('''
+        SELECT duration FROM CrawlHistory
+        WHERE experiment_id = ? AND page_type = ? AND status = 'ok'
+        ORDER BY started_at DESC LIMIT ?
+    ''', (experiment_id, page_type, HISTORY_DEPTH))]
+    if durations:
+        estimate = durations[-1]
+        for duration in reversed(durations[:-1]):
+            estimate = HISTORY_WEIGHT * duration + (1 - HISTORY_WEIGHT) * estimate
+        return estimate
+    return BASE_COST[page_type] + ROW_COST[page_type] * _count_rows(conn, experiment_id, page_type)
+
+def make_jobs(conn, experiments, page_types):
+    return jobs_for_pages(conn, [(experiment_id, page_type) for experiment_id in experiments for page_type in page_types])
+
+def jobs_for_pages(conn, pages):
+    return [CrawlJob(experiment_id, page_type, estimate_cost(conn, experiment_id, page_type))
+            for experiment_id, page_type in pages]
+
+def assign_lpt(jobs, n_workers):
+    """
+    Longest-processing-time-first assignment.
+
+    Returns one job list per worker (each in execution order) and the
+    predicted busy time of every worker.
+    """
+    assignments = [[] for _ in range(n_workers)]
+    loads = [(0.0, worker) for worker in range(n_workers)]
+    heapq.heapify(loads)
+    for job in sorted(jobs, key=lambda job: job.cost, reverse=True):
+        load, worker = heapq.heappop(loads)
+        assignments[worker].append(job)
+        heapq.heappush(loads, (load + job.cost, worker))
+    predicted = [0.0] * n_workers
+    for load, worker in loads:
+        predicted[worker] = load
+    return assignments, predicted
+
+def record_crawl(conn, job, started_at, duration, rows, status, error=None):
+    conn.execute('''
+        INSERT INTO CrawlHistory (experiment_id, page_type, started_at, duration, predicted, rows, status, error)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (job.experiment_id, job.page_type, started_at, duration, job.cost, rows, status, error))
+
+def format_report(assignments, predicted, results, wall_time):
+    """Predicted versus actual busy time per worker, the overall makespan and the failed jobs."""
+    actual = [0.0] * len(assignments)
+    failed = []
+    for worker, job, started_at, duration, rows, status, error in results:
+        actual[worker] += duration
+        if status != 'ok':
+            failed.append((job, error))
+    lines = [f"{'worker':>6} {'jobs':>5} {'predicted (s)':>14} {'actual (s)':>11}"]
+    for worker, jobs in enumerate(assignments):
+        lines.append(f"{worker:>6} {len(jobs):>5} {predicted[worker]:14.1f} {actual[worker]:11.1f}")
+    lines.append(f"Predicted makespan: {max(predicted, default=0.0):.1f}s, actual: {wall_time:.1f}s "
+                 f"(finished {time.strftime('%Y-%m-%d %H:%M:%S')})")
+    if failed:
+        lines.append(f"{len(failed)} jobs failed (retried by the next run):")
+        lines.extend(f"  {job.experiment_id} {job.page_type}: {error}" for job, error in failed)
+    return '\n'.join(lines)
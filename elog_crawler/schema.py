@@ -0,0 +1,471 @@
+"""
+Versioned schema for the experiment database.
+
+The schema version of a database file is kept in ``PRAGMA user_version``.
+``MIGRATIONS[n]`` upgrades a database from version ``n`` to ``n + 1``, and
+``migrate`` applies the ones a file is missing, each in its own transaction,
+whenever the database is opened.  Files created before versioning report
+version 0; the first migration only creates tables that do not exist yet, so
+they are upgraded in place like any other.
+
+To change the schema, append a migration; never edit one that has shipped.
+"""
+
+import hashlib
+import logging
+
+from .timestamps import parse_timestamp
+
+BASE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS Experiment (
+    experiment_id TEXT PRIMARY KEY,
+    name TEXT,
+    instrument TEXT,
+    start_time DATETIME,
+    end_time DATETIME,
+    pi TEXT,
+    pi_email TEXT,
+    leader_account TEXT,
+    description TEXT,
+    slack_channels TEXT,
+    analysis_queues TEXT,
+    urawi_proposal TEXT
+);
+
+CREATE TABLE IF NOT EXISTS ExperimentTabs (
+    tab_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment_id TEXT,
+    tab_name TEXT,
+    tab_content TEXT,
+    FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
+);
+
+CREATE TABLE IF NOT EXISTS Run (
+    run_number INTEGER PRIMARY KEY,
+    experiment_id TEXT,
+    start_time DATETIME,
+    end_time DATETIME,
+    n_events INTEGER,
+    n_damaged INTEGER,
+    FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
+);
+
+CREATE TABLE IF NOT EXISTS Detector (
+    detector_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment_id TEXT,
+    run_number INTEGER,
+    detector_name TEXT,
+    status TEXT,
+    FOREIGN KEY (run_number) REFERENCES Run(run_number),
+    FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
+);
+
+CREATE TABLE IF NOT EXISTS Logbook (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment_id TEXT,
+    run_number INTEGER,
+    timestamp DATETIME,
+    content TEXT,
+    tags TEXT,
+    author TEXT,
+    FOREIGN KEY (run_number) REFERENCES Run(run_number),
+    FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
+);
+
+CREATE TABLE IF NOT EXISTS DataProduction (
+    production_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment_id TEXT,
+    run_number INTEGER,
+    n_events INTEGER,
+    n_damaged INTEGER,
+    n_dropped INTEGER,
+    prod_start DATETIME,
+    prod_end DATETIME,
+    FOREIGN KEY (run_number) REFERENCES Run(run_number),
+    FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
+);
+
+CREATE TABLE IF NOT EXISTS FileManager (
+    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment_id TEXT,
+    run_number INTEGER,
+    number_of_files INTEGER,
+    total_size_bytes INTEGER,
+    FOREIGN KEY (run_number) REFERENCES Run(run_number),
+    FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
+);
+'''
+
+# Run numbers restart for every experiment, so a run is keyed by both.  Rows
+# without an experiment were never real runs (see the old file manager ingest).
+# Duplicate rows left by repeated ingests are dropped, keeping the newest,
+# before the unique indexes are created.
+COMPOSITE_KEYS = '''
+CREATE TABLE Run_new (
+    run_number INTEGER,
+    experiment_id TEXT,
+    start_time DATETIME,
+    end_time DATETIME,
+    n_events INTEGER,
+    n_damaged INTEGER,
+    PRIMARY KEY (experiment_id, run_number),
+    FOREIGN KEY (experiment_id) REFERENCES Experiment(experiment_id)
+);
+INSERT OR REPLACE INTO Run_new (run_number, experiment_id, start_time, end_time, n_events, n_damaged)
+    SELECT run_number, experiment_id, start_time, end_time, n_events, n_damaged
+    FROM Run WHERE experiment_id IS NOT NULL ORDER BY rowid;
+DROP TABLE Run;
+ALTER TABLE Run_new RENAME TO Run;
+
+DELETE FROM DataProduction WHERE production_id NOT IN (
+    SELECT MAX(production_id) FROM DataProduction GROUP BY experiment_id, run_number);
+CREATE UNIQUE INDEX idx_data_production_run ON DataProduction (experiment_id, run_number);
+
+DELETE FROM FileManager WHERE file_id NOT IN (
+    SELECT MAX(file_id) FROM FileManager GROUP BY experiment_id, run_number);
+CREATE UNIQUE INDEX idx_file_manager_run ON FileManager (experiment_id, run_number);
+
+DELETE FROM Detector WHERE detector_id NOT IN (
+    SELECT MAX(detector_id) FROM Detector GROUP BY experiment_id, run_number, detector_name);
+CREATE UNIQUE INDEX idx_detector_run ON Detector (experiment_id, run_number, detector_name);
+
+DELETE FROM ExperimentTabs WHERE tab_id NOT IN (
+    SELECT MAX(tab_id) FROM ExperimentTabs GROUP BY experiment_id, tab_name);
+CREATE UNIQUE INDEX idx_experiment_tabs_name ON ExperimentTabs (experiment_id, tab_name);
+
+CREATE INDEX idx_logbook_run ON Logbook (experiment_id, run_number);
+'''
+
+CRAWL_HISTORY = '''
+CREATE TABLE IF NOT EXISTS CrawlHistory (
+    crawl_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment_id TEXT,
+    page_type TEXT,
+    started_at REAL,
+    duration REAL,
+    predicted REAL,
+    rows INTEGER,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_crawl_history_job ON CrawlHistory (experiment_id, page_type, started_at);
+'''
+
+# Lookup of a logbook entry by the run it belongs to and who posted it when.
+# Not unique: different entries can share all four, so duplicates are only
+# removed by the content-aware key of LOGBOOK_ENTRY_HASH.  This index
+# supersedes idx_logbook_run.
+LOGBOOK_ENTRY_KEY = '''
+DROP INDEX IF EXISTS idx_logbook_run;
+CREATE INDEX idx_logbook_entry ON Logbook (experiment_id, run_number, timestamp, author);
+'''
+
+# Indexes dropped for a bulk load (see db_profiles.py), until they are rebuilt.
+DEFERRED_INDEX = '''
+CREATE TABLE IF NOT EXISTS DeferredIndex (
+    name TEXT PRIMARY KEY,
+    table_name TEXT,
+    columns TEXT,
+    is_unique INTEGER,
+    sql TEXT
+);
+'''
+
+# Full-text search over the logbook and experiment tabs (see search.py).  The
+# FTS5 tables are external-content indexes over the real tables, kept in step
+# by triggers.  INSERT OR REPLACE only fires the delete trigger for the row it
+# replaces with recursive_triggers on, which ExperimentDBManager turns on.
+FULL_TEXT_SEARCH = '''
+CREATE VIRTUAL TABLE LogbookSearch USING fts5(
+    content, tags, author, content='Logbook', content_rowid='log_id'
+);
+CREATE TRIGGER logbook_search_insert AFTER INSERT ON Logbook BEGIN
+    INSERT INTO LogbookSearch (rowid, content, tags, author) VALUES (new.log_id, new.content, new.tags, new.author);
+END;
+CREATE TRIGGER logbook_search_delete AFTER DELETE ON Logbook BEGIN
+    INSERT INTO LogbookSearch (LogbookSearch, rowid, content, tags, author) VALUES ('delete', old.log_id, old.content, old.tags, old.author);
+END;
+CREATE TRIGGER logbook_search_update AFTER UPDATE OF content, tags, author ON Logbook BEGIN
+    INSERT INTO LogbookSearch (LogbookSearch, rowid, content, tags, author) VALUES ('delete', old.log_id, old.content, old.tags, old.author);
+    INSERT INTO LogbookSearch (rowid, content, tags, author) VALUES (new.log_id, new.content, new.tags, new.author);
+END;
+INSERT INTO LogbookSearch (LogbookSearch) VALUES ('rebuild');
+
+CREATE VIRTUAL TABLE TabSearch USING fts5(
+    tab_name, tab_content, content='ExperimentTabs', content_rowid='tab_id'
+);
+CREATE TRIGGER tab_search_insert AFTER INSERT ON ExperimentTabs BEGIN
+    INSERT INTO TabSearch (rowid, tab_name, tab_content) VALUES (new.tab_id, new.tab_name, new.tab_content);
+END;
+CREATE TRIGGER tab_search_delete AFTER DELETE ON ExperimentTabs BEGIN
+    INSERT INTO TabSearch (TabSearch, rowid, tab_name, tab_content) VALUES ('delete', old.tab_id, old.tab_name, old.tab_content);
+END;
+CREATE TRIGGER tab_search_update AFTER UPDATE OF tab_name, tab_content ON ExperimentTabs BEGIN
+    INSERT INTO TabSearch (TabSearch, rowid, tab_name, tab_content) VALUES ('delete', old.tab_id, old.tab_name, old.tab_content);
+    INSERT INTO TabSearch (rowid, tab_name, tab_content) VALUES (new.tab_id, new.tab_name, new.tab_content);
+END;
+INSERT INTO TabSearch (TabSearch) VALUES ('rebuild');
+'''
+
+# Logbook entries are keyed by a hash of everything that identifies them, so
+# re-ingesting a logbook is one unique-index lookup per entry and two entries
+# posted in the same minute by the same author no longer collide.
+LOGBOOK_ENTRY_HASH = '''
+ALTER TABLE Logbook ADD COLUMN entry_hash TEXT;
+UPDATE Logbook SET entry_hash = logbook_entry_hash(experiment_id, run_number, timestamp, author, content);
+DELETE FROM Logbook WHERE log_id NOT IN (SELECT MAX(log_id) FROM Logbook GROUP BY entry_hash);
+DROP INDEX IF EXISTS idx_logbook_entry;
+CREATE UNIQUE INDEX idx_logbook_entry_hash ON Logbook (entry_hash);
+CREATE INDEX idx_logbook_run ON Logbook (experiment_id, run_number);
+'''
+
+# Files ingested by a directory scan (see ledger.py)
+INGEST_LEDGER = '''
+CREATE TABLE IF NOT EXISTS IngestLedger (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    content_hash TEXT,
+    file_type TEXT,
+    ingested_at REAL
+);
+'''
+
+# Detectors are stored as a name dictionary plus, per experiment and
+# detector, the ranges of consecutive runs it was checked in, instead of one
+# text row per checked cell.  Detector becomes a view in the old shape; rows
+# inserted into it are merged into the ranges by its INSTEAD OF trigger.
+DETECTOR_RUN_RANGES = '''
+CREATE TABLE DetectorName (
+    detector_key INTEGER PRIMARY KEY,
+    detector_name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE DetectorRunRange (
+    experiment_id TEXT NOT NULL,
+    detector_key INTEGER NOT NULL REFERENCES DetectorName (detector_key),
+    run_start INTEGER NOT NULL,
+    run_end INTEGER NOT NULL,
+    PRIMARY KEY (experiment_id, detector_key, run_start)
+) WITHOUT ROWID;
+
+INSERT INTO DetectorName (detector_name)
+SELECT DISTINCT detector_name FROM Detector WHERE detector_name IS NOT NULL ORDER BY detector_name;
+
+-- Consecutive runs share run_number - row_number within their detector
+INSERT INTO DetectorRunRange (experiment_id, detector_key, run_start, run_end)
+SELECT experiment_id, detector_key, MIN(run_number), MAX(run_number) FROM (
+    SELECT experiment_id, detector_key, run_number,
+           run_number - ROW_NUMBER() OVER (PARTITION BY experiment_id, detector_key ORDER BY run_number) AS island
+    FROM (SELECT DISTINCT experiment_id, CAST(run_number AS INTEGER) AS run_number, detector_name FROM Detector
+          WHERE experiment_id IS NOT NULL AND run_number IS NOT NULL)
+    JOIN DetectorName USING (detector_name)
+)
+GROUP BY experiment_id, detector_key, island;
+
+DROP TABLE Detector;
+
+CREATE VIEW Detector (experiment_id, run_number, detector_name, status) AS
+WITH RECURSIVE runs (experiment_id, detector_key, run_number, run_end) AS (
+    SELECT experiment_id, detector_key, run_start, run_end FROM DetectorRunRange
+    UNION ALL
+    SELECT experiment_id, detector_key, run_number + 1, run_end FROM runs WHERE run_number < run_end
+)
+SELECT runs.experiment_id, runs.run_number, DetectorName.detector_name, 'Checked'
+FROM runs JOIN DetectorName USING (detector_key);
+
+-- Add the run as a range of its own unless a range covers it, then merge it
+-- with the range ending just below and the range starting just above.
+CREATE TRIGGER detector_insert INSTEAD OF INSERT ON Detector
+WHEN NEW.experiment_id IS NOT NULL AND NEW.run_number IS NOT NULL AND NEW.detector_name IS NOT NULL
+BEGIN
+    INSERT INTO DetectorName (detector_name)
+    SELECT NEW.detector_name WHERE NOT EXISTS (SELECT 1 FROM DetectorName WHERE detector_name = NEW.detector_name);
+
+    INSERT INTO DetectorRunRange (experiment_id, detector_key, run_start, run_end)
+    SELECT NEW.experiment_id, detector_key, CAST(NEW.run_number AS INTEGER), CAST(NEW.run_number AS INTEGER)
+    FROM DetectorName WHERE detector_name = NEW.detector_name AND NOT EXISTS (
+        SELECT 1 FROM DetectorRunRange r
+        WHERE r.experiment_id = NEW.experiment_id AND r.detector_key = DetectorName.detector_key
+          AND CAST(NEW.run_number AS INTEGER) BETWEEN r.run_start AND r.run_end);
+
+    UPDATE DetectorRunRange SET run_end = (
+        SELECT c.run_end FROM DetectorRunRange c
+        WHERE c.experiment_id = NEW.experiment_id AND c.detector_key = DetectorRunRange.detector_key
+          AND c.run_start = CAST(NEW.run_number AS INTEGER))
+    WHERE experiment_id = NEW.experiment_id
+      AND detector_key = (SELECT detector_key FROM DetectorName WHERE detector_name = NEW.detector_name)
+      AND run_end = CAST(NEW.run_number AS INTEGER) - 1
+      AND EXISTS (SELECT 1 FROM DetectorRunRange c
+                  WHERE c.experiment_id = NEW.experiment_id AND c.detector_key = DetectorRunRange.detector_key
+                    AND c.run_start = CAST(NEW.run_number AS INTEGER));
+    DELETE FROM DetectorRunRange
+    WHERE experiment_id = NEW.experiment_id
+      AND detector_key = (SELECT detector_key FROM DetectorName WHERE detector_name = NEW.detector_name)
+      AND run_start = CAST(NEW.run_number AS INTEGER)
+      AND EXISTS (SELECT 1 FROM DetectorRunRange l
+                  WHERE l.experiment_id = NEW.experiment_id AND l.detector_key = DetectorRunRange.detector_key
+                    AND l.run_start < CAST(NEW.run_number AS INTEGER) AND l.run_end >= CAST(NEW.run_number AS INTEGER));
+
+    UPDATE DetectorRunRange SET run_end = (
+        SELECT u.run_end FROM DetectorRunRange u
+        WHERE u.experiment_id = NEW.experiment_id AND u.detector_key = DetectorRunRange.detector_key
+          AND u.run_start = DetectorRunRange.run_end + 1)
+    WHERE experiment_id = NEW.experiment_id
+      AND detector_key = (SELECT detector_key FROM DetectorName WHERE detector_name = NEW.detector_name)
+      AND CAST(NEW.run_number AS INTEGER) BETWEEN run_start AND run_end
+      AND EXISTS (SELECT 1 FROM DetectorRunRange u
+                  WHERE u.experiment_id = NEW.experiment_id AND u.detector_key = DetectorRunRange.detector_key
+                    AND u.run_start = DetectorRunRange.run_end + 1);
+    DELETE FROM DetectorRunRange
+    WHERE experiment_id = NEW.experiment_id
+      AND detector_key = (SELECT detector_key FROM DetectorName WHERE detector_name = NEW.detector_name)
+      AND run_start > CAST(NEW.run_number AS INTEGER)
+      AND run_start <= (SELECT x.run_end FROM DetectorRunRange x
+                        WHERE x.experiment_id = NEW.experiment_id AND x.detector_key = DetectorRunRange.detector_key
+                          AND CAST(NEW.run_number AS INTEGER) BETWEEN x.run_start AND x.run_end);
+END;
+'''
+
+# Counts scraped as text become integers, and timestamps get an epoch
+# seconds column next to their display text, so range queries on either can
+# use an index.
+TYPED_COLUMNS = '''
+ALTER TABLE Logbook ADD COLUMN timestamp_epoch INTEGER;
+ALTER TABLE DataProduction ADD COLUMN prod_start_epoch INTEGER;
+ALTER TABLE DataProduction ADD COLUMN prod_end_epoch INTEGER;
+ALTER TABLE Experiment ADD COLUMN start_time_epoch INTEGER;
+ALTER TABLE Experiment ADD COLUMN end_time_epoch INTEGER;
+
+UPDATE Logbook SET timestamp_epoch = parse_timestamp(timestamp);
+UPDATE DataProduction SET prod_start_epoch = parse_timestamp(prod_start), prod_end_epoch = parse_timestamp(prod_end),
+    n_events = to_int(n_events), n_damaged = to_int(n_damaged), n_dropped = to_int(n_dropped);
+UPDATE Experiment SET start_time_epoch = parse_timestamp(start_time), end_time_epoch = parse_timestamp(end_time);
+UPDATE Run SET n_events = to_int(n_events), n_damaged = to_int(n_damaged);
+UPDATE FileManager SET number_of_files = to_int(number_of_files), total_size_bytes = to_int(total_size_bytes);
+
+CREATE INDEX idx_logbook_time ON Logbook (experiment_id, timestamp_epoch);
+CREATE INDEX idx_data_production_start ON DataProduction (experiment_id, prod_start_epoch);
+CREATE INDEX idx_data_production_events ON DataProduction (experiment_id, n_events);
+CREATE INDEX idx_experiment_start ON Experiment (start_time_epoch);
+'''
+
+# Per-experiment totals maintained by ingest (see summary.py), filled here
+# for the experiments already in the database
+EXPERIMENT_SUMMARY = '''
+CREATE TABLE ExperimentSummary (
+    experiment_id TEXT PRIMARY KEY,
+    instrument TEXT,
+    runs INTEGER,
+    files INTEGER,
+    total_bytes INTEGER,
+    events INTEGER,
+    logbook_entries INTEGER,
+    first_activity INTEGER,
+    last_activity INTEGER,
+    updated_at REAL
+);
+CREATE INDEX idx_experiment_summary_instrument ON ExperimentSummary (instrument);
+
+WITH ids (experiment_id) AS (
+    SELECT experiment_id FROM Experiment UNION SELECT experiment_id FROM Run
+    UNION SELECT experiment_id FROM FileManager UNION SELECT experiment_id FROM Logbook
+)
+INSERT INTO ExperimentSummary
+SELECT ids.experiment_id,
+       (SELECT instrument FROM Experiment e WHERE e.experiment_id = ids.experiment_id),
+       (SELECT COUNT(*) FROM Run r WHERE r.experiment_id = ids.experiment_id),
+       (SELECT SUM(number_of_files) FROM FileManager f WHERE f.experiment_id = ids.experiment_id),
+       (SELECT SUM(total_size_bytes) FROM FileManager f WHERE f.experiment_id = ids.experiment_id),
+       (SELECT SUM(n_events) FROM DataProduction d WHERE d.experiment_id = ids.experiment_id),
+       (SELECT COUNT(*) FROM Logbook l WHERE l.experiment_id = ids.experiment_id),
+       (SELECT MIN(t) FROM (
+           SELECT MIN(timestamp_epoch) AS t FROM Logbook l WHERE l.experiment_id = ids.experiment_id
+           UNION ALL SELECT MIN(prod_start_epoch) FROM DataProduction d WHERE d.experiment_id = ids.experiment_id)),
+       (SELECT MAX(t) FROM (
+           SELECT MAX(timestamp_epoch) AS t FROM Logbook l WHERE l.experiment_id = ids.experiment_id
+           UNION ALL SELECT MAX(prod_start_epoch) FROM DataProduction d WHERE d.experiment_id = ids.experiment_id
+           UNION ALL SELECT MAX(prod_end_epoch) FROM DataProduction d WHERE d.experiment_id = ids.experiment_id)),
+       (julianday('now') - 2440587.5) * 86400.0
+FROM ids WHERE ids.experiment_id IS NOT NULL;
+'''
+
+# Why a crawl failed, for crawls recorded with status 'failed'
+CRAWL_ERROR = '''
+ALTER TABLE CrawlHistory ADD COLUMN error TEXT;
+'''
+
+# Rehash the stored logbook entries with the normalized logbook_entry_hash,
+# dropping the copies of an entry it finds.  Duplicates go first, so the
+# unique index on entry_hash never sees two rows with the same new hash.
+LOGBOOK_HASH_NORMALIZED = '''
+DELETE FROM Logbook WHERE log_id NOT IN (
+    SELECT MAX(log_id) FROM Logbook GROUP BY logbook_entry_hash(experiment_id, run_number, timestamp, author, content));
+UPDATE Logbook SET entry_hash = logbook_entry_hash(experiment_id, run_number, timestamp, author, content);
+'''
+
+MIGRATIONS = [
+    BASE_SCHEMA,
+    COMPOSITE_KEYS,
+    CRAWL_HISTORY,
+    LOGBOOK_ENTRY_KEY,
+    DEFERRED_INDEX,
+    FULL_TEXT_SEARCH,
+    LOGBOOK_ENTRY_HASH,
+    INGEST_LEDGER,
+    DETECTOR_RUN_RANGES,
+    TYPED_COLUMNS,
+    EXPERIMENT_SUMMARY,
+    CRAWL_ERROR,
+    LOGBOOK_HASH_NORMALIZED,
+]
+
+def logbook_entry_hash(experiment_id, run_number, timestamp, author, content):
+    """
+    Hash of what identifies a logbook entry.  The time counts as the instant
+    it parses to and the content with its whitespace collapsed, so an entry
+    scraped from the page and one built from captured payloads match.
+    """
+    epoch = parse_timestamp(timestamp)
+    content = None if content is None else ' '.join(str(content).split())
+    fields = (experiment_id, run_number, timestamp if epoch is None else epoch, author, content)
+    text = '\x1f'.join('' if field is None else str(field) for field in fields)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def to_int(value):
+    """Integer for a scraped count such as '1,234' or '12.0', None for a blank; other values are returned as they are."""
+    if value is None or isinstance(value, (bool, int)):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    text = str(value).replace(',', '').strip()
+    if not text:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        number = float(text)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else value
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn):
+    """Bring the database up to the latest schema version."""
+    version = schema_version(conn)
+    conn.create_function('logbook_entry_hash', 5, logbook_entry_hash)
+    conn.create_function('parse_timestamp', 1, parse_timestamp)
+    conn.create_function('to_int', 1, to_int)
+    for target in range(version + 1, len(MIGRATIONS) + 1):
+        try:
+            conn.executescript(f'BEGIN;\n{MIGRATIONS[target - 1]}\nPRAGMA user_version = {target};\nCOMMIT;')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+    if version < len(MIGRATIONS):
+        logging.info(f"Migrated database schema from version {version} to {len(MIGRATIONS)}")
+    return len(MIGRATIONS)
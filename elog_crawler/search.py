@@ -0,0 +1,92 @@
+"""
+Full-text search over logbook entries and experiment tabs.
+
+Uses the FTS5 indexes ``LogbookSearch`` (content, tags, author) and
+``TabSearch`` (tab name and content), which ingest and update keep in step
+with their tables.  Results are ranked by bm25 and come with a snippet of
+the matching text.  Queries use FTS5 syntax (``cspad AND damage``,
+``"beam dump"``, ``detect*``); a query that is not valid FTS5 is retried
+with every word taken literally.
+
+    elog-crawler search --experiment mfxp1001 --runs 10-20 "cspad damage"
+"""
+
+import argparse
+import sqlite3
+import sys
+
+from .query import connect_readonly, parse_run_range, write_rows
+
+# bm25 weights for the content, tags and author columns
+LOGBOOK_WEIGHTS = (1.0, 2.0, 1.0)
+
+def quote_terms(text):
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+def logbook_search_sql(experiment_id=None, runs=None):
+    filters = ''
+    if experiment_id:
+        filters += ' AND l.experiment_id = :experiment_id'
+    if runs:
+        filters += ' AND l.run_number BETWEEN :run_first AND :run_last'
+    return f'''
+        SELECT l.experiment_id, l.run_number, l.timestamp, l.author,
+               snippet(LogbookSearch, -1, '[', ']', '...', 16) AS snippet,
+               round(bm25(LogbookSearch, {', '.join(map(str, LOGBOOK_WEIGHTS))}), 3) AS score
+        FROM LogbookSearch JOIN Logbook l ON l.log_id = LogbookSearch.rowid
+        WHERE LogbookSearch MATCH :query{filters}
+        ORDER BY score LIMIT :limit
+    '''
+
+def tab_search_sql(experiment_id=None):
+    filters = ' AND t.experiment_id = :experiment_id' if experiment_id else ''
+    return f'''
+        SELECT t.experiment_id, t.tab_name,
+               snippet(TabSearch, 1, '[', ']', '...', 16) AS snippet,
+               round(bm25(TabSearch), 3) AS score
+        FROM TabSearch JOIN ExperimentTabs t ON t.tab_id = TabSearch.rowid
+        WHERE TabSearch MATCH :query{filters}
+        ORDER BY score LIMIT :limit
+    '''
+
+def search(conn, text, experiment_id=None, runs=None, tabs=False, limit=20):
+    """Run a search and return the cursor; ``runs`` is a (first, last) run number range."""
+    sql = tab_search_sql(experiment_id) if tabs else logbook_search_sql(experiment_id, runs)
+    params = {'query': text, 'experiment_id': experiment_id, 'limit': limit,
+              'run_first': runs[0] if runs else None, 'run_last': runs[1] if runs else None}
+    try:
+        return conn.execute(sql, params)
+    except sqlite3.OperationalError as e:
+        # FTS5 reports bad query syntax as "fts5: syntax error" or, for a-b, "no such column"
+        if 'no such table' in str(e):
+            raise
+        params['query'] = quote_terms(text)
+        return conn.execute(sql, params)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text search over logbook entries or experiment tabs.")
+    parser.add_argument('query', help="Search terms (FTS5 query syntax)")
+    parser.add_argument('--db', default='experiment_database.db', help="Path to the SQLite database file")
+    parser.add_argument('--experiment', help="Only search this experiment")
+    parser.add_argument('--runs', type=parse_run_range, help="Only search entries of this run or run range, e.g. 12 or 10-20")
+    parser.add_argument('--tabs', action='store_true', help="Search the experiment info tabs instead of the logbook")
+    parser.add_argument('--limit', type=int, default=20, help="Maximum number of results")
+    parser.add_argument('--format', choices=['csv', 'ndjson', 'json'], default='csv', help="Output format")
+    args = parser.parse_args(argv)
+
+    try:
+        conn = connect_readonly(args.db)
+    except sqlite3.OperationalError as e:
+        sys.exit(f"Cannot open {args.db}: {e}")
+    try:
+        cursor = search(conn, args.query, args.experiment, args.runs, args.tabs, args.limit)
+        write_rows(cursor, args.format)
+    except sqlite3.OperationalError as e:
+        if 'no such table' in str(e):
+            sys.exit(f"{args.db} has no search index yet; run 'elog-crawler ingest' or 'update' on it once to build it.")
+        sys.exit(f"Search failed: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Storage report from the file manager data.
+
+Experiments are selected by exact ID, by ID prefix or by instrument, through
+the indexed ``ExperimentSummary`` table, and any number of them are reported
+in one query.  Sizes per run are grouped into at most ``--bins`` buckets of
+consecutive runs in SQL, so an experiment with tens of thousands of runs
+still prints as one screen of bars.
+
+    elog-crawler storage mfxp1001                        # size per run (bucketed)
+    elog-crawler storage --prefix mfxl10 --by experiment  # one line per experiment
+    elog-crawler storage --instrument MFX --by instrument # totals of the instrument
+"""
+
+import argparse
+import sqlite3
+import sys
+
+from .query import connect_readonly, write_rows
+
+BAR_WIDTH = 40
+
+def selection(experiments=(), prefixes=(), instruments=()):
+    """WHERE clause over ExperimentSummary and its named parameters; every experiment when nothing is given."""
+    filters, params = [], {}
+    if experiments:
+        filters.append(f"experiment_id IN ({', '.join(f':experiment{index}' for index in range(len(experiments)))})")
+        params.update((f'experiment{index}', experiment_id) for index, experiment_id in enumerate(experiments))
+    for index, prefix in enumerate(prefixes):
+        # A range on the primary key rather than LIKE, which SQLite cannot serve from the index
+        filters.append(f'(experiment_id >= :prefix{index} AND experiment_id < :prefix{index}_end)')
+        params[f'prefix{index}'] = prefix
+        params[f'prefix{index}_end'] = prefix + '\uffff'
+    for index, instrument in enumerate(instruments):
+        filters.append(f'instrument = UPPER(:instrument{index})')
+        params[f'instrument{index}'] = instrument
+    return ' OR '.join(filters) or '1', params
+
+def runs_sql(where):
+    return f'''
+        WITH spans AS (
+            SELECT f.experiment_id, MIN(f.run_number) AS first_run,
+                   (MAX(f.run_number) - MIN(f.run_number)) / :bins + 1 AS width
+            FROM FileManager f
+            WHERE f.experiment_id IN (SELECT experiment_id FROM ExperimentSummary WHERE {where})
+            GROUP BY f.experiment_id
+        )
+        SELECT f.experiment_id, MIN(f.run_number) AS first_run, MAX(f.run_number) AS last_run,
+               COUNT(*) AS runs, SUM(f.number_of_files) AS files, SUM(f.total_size_bytes) AS total_bytes
+        FROM spans JOIN FileManager f ON f.experiment_id = spans.experiment_id
+        GROUP BY f.experiment_id, (f.run_number - spans.first_run) / spans.width
+        ORDER BY f.experiment_id, first_run
+    '''
+
+def experiments_sql(where):
+    return f'''
+        SELECT experiment_id, instrument, runs, files, total_bytes
+        FROM ExperimentSummary WHERE {where}
+        ORDER BY total_bytes DESC, experiment_id
+    '''
+
+def instruments_sql(where):
+    return f'''
+        SELECT instrument, COUNT(*) AS experiments, SUM(runs) AS runs, SUM(files) AS files, SUM(total_bytes) AS total_bytes
+        FROM ExperimentSummary WHERE {where}
+        GROUP BY instrument
+        ORDER BY total_bytes DESC
+    '''
+
+def report(conn, by='run', experiments=(), prefixes=(), instruments=(), bins=40):
+    """Cursor over the report rows; ``by`` is 'run', 'experiment' or 'instrument'."""
+    where, params = selection(experiments, prefixes, instruments)
+    if by == 'run':
+        return conn.execute(runs_sql(where), dict(params, bins=max(bins, 1)))
+    sql = experiments_sql(where) if by == 'experiment' else instruments_sql(where)
+    return conn.execute(sql, params)
+
+def gigabytes(num_bytes):
+    return (num_bytes or 0) / 1e9
+
+def print_bars(labels, sizes, title):
+    largest = max(sizes, default=0) or 1
+    width = max((len(label) for label in labels), default=0)
+    print(f"\n{title}")
+    print(f"{'':{width}} | {'Size (GB)':>12} |")
+    print('-' * width + '-|-' + '-' * 12 + '-|-' + '-' * BAR_WIDTH)
+    for label, size in zip(labels, sizes):
+        print(f"{label:>{width}} | {size:12.2f} | {'█' * int(size / largest * BAR_WIDTH)}")
+
+def print_report(cursor, by):
+    rows = cursor.fetchall()
+    if not rows:
+        print("No file manager data for the selected experiments")
+        return
+    if by == 'run':
+        experiments = {}
+        for experiment_id, first_run, last_run, runs, files, total_bytes in rows:
+            experiments.setdefault(experiment_id, []).append((first_run, last_run, runs, files, total_bytes))
+        for experiment_id, buckets in experiments.items():
+            labels = [f'Run {first}' if first == last else f'Runs {first}-{last}' for first, last, *_ in buckets]
+            total = sum(bucket[4] or 0 for bucket in buckets)
+            title = (f"{experiment_id}: {sum(bucket[2] for bucket in buckets)} runs, "
+                     f"{sum(bucket[3] or 0 for bucket in buckets)} files, {gigabytes(total):.2f} GB")
+            print_bars(labels, [gigabytes(bucket[4]) for bucket in buckets], title)
+    else:
+        labels = [str(row[0]) for row in rows]
+        total = sum(row[-1] or 0 for row in rows)
+        print_bars(labels, [gigabytes(row[-1]) for row in rows],
+                   f"{len(rows)} {by}s, {sum(row[-2] or 0 for row in rows)} files, {gigabytes(total):.2f} GB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='elog-crawler storage', description="Storage used per run, experiment or instrument.")
+    parser.add_argument('experiments', nargs='*', help="Experiment IDs (exact match)")
+    parser.add_argument('--prefix', action='append', default=[], help="Experiments whose ID starts with this (repeatable)")
+    parser.add_argument('--instrument', action='append', default=[], help="Experiments of this instrument (repeatable)")
+    parser.add_argument('--by', choices=['run', 'experiment', 'instrument'], default='run',
+                        help="run: size per bucket of runs of each experiment; experiment or instrument: totals")
+    parser.add_argument('--bins', type=int, default=40, help="run: at most this many buckets of runs per experiment")
+    parser.add_argument('--db', default='experiment_database.db', help="Path to the SQLite database file")
+    parser.add_argument('--format', choices=['text', 'csv', 'ndjson', 'json'], default='text', help="Output format")
+    args = parser.parse_args(argv)
+    if args.by == 'run' and not (args.experiments or args.prefix or args.instrument):
+        parser.error("select experiments by ID, --prefix or --instrument for a report by run")
+
+    try:
+        conn = connect_readonly(args.db)
+    except sqlite3.OperationalError as e:
+        sys.exit(f"Cannot open {args.db}: {e}")
+    try:
+        cursor = report(conn, args.by, args.experiments, args.prefix, args.instrument, args.bins)
+        if args.format == 'text':
+            print_report(cursor, args.by)
+        else:
+            write_rows(cursor, args.format)
+    except sqlite3.OperationalError as e:
+        if 'no such table' in str(e):
+            sys.exit(f"{args.db} has no ExperimentSummary yet; run 'elog-crawler ingest' or 'update' on it once to create it.")
+        raise
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Per-experiment totals in ``ExperimentSummary``.
+
+One row per experiment with its instrument, number of runs, files, bytes,
+events and logbook entries, and its first and last activity (epoch seconds
+of the earliest and latest logbook entry or production time).  Ingest and
+update refresh the rows of the experiments a file touched in the same
+transaction as the file's rows, so readers get the totals from a primary
+key lookup instead of aggregating the whole database.  ``updated_at`` is
+the time of the last refresh.
+
+    elog-crawler summary show --instrument mfx
+    elog-crawler summary check     # compare with freshly computed totals
+    elog-crawler summary rebuild   # recompute every row
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+import time
+
+COLUMNS = ('experiment_id', 'instrument', 'runs', 'files', 'total_bytes', 'events', 'logbook_entries',
+           'first_activity', 'last_activity')
+
+# Totals for the experiment ids in a CTE named ids, in COLUMNS order
+SUMMARY_SELECT = '''
+    SELECT ids.experiment_id,
+           (SELECT instrument FROM Experiment e WHERE e.experiment_id = ids.experiment_id),
+           (SELECT COUNT(*) FROM Run r WHERE r.experiment_id = ids.experiment_id),
+           (SELECT SUM(number_of_files) FROM FileManager f WHERE f.experiment_id = ids.experiment_id),
+           (SELECT SUM(total_size_bytes) FROM FileManager f WHERE f.experiment_id = ids.experiment_id),
+           (SELECT SUM(n_events) FROM DataProduction d WHERE d.experiment_id = ids.experiment_id),
+           (SELECT COUNT(*) FROM Logbook l WHERE l.experiment_id = ids.experiment_id),
+           (SELECT MIN(t) FROM (
+               SELECT MIN(timestamp_epoch) AS t FROM Logbook l WHERE l.experiment_id = ids.experiment_id
+               UNION ALL SELECT MIN(prod_start_epoch) FROM DataProduction d WHERE d.experiment_id = ids.experiment_id)),
+           (SELECT MAX(t) FROM (
+               SELECT MAX(timestamp_epoch) AS t FROM Logbook l WHERE l.experiment_id = ids.experiment_id
+               UNION ALL SELECT MAX(prod_start_epoch) FROM DataProduction d WHERE d.experiment_id = ids.experiment_id
+               UNION ALL SELECT MAX(prod_end_epoch) FROM DataProduction d WHERE d.experiment_id = ids.experiment_id))
+    FROM ids
+'''
+
+ALL_EXPERIMENTS = '''
+    SELECT experiment_id FROM Experiment UNION SELECT experiment_id FROM Run
+    UNION SELECT experiment_id FROM FileManager UNION SELECT experiment_id FROM Logbook
+'''
+
+def refresh_summary(conn, experiment_ids):
+    """Recompute the summary rows of ``experiment_ids``; the caller commits."""
+    sql = f'''
+        WITH ids (experiment_id) AS (VALUES (?))
+        INSERT OR REPLACE INTO ExperimentSummary ({', '.join(COLUMNS)}, updated_at)
+        SELECT *, ? FROM ({SUMMARY_SELECT})
+    '''
+    now = time.time()
+    conn.executemany(sql, [(experiment_id, now) for experiment_id in experiment_ids if experiment_id])
+
+def rebuild_summary(conn):
+    with conn:
+        conn.execute('DELETE FROM ExperimentSummary')
+        conn.execute(f'''
+            WITH ids (experiment_id) AS ({ALL_EXPERIMENTS})
+            INSERT INTO ExperimentSummary ({', '.join(COLUMNS)}, updated_at)
+            SELECT *, ? FROM ({SUMMARY_SELECT}) WHERE experiment_id IS NOT NULL
+        ''', (time.time(),))
+    return conn.execute('SELECT COUNT(*) FROM ExperimentSummary').fetchone()[0]
+
+def check_summary(conn):
+    """(experiment_id, column, stored, computed) for every summary value that is out of date."""
+    stored = {row[0]: row for row in conn.execute(f"SELECT {', '.join(COLUMNS)} FROM ExperimentSummary")}
+    computed = {row[0]: row for row in conn.execute(f'WITH ids (experiment_id) AS ({ALL_EXPERIMENTS}) {SUMMARY_SELECT}')
+                if row[0] is not None}
+    mismatches = []
+    for experiment_id in sorted(set(stored) | set(computed)):
+        old, new = stored.get(experiment_id), computed.get(experiment_id)
+        if old is None or new is None:
+            mismatches.append((experiment_id, 'row', 'present' if old else 'missing', 'present' if new else 'missing'))
+            continue
+        for column, stored_value, computed_value in zip(COLUMNS[1:], old[1:], new[1:]):
+            if stored_value != computed_value:
+                mismatches.append((experiment_id, column, stored_value, computed_value))
+    return mismatches
+
+def main(argv=None):
+    from .query import connect_readonly, write_rows
+
+    parser = argparse.ArgumentParser(prog='elog-crawler summary', description="Per-experiment totals kept in ExperimentSummary.")
+    parser.add_argument('action', choices=['show', 'check', 'rebuild'],
+                        help="show: print the totals; check: compare them with freshly computed ones; rebuild: recompute them all")
+    parser.add_argument('--db', default='experiment_database.db', help="Path to the SQLite database file")
+    parser.add_argument('--experiment', action='append', help="show: only this experiment (repeatable)")
+    parser.add_argument('--instrument', help="show: only experiments of this instrument")
+    parser.add_argument('--format', choices=['csv', 'ndjson', 'json'], default='csv', help="show: output format")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.action == 'rebuild':
+        from .save_to_db import ExperimentDBManager
+        db_manager = ExperimentDBManager(args.db)
+        count = rebuild_summary(db_manager.conn)
+        db_manager.close()
+        logging.info(f"Rebuilt the summary of {count} experiments")
+        return
+
+    try:
+        conn = connect_readonly(args.db)
+    except sqlite3.OperationalError as e:
+        sys.exit(f"Cannot open {args.db}: {e}")
+    try:
+        if args.action == 'check':
+            mismatches = check_summary(conn)
+            for experiment_id, column, stored, computed in mismatches:
+                print(f"{experiment_id}: {column} is {stored}, should be {computed}")
+            if mismatches:
+                sys.exit(f"{len({row[0] for row in mismatches})} experiments out of date; run 'elog-crawler summary rebuild'")
+            print("Summary is up to date")
+            return
+
+        filters, params = [], []
+        if args.experiment:
+            filters.append(f"experiment_id IN ({', '.join('?' * len(args.experiment))})")
+            params.extend(args.experiment)
+        if args.instrument:
+            filters.append('instrument = ?')
+            params.append(args.instrument)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ''
+        write_rows(conn.execute(f"SELECT {', '.join(COLUMNS)}, updated_at FROM ExperimentSummary {where} ORDER BY experiment_id",
+                                params), args.format)
+    except sqlite3.OperationalError as e:
+        if 'no such table' in str(e):
+            sys.exit(f"{args.db} has no ExperimentSummary yet; run 'elog-crawler ingest' or 'update' on it once to create it.")
+        raise
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Parsing of the free-form timestamps scraped from lgbk pages.
+
+Values such as the info page's "Start Time" or a logbook entry's "Posted"
+arrive as display text in a handful of formats.  ``parse_timestamp`` turns
+them into integer epoch seconds; naive values are taken as UTC.  Results are
+cached per string and the format that matched last is tried first, since a
+given column almost always repeats one format.
+"""
+
+import functools
+from datetime import datetime, timezone
+
+FORMATS = [
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+    '%b/%d/%Y %H:%M:%S',
+    '%b/%d/%Y %H:%M',
+    '%b/%d/%Y',
+    '%b %d %Y %H:%M:%S',
+    '%b %d %Y %H:%M',
+    '%b %d, %Y %H:%M:%S',
+    '%b %d, %Y %H:%M',
+    '%b %d, %Y',
+    '%a %b %d %Y %H:%M:%S',
+    '%a %b %d %H:%M:%S %Y',
+    '%d %b %Y %H:%M:%S',
+    '%d %b %Y',
+]
+
+_last_format = [FORMATS[0]]
+
+def _to_epoch(parsed):
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+@functools.lru_cache(maxsize=65536)
+def _parse_text(text):
+    if text.endswith('Z'):
+        text = text[:-1] + '+0000'
+    for fmt in [_last_format[0]] + FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        _last_format[0] = fmt
+        return _to_epoch(parsed)
+    return None
+
+def parse_timestamp(value):
+    """Epoch seconds for a scraped timestamp, or None if it cannot be parsed."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value / 1000) if value > 1e11 else int(value)
+    text = ' '.join(str(value).split())
+    if not text:
+        return None
+    return _parse_text(text)
@@ -5,24 +5,22 @@ import os
 import argparse
 import logging
 import sys
-from .save_to_db import ExperimentDBManager
+from .save_to_db import ExperimentDBManager, TABLE_COLUMNS, CONFLICT_KEYS
+from .db_profiles import PROFILES
+from .timestamps import parse_timestamp
 
 class DatabaseUpdater(ExperimentDBManager):
-    def __init__(self, db_name):
+    # Upserts do not tell new rows from updated ones; both count as updated
+    row_outcome = 'updated'
+    keep_unique_indexes = True
+
+    def __init__(self, db_name, batch_size=1000, profile='default', max_field_size=None, engine='rows'):
         # Initialize with parent constructor but ensure the database exists
         if not os.path.exists(db_name):
             raise FileNotFoundError(f"Database file not found: {db_name}")
-        super().__init__(db_name)
+        super().__init__(db_name, batch_size=batch_size, profile=profile, max_field_size=max_field_size, engine=engine)
         logging.info(f"Connected to existing database: {db_name}")
 
-        # Override the file processors to use update methods
-        self.file_processors = {
-            'info'        : self.process_info_file,
-            'file_manager': self.process_file_manager,
-            'logbook'     : self.process_logbook,
-            'runtable'    : self.process_runtable
-        }
-
     def update_experiment(self, data):
         """Update experiment information if it exists, otherwise insert new record"""
         try:
@@ -41,7 +39,8 @@ class DatabaseUpdater(ExperimentDBManager):
                     UPDATE Experiment
                     SET name=?, instrument=?, start_time=?, end_time=?, pi=?,
                         pi_email=?, leader_account=?, description=?,
-                        slack_channels=?, analysis_queues=?, urawi_proposal=?
+                        slack_channels=?, analysis_queues=?, urawi_proposal=?,
+                        start_time_epoch=?, end_time_epoch=?
                     WHERE experiment_id=?
                 ''', (
                     main_content.get('Name'),
@@ -55,9 +54,12 @@ class DatabaseUpdater(ExperimentDBManager):
                     main_content.get('Slack channels'),
                     main_content.get('Analysis Queues'),
                     main_content.get('URAWI Proposal'),
+                    parse_timestamp(main_content.get('Start Time')),
+                    parse_timestamp(main_content.get('End Time')),
                     data.get('experiment_id')
                 ))
-                logging.info(f"Updated experiment: {data.get('experiment_id')}")
+                self.metrics.count('Experiment', 'updated')
+                logging.debug(f"Updated experiment: {data.get('experiment_id')}")
             else:
                 # Insert new record
                 super().insert_experiment(data)
@@ -76,291 +78,78 @@ class DatabaseUpdater(ExperimentDBManager):
                     (experiment_id, tab_name, tab_content)
                     VALUES (?, ?, ?)
                 ''', (data.get('experiment_id'), tab_name, json.dumps(tab_content)))
-
-        except sqlite3.Error as e:
-            logging.error(f"Error updating experiment data: {e}")
-            raise
-
-    def update_run(self, data):
-        """Update run information if it exists, otherwise insert new record"""
-        try:
-            # Check if run exists
-            self.cursor.execute(
-                "SELECT run_number FROM Run WHERE run_number = ? AND experiment_id = ?",
-                (data.get('Run'), data.get('experiment_id'))
-            )
-            exists = self.cursor.fetchone()
-
-            if exists:
-                # Update existing record
-                self.cursor.execute('''
-                    UPDATE Run
-                    SET start_time=?, end_time=?, n_events=?, n_damaged=?
-                    WHERE run_number=? AND experiment_id=?
-                ''', (
-                    data.get('start_time'),
-                    data.get('end_time'),
-                    data.get('n_events'),
-                    data.get('n_damaged'),
-                    data.get('Run'),
-                    data.get('experiment_id')
-                ))
-                logging.info(f"Updated run: {data.get('Run')}")
-            else:
-                # Insert new record
-                super().insert_run(data)
-        except sqlite3.Error as e:
-            logging.error(f"Error updating run data: {e}")
-            raise
-
-    def update_detector(self, data):
-        """Update detector information if it exists, otherwise insert new record"""
-        try:
-            self.cursor.execute(
-                "SELECT detector_id FROM Detector WHERE run_number = ? AND experiment_id = ? AND detector_name = ?",
-                (data.get('run_number'), data.get('experiment_id'), data.get('detector_name'))
-            )
-            exists = self.cursor.fetchone()
-
-            if exists:
-                self.cursor.execute('''
-                    UPDATE Detector
-                    SET status=?
-                    WHERE run_number=? AND experiment_id=? AND detector_name=?
-                ''', (
-                    data.get('status'),
-                    data.get('run_number'),
-                    data.get('experiment_id'),
-                    data.get('detector_name')
-                ))
-                logging.info(f"Updated detector {data.get('detector_name')} for run {data.get('run_number')}")
-            else:
-                super().insert_detector(data)
-        except sqlite3.Error as e:
-            logging.error(f"Error updating detector data: {e}")
-            raise
-
-    def update_logbook(self, data):
-        """Update logbook information if it exists, otherwise insert new record"""
-        try:
-            # For logbook entries, we need a more complex check because they don't have a unique ID
-            # Let's use run_number, timestamp, and author as a composite key
-            self.cursor.execute(
-                "SELECT log_id FROM Logbook WHERE run_number = ? AND timestamp = ? AND author = ? AND experiment_id = ?",
-                (data.get('run_number'), data.get('timestamp'), data.get('author'), data.get('experiment_id'))
-            )
-            exists = self.cursor.fetchone()
-
-            if exists:
-                log_id = exists[0]
-                self.cursor.execute('''
-                    UPDATE Logbook
-                    SET content=?, tags=?
-                    WHERE log_id=?
-                ''', (
-                    data.get('content'),
-                    data.get('tags'),
-                    log_id
-                ))
-                logging.info(f"Updated logbook entry {log_id} for run {data.get('run_number')}")
-            else:
-                super().insert_logbook(data)
-        except sqlite3.Error as e:
-            logging.error(f"Error updating logbook data: {e}")
-            raise
-
-    def update_data_production(self, data):
-        """Update data production information if it exists, otherwise insert new record"""
-        try:
-            self.cursor.execute(
-                "SELECT production_id FROM DataProduction WHERE run_number = ? AND experiment_id = ?",
-                (data.get('run_number'), data.get('experiment_id'))
-            )
-            exists = self.cursor.fetchone()
-
             if exists:
-                production_id = exists[0]
-                self.cursor.execute('''
-                    UPDATE DataProduction
-                    SET n_events=?, n_damaged=?, n_dropped=?, prod_start=?, prod_end=?
-                    WHERE production_id=?
-                ''', (
-                    data.get('n_events'),
-                    data.get('n_damaged'),
-                    data.get('n_dropped'),
-                    data.get('prod_start'),
-                    data.get('prod_end'),
-                    production_id
-                ))
-                logging.info(f"Updated data production for run {data.get('run_number')}")
-            else:
-                super().insert_data_production(data)
-        except sqlite3.Error as e:
-            logging.error(f"Error updating data production data: {e}")
-            raise
+                self.metrics.count('ExperimentTabs', 'updated', len(tabs))
 
-    def update_file_manager(self, data):
-        """Update file manager information if it exists, otherwise insert new record"""
-        try:
-            self.cursor.execute(
-                "SELECT file_id FROM FileManager WHERE run_number = ? AND experiment_id = ?",
-                (data.get('run_number'), data.get('experiment_id'))
-            )
-            exists = self.cursor.fetchone()
-
-            if exists:
-                file_id = exists[0]
-                self.cursor.execute('''
-                    UPDATE FileManager
-                    SET number_of_files=?, total_size_bytes=?
-                    WHERE file_id=?
-                ''', (
-                    data.get('number_of_files'),
-                    data.get('total_size_bytes'),
-                    file_id
-                ))
-                logging.info(f"Updated file manager for run: {data.get('run_number')}")
-            else:
-                super().insert_file_manager(data)
         except sqlite3.Error as e:
-            logging.error(f"Error updating file manager data: {e}")
+            self.metrics.count('Experiment', 'failed')
+            logging.error(f"Error updating experiment data: {e}")
             raise
 
-    # Override the process methods to use the update methods
-
-    def process_info_file(self, file_path):
-        try:
-            with open(file_path, 'r') as file:
-                data = json.load(file)
-            if data:
-                experiment_id = os.path.basename(file_path).split('.')[0]
-                data['experiment_id'] = experiment_id
-                self.update_experiment(data)
-                logging.info(f"Processed info file: {file_path}")
-            else:
-                logging.warning(f"No data found in info file: {file_path}")
-        except json.JSONDecodeError:
-            logging.error(f"Error parsing JSON file: {file_path}")
-        except FileNotFoundError:
-            logging.error(f"File not found: {file_path}")
-        except Exception as e:
-            logging.error(f"Unexpected error processing info file: {e}")
-
-    def process_file_manager(self, file_path):
-        data = self.parse_csv(file_path)
-        if data:
-            experiment_id = os.path.basename(file_path).split('.')[0]
-            for row in data:
-                run_data = {
-                    'experiment_id': experiment_id,
-                    'Run': row['Run Number'],
-                    'start_time': None,
-                    'end_time': None,
-                    'n_events': None,
-                    'n_damaged': None
-                }
-                self.update_run(run_data)
-
-                file_manager_data = {
-                    'experiment_id': experiment_id,
-                    'run_number': row['Run Number'],
-                    'number_of_files': row['Number of Files'],
-                    'total_size_bytes': row['Total Size (bytes)']
-                }
-                self.update_file_manager(file_manager_data)
-            logging.info(f"Processed file manager: {file_path}")
-        else:
-            logging.warning(f"Failed to process file manager: {file_path}")
-
-    def process_logbook(self, file_path):
-        data = self.parse_csv(file_path)
-        if data:
-            experiment_id = os.path.basename(file_path).split('.')[0]
-            last_run_number = None
-            for row in data:
-                if row['Run']:
-                    last_run_number = int(row['Run'])
-                if last_run_number is not None:
-                    logbook_data = {
-                        'experiment_id': experiment_id,
-                        'run_number': last_run_number,
-                        'timestamp': row['Posted'],
-                        'content': row['Content'],
-                        'tags': row['Tags'],
-                        'author': row['Author']
-                    }
-                    self.update_logbook(logbook_data)
-            logging.info(f"Processed logbook: {file_path}")
-        else:
-            logging.warning(f"Failed to process logbook: {file_path}")
-
-    def process_runtable(self, file_path):
-        data = self.parse_json(file_path)
-        if data:
-            experiment_id = os.path.basename(file_path).split('.')[0]
-
-            # Process Data Production
-            for run in data.get('Data Production', []):
-                run_data = {
-                    'experiment_id': experiment_id,
-                    'Run': run.get('Run', None),  # Match the key expected by update_run
-                    'start_time': None,  # Could be populated if available in your data
-                    'end_time': None,
-                    'n_events': run.get('N events', None),
-                    'n_damaged': run.get('N damaged', None)
-                }
-                self.update_run(run_data)
-
-                data_production_data = {
-                    'experiment_id': experiment_id,
-                    'run_number': run.get('Run', None),
-                    'n_events': run.get('N events', None),
-                    'n_damaged': run.get('N damaged', None),
-                    'n_dropped': run.get('N dropped', None),
-                    'prod_start': run.get('Prod Start', None),
-                    'prod_end': run.get('Prod End', None),
-                }
-                self.update_data_production(data_production_data)
-
-            # Process Detectors
-            for detector in data.get('Detectors', []):
-                for key, value in detector.items():
-                    if key != 'Run' and value == 'Checked':
-                        detector_data = {
-                            'experiment_id': experiment_id,
-                            'run_number': detector['Run'],
-                            'detector_name': key,
-                            'status': value
-                        }
-                        self.update_detector(detector_data)
-
-            logging.info(f"Processed runtable: {file_path}")
-        else:
-            logging.warning(f"Failed to process runtable: {file_path}")
-
-def main():
+    def upsert_sql(self, table):
+        columns = TABLE_COLUMNS[table]
+        keys = CONFLICT_KEYS[table]
+        updates = ', '.join(f"{column}=excluded.{column}" for column in columns if column not in keys)
+        return f"""
+            INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})
+            ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}
+        """
+
+    def insert_sql(self, table, conflict):
+        # Queued rows update the existing row on their natural key instead of replacing it
+        if conflict == 'REPLACE':
+            return self.upsert_sql(table)
+        return super().insert_sql(table, conflict)
+
+    def store_experiment(self, data):
+        self.update_experiment(data)
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Update experiment database with new data.")
     parser.add_argument('--db_file', required=True, help="Path to the existing SQLite database file")
-    parser.add_argument('--files', required=True, nargs='+', help="Paths to the input files for updating the database")
+    parser.add_argument('--files', nargs='+', default=[], help="Paths to the input files for updating the database")
+    parser.add_argument('--scan', metavar='DIR', action='append', default=[],
+                        help="Update from the crawl outputs under DIR that are new or changed since the last scan (repeatable)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Rows per executemany batch")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='default', help="SQLite connection profile")
+    parser.add_argument('--max-field-size', type=int, help="Truncate text fields longer than this many characters")
+    parser.add_argument('--workers', type=int, default=1, help="Processes parsing files in parallel (the database is still written by one); "
+                             "parsed rows wait in temporary files")
+    parser.add_argument('--engine', choices=['rows', 'vectorized'], default='rows',
+                        help="vectorized: read logbook and file manager files in chunks with pandas")
     parser.add_argument('--verbose', '-v', action='store_true', help="Enable verbose logging")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if not args.files and not args.scan:
+        parser.error("give --files or --scan DIR")
 
     # Configure logging
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
 
     try:
-        db_updater = DatabaseUpdater(args.db_file)
+        db_updater = DatabaseUpdater(args.db_file, batch_size=args.batch_size, profile=args.profile,
+                                     max_field_size=args.max_field_size, engine=args.engine)
 
+        files = []
         for file_path in args.files:
             if os.path.exists(file_path):
-                logging.info(f"Processing file: {file_path}")
-                db_updater.process_file(file_path)
+                files.append(file_path)
             else:
                 logging.error(f"File not found: {file_path}")
+        for directory in args.scan:
+            files.extend(db_updater.scan(directory))
+
+        if args.workers > 1:
+            from .pipeline import ingest_files
+            ingest_files(db_updater, files, args.workers)
+        else:
+            for file_path in files:
+                logging.info(f"Processing file: {file_path}")
+                db_updater.process_file(file_path)
 
         db_updater.close()
         logging.info("Database update completed successfully.")
+        db_updater.metrics.print_summary()
 
     except FileNotFoundError as e:
         logging.error(f"Error: {e}")
@@ -0,0 +1,175 @@
+"""
+Vectorized ingest of logbook and file manager outputs with pandas.
+
+The default ingest engine normalizes one row at a time in Python.  This one
+reads a file in chunks of ``CHUNK_SIZE`` rows and does the logbook's run
+number forward-fill, the count and timestamp conversions and the column
+mapping as column operations.  Each chunk becomes the same
+``{(table, conflict): [row tuples]}`` batches that ``group_records`` builds,
+so it is written by the same executemany path and stores the same values.
+
+Needs pandas (``pip install pandas``); select it with ``--engine vectorized``.
+"""
+
+import hashlib
+from itertools import repeat
+
+from .save_to_db import KEY_FIELDS, TABLE_COLUMNS
+from .schema import to_int
+from .timestamps import parse_timestamp
+
+CHUNK_SIZE = 100000
+
+# The format lgbk uses for 'Posted'; other values go through parse_timestamp
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def _import_pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("The vectorized ingest engine requires the 'pandas' package: pip install pandas")
+    return pandas
+
+def read_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """DataFrames of up to ``chunk_size`` rows of a CSV or Parquet output; CSV columns are read as text."""
+    pd = _import_pandas()
+    if file_path.endswith('.parquet'):
+        from .outputs import _import_pyarrow
+        _, pq = _import_pyarrow()
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, dtype=str, keep_default_na=False, chunksize=chunk_size)
+
+def cap_columns(chunk, max_field_size):
+    """Vectorized ``cap_fields``: truncate text columns, except KEY_FIELDS."""
+    if not max_field_size:
+        return chunk
+    pd = _import_pandas()
+    for column in chunk.columns:
+        if column not in KEY_FIELDS and pd.api.types.is_string_dtype(chunk[column]):
+            chunk[column] = chunk[column].str.slice(0, max_field_size)
+    return chunk
+
+def values(series):
+    """Python values of a column, with missing values as None."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+def int_values(series):
+    """Vectorized ``to_int`` over a column."""
+    text = series.astype('string').str.replace(',', '', regex=False).str.strip()
+    is_int = text.str.fullmatch(r'[-+]?\d+').fillna(False).astype(bool)
+    blank = text.isna() | (text == '')
+    result = series.astype(object).where(~blank, None)
+    result[is_int] = text[is_int].astype('Int64').astype(object)
+    result = result.tolist()
+    # Values such as '12.0' or text that is not a number at all: rare, so row by row
+    for index in (~(is_int | blank)).to_numpy().nonzero()[0]:
+        result[index] = to_int(series.iloc[index])
+    return result
+
+def run_numbers(series):
+    """
+    ``int(row['Run'])`` over a column, NaN where it is blank.  Values that
+    are not plain integers go through int() itself, so a bad run number
+    raises as it does in the row engine.
+    """
+    pd = _import_pandas()
+    text = series.astype('string')
+    present = text.notna() & (text != '')
+    run = pd.to_numeric(text.where(present & text.str.fullmatch(r'\s*[-+]?\d+\s*').fillna(False)), errors='coerce')
+    for index in (present & run.isna()).to_numpy().nonzero()[0]:
+        run.iloc[index] = int(series.iloc[index])
+    return run
+
+def epoch_values(series):
+    """Vectorized ``parse_timestamp`` over a column of timestamp text."""
+    pd = _import_pandas()
+    text = series.astype('string')
+    parsed = pd.to_datetime(text, format=TIMESTAMP_FORMAT, errors='coerce', utc=True)
+    epochs = ((parsed - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).astype('Int64').astype(object)
+    epochs = epochs.where(parsed.notna(), None).tolist()
+    # Anything not in the usual format gets the full format search
+    other = parsed.isna() & text.notna() & (text.str.strip() != '')
+    for index in other.fillna(False).to_numpy().nonzero()[0]:
+        epochs[index] = parse_timestamp(series.iloc[index])
+    return epochs
+
+def entry_hashes(experiment_id, run, posted, epochs, author, content):
+    """``logbook_entry_hash`` for each row: the key text is joined as columns, only sha1 runs per row."""
+    pd = _import_pandas()
+    separator = '\x1f'
+    epochs = pd.Series(epochs, index=posted.index, dtype=object)
+    posted = epochs.where(epochs.notna(), posted.fillna('')).astype(str)
+    content = content.fillna('').astype(str).str.split().str.join(' ')
+    text = (experiment_id + separator + run.astype(str) + separator + posted + separator
+            + author.fillna('').astype(str) + separator + content)
+    return [hashlib.sha1(key.encode('utf-8')).hexdigest() for key in text.tolist()]
+
+def table_rows(table, columns, count):
+    """Row tuples in TABLE_COLUMNS order from per-column value lists; missing columns are None."""
+    return list(zip(*(columns.get(column, repeat(None, count)) for column in TABLE_COLUMNS[table])))
+
+def logbook_batches(experiment_id, chunks, max_field_size=None):
+    last_run_number = None
+    for chunk in chunks:
+        chunk = cap_columns(chunk, max_field_size)
+        run = run_numbers(chunk['Run']).ffill()
+        if last_run_number is not None:
+            run = run.fillna(last_run_number)
+        keep = run.notna()
+        if keep.any():
+            last_run_number = int(run[keep].iloc[-1])
+        skipped = int((~keep).sum())
+        chunk = chunk[keep]
+        count = len(chunk)
+
+        run = run[keep].astype('int64')
+        epochs = epoch_values(chunk['Posted'])
+        columns = {
+            'experiment_id'  : [experiment_id] * count,
+            'run_number'     : run.tolist(),
+            'timestamp'      : values(chunk['Posted']),
+            'content'        : values(chunk['Content'].str.slice(0, max_field_size) if max_field_size else chunk['Content']),
+            'tags'           : values(chunk['Tags']),
+            'author'         : values(chunk['Author']),
+            'entry_hash'     : entry_hashes(experiment_id, run, chunk['Posted'], epochs, chunk['Author'], chunk['Content']),
+            'timestamp_epoch': epochs,
+        }
+        batches = {('Logbook', 'IGNORE'): table_rows('Logbook', columns, count)}
+        if skipped:
+            # Entries before the first run number, counted as skipped like logbook_records does
+            batches[('Logbook', None)] = [None] * skipped
+        yield batches
+
+def file_manager_batches(experiment_id, chunks, max_field_size=None):
+    for chunk in chunks:
+        chunk = cap_columns(chunk, max_field_size)
+        count = len(chunk)
+        columns = {
+            'experiment_id'   : [experiment_id] * count,
+            'run_number'      : int_values(chunk['Run Number']),
+            'number_of_files' : int_values(chunk['Number of Files']),
+            'total_size_bytes': int_values(chunk['Total Size (bytes)']),
+        }
+        yield {
+            ('Run', 'IGNORE')         : table_rows('Run', columns, count),
+            ('FileManager', 'REPLACE'): table_rows('FileManager', columns, count),
+        }
+
+# File types the vectorized engine handles; others use the row normalizers
+BATCHERS = {
+    'logbook'     : logbook_batches,
+    'file_manager': file_manager_batches,
+}
+
+def file_batches(file_path, file_type, experiment_id, max_field_size=None, chunk_size=CHUNK_SIZE):
+    return BATCHERS[file_type](experiment_id, read_chunks(file_path, chunk_size), max_field_size)
+
+def group_file(file_path, file_type, experiment_id, max_field_size=None):
+    """All batches of a file merged into one dict, like ``group_records``."""
+    grouped = {}
+    for batches in file_batches(file_path, file_type, experiment_id, max_field_size):
+        for key, rows in batches.items():
+            grouped.setdefault(key, []).extend(rows)
+    return grouped
@@ -0,0 +1,60 @@
+import csv
+import json
+
+import pytest
+
+from elog_crawler.outputs import document_records, write_ndjson_gz
+
+RUNS = range(1, 30)
+
+def write_experiment(directory, experiment_id):
+    info = {
+        'main_content': f'Name:\n{experiment_id} name\nInstrument:\nMFX\n'
+                        'Start Time:\n2024-01-01 00:00:00\nEnd Time:\n2024-01-03 00:00:00',
+        'tabs': {'Notes': f'{experiment_id} beam notes'},
+    }
+    with open(directory / f'{experiment_id}.info.json', 'w') as f:
+        json.dump(info, f)
+    runtable = {
+        'Data Production': [{'Run': str(run), 'N events': f'1,{run:03d}', 'N damaged': '0',
+                             'Prod Start': f'2024-01-01 0{run % 10}:00:00'} for run in RUNS],
+        'Detectors': [{'Run': str(run), 'epix': 'Checked' if run < 10 or run > 20 else 'Unchecked', 'cspad': 'Checked'}
+                      for run in RUNS],
+    }
+    with open(directory / f'{experiment_id}.runtable.json', 'w') as f:
+        json.dump(runtable, f)
+    with open(directory / f'{experiment_id}.logbook.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Posted', 'Run', 'Content', 'Tags', 'Author'])
+        for i in range(50):
+            writer.writerow([f'2024-01-01 10:{i:02d}:00', str(30 - i // 2) if i % 2 == 0 else '',
+                             f'entry {i} about the sample', 'tag', 'alice'])
+    with open(directory / f'{experiment_id}.file_manager.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Run Number', 'Number of Files', 'Total Size (bytes)'])
+        for run in RUNS:
+            writer.writerow([run, 3, 1000 * run])
+
+@pytest.fixture
+def crawl_dir(tmp_path):
+    """Crawler outputs of two experiments, plus a third crawled with --compact."""
+    directory = tmp_path / 'crawl'
+    directory.mkdir()
+    for experiment_id in ('exp1', 'exp2'):
+        write_experiment(directory, experiment_id)
+    write_ndjson_gz(document_records({'main_content': 'Name:\nexp3\nInstrument:\nCXI', 'tabs': {'Notes': 'short'}}),
+                    str(directory / 'exp3.info.ndjson.gz'))
+    write_ndjson_gz(document_records({'Detectors': [{'Run': '1', 'epix': 'Checked'}]}),
+                    str(directory / 'exp3.runtable.ndjson.gz'))
+    return directory
+
+@pytest.fixture
+def crawl_files(crawl_dir):
+    # Info files first, as the crawlers write them
+    return sorted((str(path) for path in crawl_dir.iterdir()), key=lambda path: ('.info.' not in path, path))
+
+@pytest.fixture(params=['rows', 'vectorized'])
+def engine(request):
+    if request.param == 'vectorized':
+        pytest.importorskip('pandas')
+    return request.param
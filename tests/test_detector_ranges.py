@@ -0,0 +1,39 @@
+import sqlite3
+
+import pytest
+
+from elog_crawler.schema import migrate
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'db.db'))
+    migrate(conn)
+    yield conn
+    conn.close()
+
+def check(conn, runs, detector='epix'):
+    conn.executemany("INSERT INTO Detector VALUES ('exp1', ?, ?, 'Checked')", [(run, detector) for run in runs])
+
+def ranges(conn):
+    return conn.execute('''
+        SELECT detector_name, run_start, run_end FROM DetectorRunRange JOIN DetectorName USING (detector_key)
+        ORDER BY detector_name, run_start
+    ''').fetchall()
+
+def test_runs_merge_into_ranges(conn):
+    check(conn, [1, 2, 3, 7, 8, 5])
+    assert ranges(conn) == [('epix', 1, 3), ('epix', 5, 5), ('epix', 7, 8)]
+    # Joins the ranges on both sides
+    check(conn, [4, 6])
+    assert ranges(conn) == [('epix', 1, 8)]
+    # Inside a range, again, or as text: nothing changes
+    check(conn, [2, 8, '3'])
+    assert ranges(conn) == [('epix', 1, 8)]
+
+def test_view_expands_ranges(conn):
+    check(conn, [10, 11, 12, 20])
+    check(conn, [11], detector='cspad')
+    assert conn.execute("SELECT run_number, detector_name, status FROM Detector ORDER BY run_number, detector_name").fetchall() == [
+        (10, 'epix', 'Checked'), (11, 'cspad', 'Checked'), (11, 'epix', 'Checked'), (12, 'epix', 'Checked'),
+        (20, 'epix', 'Checked')]
+    assert conn.execute('SELECT COUNT(*) FROM DetectorName').fetchone()[0] == 2
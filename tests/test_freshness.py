@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+
+from elog_crawler.freshness import build_manifest, main
+from elog_crawler.query import connect_readonly
+from elog_crawler.schema import BASE_SCHEMA, migrate
+
+DAY = 86400
+
+def test_manifest_from_read_only_connection(tmp_path):
+    db_path = str(tmp_path / 'db.db')
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    conn.executemany('''
+        INSERT INTO CrawlHistory (experiment_id, page_type, started_at, duration, rows, status)
+        VALUES (?, 'logbook', ?, 1.0, 10, 'ok')
+    ''', [('fresh', 1000 * DAY - 60), ('stale', 1000 * DAY - 2 * DAY)])
+    conn.commit()
+    conn.close()
+
+    conn = connect_readonly(db_path)
+    manifest = build_manifest(conn, page_types=['logbook'], now=1000 * DAY)
+    conn.close()
+    assert [entry['experiment_id'] for entry in manifest] == ['stale']
+
+def test_missing_tables_are_reported(tmp_path):
+    db_path = str(tmp_path / 'db.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript(BASE_SCHEMA)
+    conn.close()
+    with pytest.raises(SystemExit) as exit_info:
+        main(['--db', db_path])
+    assert "run 'elog-crawler ingest'" in str(exit_info.value)
+    # Nothing was migrated
+    assert sqlite3.connect(db_path).execute('PRAGMA user_version').fetchone()[0] == 0
@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from elog_crawler.pipeline import ingest_files
+from elog_crawler.save_to_db import ExperimentDBManager
+from elog_crawler.update_db import DatabaseUpdater
+
+# Rows written with REPLACE get a new surrogate id each time, so those ids are left out; logbook
+# entries are written with IGNORE and keep theirs.
+TABLES = {
+    'Experiment'    : ('*', 'experiment_id'),
+    'ExperimentTabs': ('experiment_id, tab_name, tab_content', 'experiment_id, tab_name'),
+    'Run'           : ('*', 'experiment_id, run_number'),
+    'Logbook'       : ('*', 'log_id'),
+    'DataProduction': ('experiment_id, run_number, n_events, n_damaged, n_dropped, prod_start, prod_end',
+                       'experiment_id, run_number'),
+    'FileManager'   : ('experiment_id, run_number, number_of_files, total_size_bytes', 'experiment_id, run_number'),
+    'Detector'      : ('*', 'experiment_id, run_number, detector_name'),
+}
+
+def ingest(db_path, files, workers=1, **options):
+    db_manager = ExperimentDBManager(str(db_path), **options)
+    if workers > 1:
+        ingest_files(db_manager, files, workers)
+    else:
+        for file_path in files:
+            db_manager.process_file(file_path)
+    db_manager.close()
+    return db_manager.metrics
+
+def snapshot(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {table: conn.execute(f'SELECT {columns} FROM {table} ORDER BY {order}').fetchall()
+                for table, (columns, order) in TABLES.items()}
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_reingest_is_idempotent(tmp_path, crawl_files, engine, workers):
+    db_path = tmp_path / 'db.db'
+    first = ingest(db_path, crawl_files, workers, engine=engine)
+    assert first.summary()['failed_files'] == []
+    stored = snapshot(db_path)
+    assert {table: len(rows) for table, rows in stored.items()} == {
+        'Experiment': 3, 'ExperimentTabs': 3, 'Run': 58, 'Logbook': 100, 'DataProduction': 58,
+        'FileManager': 58, 'Detector': 95}
+
+    second = ingest(db_path, crawl_files, workers, engine=engine)
+    assert second.summary()['failed_files'] == []
+    assert snapshot(db_path) == stored
+    assert second.tables['Logbook']['inserted'] == 0
+
+def test_update_is_idempotent(tmp_path, crawl_files):
+    db_path = tmp_path / 'db.db'
+    ingest(db_path, crawl_files)
+    stored = snapshot(db_path)
+
+    db_updater = DatabaseUpdater(str(db_path))
+    for file_path in crawl_files:
+        db_updater.process_file(file_path)
+    db_updater.close()
+    assert db_updater.metrics.summary()['failed_files'] == []
+    assert snapshot(db_path) == stored
+    assert db_updater.metrics.tables['FileManager']['updated'] == 58
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from elog_crawler.outputs import iter_json_items
+
+DOCUMENTS = [
+    {'a': [0.1, 2]},
+    {'a': 0.1},
+    {'a': [-2.5e10]},
+    {'a': [12345678, -0.000123, 1E+5, 0], 'b': 'text', 'c': [True, None, {'x': 1.25}]},
+    {'Data Production': [{'Run': 1, 'N events': 1200.5}, {'Run': 2, 'N events': 3e-7}], 'Detectors': []},
+]
+
+def expected_items(document):
+    for key, value in document.items():
+        if isinstance(value, list):
+            for item in value:
+                yield key, item
+        else:
+            yield key, value
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 4, 5, 6, 7, 8, 16, 64 * 1024])
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_numbers_cut_at_chunk_boundaries(tmp_path, document, chunk_size):
+    path = tmp_path / 'doc.json'
+    path.write_text(json.dumps(document))
+    assert list(iter_json_items(str(path), chunk_size=chunk_size)) == list(expected_items(document))
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 8])
+def test_malformed_document_is_reported(tmp_path, chunk_size):
+    path = tmp_path / 'doc.json'
+    path.write_text('{"a": [1, 2')
+    with pytest.raises(ValueError):
+        list(iter_json_items(str(path), chunk_size=chunk_size))
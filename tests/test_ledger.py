@@ -0,0 +1,37 @@
+import csv
+import os
+
+from elog_crawler.save_to_db import ExperimentDBManager
+
+def scan_and_ingest(db_path, directory):
+    db_manager = ExperimentDBManager(str(db_path))
+    files = db_manager.scan(str(directory))
+    for file_path in files:
+        db_manager.process_file(file_path)
+    db_manager.close()
+    return [os.path.basename(file_path) for file_path in files]
+
+def test_scan_skips_ingested_files(tmp_path, crawl_dir):
+    db_path = tmp_path / 'db.db'
+    assert len(scan_and_ingest(db_path, crawl_dir)) == 10
+    assert scan_and_ingest(db_path, crawl_dir) == []
+
+    # Touched without changes: skipped, and the next scan skips it without hashing
+    logbook = crawl_dir / 'exp1.logbook.csv'
+    stat = os.stat(logbook)
+    os.utime(logbook, (stat.st_atime, stat.st_mtime + 60))
+    assert scan_and_ingest(db_path, crawl_dir) == []
+
+    with open(logbook, 'a', newline='') as f:
+        csv.writer(f).writerow(['2024-01-02 09:00:00', '31', 'new entry', '', 'bob'])
+    assert scan_and_ingest(db_path, crawl_dir) == ['exp1.logbook.csv']
+    assert scan_and_ingest(db_path, crawl_dir) == []
+
+def test_failed_file_is_retried(tmp_path, crawl_dir):
+    db_path = tmp_path / 'db.db'
+    scan_and_ingest(db_path, crawl_dir)
+    logbook = crawl_dir / 'exp2.logbook.csv'
+    with open(logbook, 'a', newline='') as f:
+        csv.writer(f).writerow(['2024-01-02 09:00:00', 'not a run', 'bad entry', '', 'bob'])
+    assert scan_and_ingest(db_path, crawl_dir) == ['exp2.logbook.csv']
+    assert scan_and_ingest(db_path, crawl_dir) == ['exp2.logbook.csv']
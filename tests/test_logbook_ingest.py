@@ -0,0 +1,60 @@
+import csv
+import sqlite3
+
+from elog_crawler.save_to_db import ExperimentDBManager
+
+LOGBOOK_ROWS = [
+    {'Posted': '2024-01-01 00:00:01', 'Run': '1', 'Content': 'Beam on, ' + 'x' * 100, 'Tags': 'beam', 'Author': 'alice'},
+    {'Posted': '2024-01-01 00:05:00', 'Run': '', 'Content': 'Beam on, ' + 'y' * 100, 'Tags': '', 'Author': 'alice'},
+    {'Posted': '2024-01-01 01:00:00', 'Run': '2', 'Content': 'Detector check', 'Tags': 'det', 'Author': 'bob'},
+]
+
+def write_logbook(path, rows=LOGBOOK_ROWS):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['Posted', 'Run', 'Content', 'Tags', 'Author'])
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+def ingest(db_path, files, **options):
+    db_manager = ExperimentDBManager(str(db_path), **options)
+    for file_path in files:
+        db_manager.process_file(file_path)
+    db_manager.close()
+    return db_manager.metrics
+
+def logbook(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute('SELECT run_number, content, entry_hash FROM Logbook ORDER BY log_id').fetchall()
+
+def test_entry_hash_ignores_max_field_size(tmp_path, engine):
+    file_path = write_logbook(tmp_path / 'exp1.logbook.csv')
+    ingest(tmp_path / 'full.db', [file_path], engine=engine)
+    ingest(tmp_path / 'capped.db', [file_path], engine=engine, max_field_size=8)
+    full, capped = logbook(tmp_path / 'full.db'), logbook(tmp_path / 'capped.db')
+    # Entries that differ only past the cap stay distinct, and keep the hash of an uncapped ingest
+    assert [row[2] for row in capped] == [row[2] for row in full]
+    assert [row[1] for row in capped] == ['Beam on,', 'Beam on,', 'Detector']
+
+    # Re-ingesting without the cap finds every entry already stored
+    ingest(tmp_path / 'capped.db', [file_path], engine=engine)
+    assert logbook(tmp_path / 'capped.db') == capped
+
+def test_page_and_captured_entries_match(tmp_path, engine):
+    # The same entry as scraped from the page and as built from its captured payload
+    scraped = {'Posted': '2024-01-01 08:00:01', 'Run': '3', 'Content': 'Beam on\n  now', 'Tags': '', 'Author': 'alice'}
+    captured = dict(scraped, Posted='2024-01-01T08:00:01Z', Content='Beam on now')
+    (tmp_path / 'page').mkdir()
+    (tmp_path / 'capture').mkdir()
+    files = [write_logbook(tmp_path / 'page' / 'exp1.logbook.csv', [scraped]),
+             write_logbook(tmp_path / 'capture' / 'exp1.logbook.csv', [captured])]
+    metrics = ingest(tmp_path / 'db.db', files, engine=engine)
+    assert len(logbook(tmp_path / 'db.db')) == 1
+    assert metrics.tables['Logbook']['skipped'] == 1
+
+def test_bad_run_number_fails_the_file(tmp_path, engine):
+    rows = LOGBOOK_ROWS + [dict(LOGBOOK_ROWS[2], Run='12.0', Posted='2024-01-01 02:00:00')]
+    file_path = write_logbook(tmp_path / 'exp1.logbook.csv', rows)
+    metrics = ingest(tmp_path / 'db.db', [file_path], engine=engine)
+    assert metrics.summary()['failed_files'] == [file_path]
+    assert logbook(tmp_path / 'db.db') == []
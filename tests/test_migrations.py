@@ -0,0 +1,61 @@
+import sqlite3
+
+from elog_crawler.schema import BASE_SCHEMA, MIGRATIONS, migrate, schema_version
+
+def baseline_database(path):
+    """A database as the first release left it, repeated ingests and all."""
+    conn = sqlite3.connect(path)
+    conn.executescript(BASE_SCHEMA)
+    conn.execute('''
+        INSERT INTO Experiment (experiment_id, name, instrument, start_time, end_time)
+        VALUES ('exp1', 'Test', 'MFX', '2024-01-01 00:00:00', '2024-01-03 00:00:00')
+    ''')
+    conn.executemany('INSERT INTO ExperimentTabs (experiment_id, tab_name, tab_content) VALUES (?, ?, ?)',
+                     [('exp1', 'Notes', 'old notes'), ('exp1', 'Notes', 'beam notes')])
+    conn.executemany('INSERT INTO Run (run_number, experiment_id, n_events, n_damaged) VALUES (?, ?, ?, ?)',
+                     [(1, 'exp1', 100, 1), (2, 'exp1', 200, 2), (3, None, None, None)])
+    # Entries posted in the same minute by the same author, which only their content tells apart
+    conn.executemany('''
+        INSERT INTO Logbook (experiment_id, run_number, timestamp, content, tags, author) VALUES (?, ?, ?, ?, ?, ?)
+    ''', [('exp1', 1, '2024-01-01 10:00', 'first', '', 'alice'),
+          ('exp1', 1, '2024-01-01 10:00', 'second', '', 'alice'),
+          ('exp1', 2, '2024-01-01 11:00', 'third', '', 'bob')])
+    conn.executemany('''
+        INSERT INTO DataProduction (experiment_id, run_number, n_events, prod_start) VALUES (?, ?, ?, ?)
+    ''', [('exp1', 1, 90, '2024-01-01 09:00:00'), ('exp1', 1, 100, '2024-01-01 09:00:00')])
+    conn.executemany('''
+        INSERT INTO FileManager (experiment_id, run_number, number_of_files, total_size_bytes) VALUES (?, ?, ?, ?)
+    ''', [('exp1', 1, 3, 3000), ('exp1', 2, 4, 4000)])
+    conn.executemany('INSERT INTO Detector (experiment_id, run_number, detector_name, status) VALUES (?, ?, ?, ?)',
+                     [('exp1', run, name, 'Checked') for run in (1, 2) for name in ('epix', 'cspad')]
+                     + [('exp1', 1, 'epix', 'Checked')])
+    conn.commit()
+    return conn
+
+def test_migration_chain_from_baseline(tmp_path):
+    conn = baseline_database(str(tmp_path / 'db.db'))
+    assert migrate(conn) == len(MIGRATIONS)
+    assert schema_version(conn) == len(MIGRATIONS)
+
+    assert conn.execute('SELECT experiment_id, run_number, n_events FROM Run ORDER BY run_number').fetchall() == [
+        ('exp1', 1, 100), ('exp1', 2, 200)]
+    assert conn.execute('SELECT content FROM Logbook ORDER BY log_id').fetchall() == [('first',), ('second',), ('third',)]
+    assert conn.execute('SELECT COUNT(DISTINCT entry_hash) FROM Logbook').fetchone()[0] == 3
+    assert conn.execute('SELECT tab_content FROM ExperimentTabs').fetchall() == [('beam notes',)]
+    assert conn.execute('SELECT n_events, prod_start_epoch FROM DataProduction').fetchall() == [(100, 1704099600)]
+    assert conn.execute('SELECT start_time_epoch, end_time_epoch FROM Experiment').fetchone() == (1704067200, 1704240000)
+    assert conn.execute('SELECT run_number, detector_name FROM Detector ORDER BY run_number, detector_name').fetchall() == [
+        (1, 'cspad'), (1, 'epix'), (2, 'cspad'), (2, 'epix')]
+    assert conn.execute('SELECT rowid FROM LogbookSearch WHERE LogbookSearch MATCH ?', ('second',)).fetchall() == [(2,)]
+    assert conn.execute('''
+        SELECT runs, logbook_entries, total_bytes FROM ExperimentSummary WHERE experiment_id = 'exp1'
+    ''').fetchone() == (2, 3, 7000)
+
+def test_migrate_is_a_no_op_when_current(tmp_path):
+    conn = baseline_database(str(tmp_path / 'db.db'))
+    migrate(conn)
+    schema = conn.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall()
+    logbook = conn.execute('SELECT * FROM Logbook ORDER BY log_id').fetchall()
+    migrate(conn)
+    assert conn.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall() == schema
+    assert conn.execute('SELECT * FROM Logbook ORDER BY log_id').fetchall() == logbook
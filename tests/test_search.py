@@ -0,0 +1,36 @@
+import csv
+import json
+import sqlite3
+
+from elog_crawler.save_to_db import ExperimentDBManager
+from elog_crawler.search import search
+from elog_crawler.update_db import DatabaseUpdater
+
+def run(db_manager, files):
+    for file_path in files:
+        db_manager.process_file(str(file_path))
+    db_manager.close()
+
+def test_search_follows_an_update(tmp_path, crawl_dir, crawl_files):
+    db_path = str(tmp_path / 'db.db')
+    run(ExperimentDBManager(db_path), crawl_files)
+
+    # exp1 crawled again: a rewritten tab and one more logbook entry
+    with open(crawl_dir / 'exp1.info.json') as f:
+        info = json.load(f)
+    info['tabs']['Notes'] = 'alignment of the jungfrau'
+    with open(crawl_dir / 'exp1.info.json', 'w') as f:
+        json.dump(info, f)
+    with open(crawl_dir / 'exp1.logbook.csv', 'a', newline='') as f:
+        csv.writer(f).writerow(['2024-01-02 09:00:00', '31', 'gas jet nozzle replaced', 'ops', 'bob'])
+    run(DatabaseUpdater(db_path), [crawl_dir / 'exp1.info.json', crawl_dir / 'exp1.logbook.csv'])
+
+    conn = sqlite3.connect(db_path)
+    assert [row[:3] for row in search(conn, 'nozzle')] == [('exp1', 31, '2024-01-02 09:00:00')]
+    assert len(search(conn, 'sample', experiment_id='exp1', limit=100).fetchall()) == 50
+    assert [row[:2] for row in search(conn, 'jungfrau', tabs=True)] == [('exp1', 'Notes')]
+    assert search(conn, 'beam', experiment_id='exp1', tabs=True).fetchall() == []
+    assert [row[:2] for row in search(conn, 'beam', tabs=True)] == [('exp2', 'Notes')]
+    for index in ('LogbookSearch', 'TabSearch'):
+        conn.execute(f"INSERT INTO {index} ({index}, rank) VALUES ('integrity-check', 1)")
+    conn.close()
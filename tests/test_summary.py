@@ -0,0 +1,30 @@
+import csv
+import sqlite3
+
+import pytest
+
+from elog_crawler.save_to_db import ExperimentDBManager
+from elog_crawler.summary import check_summary
+from elog_crawler.update_db import DatabaseUpdater
+
+def run(db_manager, files):
+    for file_path in files:
+        db_manager.process_file(str(file_path))
+    db_manager.close()
+
+@pytest.mark.parametrize('profile', ['default', 'bulk-load'])
+def test_summary_kept_up_to_date(tmp_path, crawl_dir, crawl_files, profile):
+    db_path = str(tmp_path / 'db.db')
+    run(ExperimentDBManager(db_path, profile=profile), crawl_files)
+    conn = sqlite3.connect(db_path)
+    assert check_summary(conn) == []
+    assert conn.execute('''
+        SELECT instrument, runs, files, total_bytes, logbook_entries FROM ExperimentSummary WHERE experiment_id = 'exp1'
+    ''').fetchone() == ('MFX', 29, 87, 435000, 50)
+
+    with open(crawl_dir / 'exp1.logbook.csv', 'a', newline='') as f:
+        csv.writer(f).writerow(['2024-01-02 09:00:00', '31', 'new entry', '', 'bob'])
+    run(DatabaseUpdater(db_path), [crawl_dir / 'exp1.logbook.csv'])
+    assert check_summary(conn) == []
+    assert conn.execute("SELECT logbook_entries FROM ExperimentSummary WHERE experiment_id = 'exp1'").fetchone() == (51,)
+    conn.close()
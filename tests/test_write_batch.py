@@ -0,0 +1,72 @@
+import logging
+import sqlite3
+
+import pytest
+
+from elog_crawler.save_to_db import ExperimentDBManager, typed_row
+
+RUN_ROWS = [typed_row('Run', {'experiment_id': 'exp1', 'run_number': run, 'n_events': 10 * run}) for run in (1, 2, 3)]
+
+class FirstBatchFails:
+    """Cursor whose first executemany fails, as under a transient error."""
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.failed = False
+
+    def executemany(self, sql, rows):
+        if not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError('database is locked')
+        return self.cursor.executemany(sql, rows)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+@pytest.fixture
+def db_manager(tmp_path):
+    db_manager = ExperimentDBManager(str(tmp_path / 'db.db'))
+    yield db_manager
+    db_manager.close()
+
+def write_runs(db_manager, rows):
+    db_manager.conn.execute('BEGIN')
+    db_manager.write_batch('Run', db_manager.insert_sql('Run', 'REPLACE'), rows)
+    db_manager.conn.commit()
+    return db_manager.conn.execute('SELECT run_number FROM Run ORDER BY run_number').fetchall()
+
+def test_bad_row_only_loses_itself(db_manager, caplog):
+    with caplog.at_level(logging.ERROR):
+        runs = write_runs(db_manager, RUN_ROWS[:2] + [RUN_ROWS[2][:2]])
+    assert runs == [(1,), (2,)]
+    assert db_manager.metrics.tables['Run']['failed'] == 1
+    assert '1 of 3 Run rows failed' in caplog.text
+
+def test_batch_retried_without_failures_logs_no_error(db_manager, caplog):
+    db_manager.cursor = FirstBatchFails(db_manager.cursor)
+    with caplog.at_level(logging.ERROR):
+        runs = write_runs(db_manager, RUN_ROWS)
+    assert runs == [(1,), (2,), (3,)]
+    assert db_manager.metrics.tables['Run']['failed'] == 0
+    assert 'rows failed' not in caplog.text
+
+def logbook_row(index, content):
+    return typed_row('Logbook', {'experiment_id': 'exp1', 'run_number': 1, 'timestamp': f'2024-01-01 00:00:{index:02d}',
+                                 'content': content, 'author': 'alice', 'entry_hash': f'hash{index}'})
+
+@pytest.mark.parametrize('bad_row', [False, True])
+def test_logbook_batches_are_searchable(db_manager, bad_row):
+    rows = [logbook_row(1, 'nozzle aligned'), logbook_row(2, 'nozzle clogged')]
+    if bad_row:
+        rows.append(rows[0][:3])
+    db_manager.conn.execute('BEGIN')
+    db_manager.write_batch('Logbook', db_manager.insert_sql('Logbook', 'IGNORE'), rows)
+    db_manager.conn.commit()
+    # Rows added one at a time afterwards still go through the trigger
+    db_manager.conn.execute('INSERT INTO Logbook (experiment_id, run_number, content) VALUES (?, ?, ?)',
+                            ('exp1', 2, 'nozzle replaced'))
+    db_manager.conn.commit()
+
+    conn = db_manager.conn
+    assert conn.execute("SELECT rowid FROM LogbookSearch WHERE LogbookSearch MATCH 'nozzle' ORDER BY rowid").fetchall() == [
+        (1,), (2,), (3,)]
+    conn.execute("INSERT INTO LogbookSearch (LogbookSearch, rank) VALUES ('integrity-check', 1)")